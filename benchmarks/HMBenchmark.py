@@ -0,0 +1,257 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Offline benchmarks of HMLLDB commands, see "Benchmarks" in README.md
+# Usage: python3 benchmarks/HMBenchmark.py [--classes 1000,10000] [--case "fclass view"] [--load-image 100] [--disk-cache] [--json result.json] [--baseline result.json]
+
+import contextlib
+import io
+import json
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+import lldb
+import HMBenchmarkRuntime
+
+
+gBenchmarkDirectory = os.path.dirname(os.path.realpath(__file__))
+gCommandsDirectory = os.path.join(os.path.dirname(gBenchmarkDirectory), "commands")
+
+gDefaultCases = [
+    "fclass controller",
+    "fmethod viewdid",
+    "fmethod -c UIViewController",
+    "fsubclass UIViewController",
+    "deletefile -a",
+    "showhud",
+]
+
+# Counters compared with --baseline, the Python time is too noisy to compare
+gComparedCounters = ["evaluations", "bytes", "work"]
+
+
+def main() -> int:
+    parser = generate_option_parser()
+    (options, args) = parser.parse_args()
+
+    classCounts = [int(count) for count in options.classes.split(",")]
+    cases = options.cases or gDefaultCases
+    results = []
+    processUID = 0
+    for classCount in classCounts:
+        for case in cases:
+            processUID += 2
+            options.cacheDirectory = tempfile.mkdtemp(prefix="HMBenchmark") if options.diskCache else None
+            try:
+                results.extend(runCase(case, classCount, options, processUID))
+            finally:
+                if options.cacheDirectory is not None:
+                    shutil.rmtree(options.cacheDirectory)
+
+    printResults(results, options)
+
+    if options.json:
+        with open(options.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if options.baseline:
+        return compareWithBaseline(results, options.baseline, options.tolerance)
+    return 0
+
+
+def runCase(case: str, classCount: int, options: optparse.Values, processUID: int) -> List[Dict[str, Any]]:
+    # Each case runs twice in a new process: "cold" includes the module imports and the helper library,
+    # "warm" is the same command at the same stop.
+    if options.diskCache:
+        # An earlier session of the same binaries fills the disk cache, it isn't measured
+        primingRuntime = HMBenchmarkRuntime.HMBenchmarkRuntime(classCount, options.methods, options.files, options.seed)
+        primingDebugger, _ = lldb.makeDebugger(primingRuntime, processUID - 1)
+        loadCommands(primingDebugger, options.cacheDirectory)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                primingDebugger.HandleCommand(case)
+        except Exception:
+            pass
+
+    runtime = HMBenchmarkRuntime.HMBenchmarkRuntime(classCount, options.methods, options.files, options.seed)
+    debugger, process = lldb.makeDebugger(runtime, processUID)
+    loadCommands(debugger, options.cacheDirectory)
+
+    results = []
+    for phase in ["cold", "warm"]:
+        if phase == "warm" and options.loadedClasses > 0:
+            # The process continues and loads a framework before the warm phase
+            runtime.loadImage("HMBenchmarkPlugin", options.loadedClasses)
+            process.stopID += 1
+            debugger.GetSelectedTarget().broadcastModules(lldb.SBTarget.eBroadcastBitModulesLoaded, ["HMBenchmarkPlugin"])
+        runtime.resetCounters()
+        output = io.StringIO()
+        startTime = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                debugger.HandleCommand(case)
+        except Exception as error:
+            # The fake lldb module only implements the SB API used by the benchmarked commands
+            print(f"{case}: unsupported by the benchmarks ({error!r})", file=sys.stderr)
+            return results
+        seconds = time.perf_counter() - startTime
+
+        counters = runtime.counters()
+        result = {
+            "case": case,
+            "classes": classCount,
+            "phase": phase,
+            "pythonSeconds": seconds - counters["runtimeSeconds"],
+            "estimatedSeconds": counters["evaluations"] * options.expressionLatency + counters["work"] * options.workCost
+        }
+        result.update(counters)
+        results.append(result)
+
+        if options.verbose:
+            print(f"===== {case} ({classCount} classes, {phase}) =====")
+            print(output.getvalue())
+    return results
+
+
+def loadCommands(debugger: lldb.SBDebugger, cacheDirectory: Optional[str] = None) -> None:
+    # Every case starts from freshly imported commands, like lldb does after "command script import"
+    for name, module in list(sys.modules.items()):
+        if os.path.realpath(getattr(module, "__file__", None) or "").startswith(gCommandsDirectory):
+            del sys.modules[name]
+    debugger.HandleCommand(f"command script import {os.path.join(gCommandsDirectory, 'HMLLDB.py')}")
+    # The disk cache of the user is never used
+    sys.modules["HMDiskCache"].gCacheDirectory = cacheDirectory
+
+
+def printResults(results: List[Dict[str, Any]], options: optparse.Values) -> None:
+    print(f"{'case':<30}{'classes':>9}{'phase':>6}{'evals':>7}{'failed':>7}{'bytes':>11}{'work':>11}{'python ms':>11}{'est. s':>9}")
+    for result in results:
+        print(f"{result['case']:<30}{result['classes']:>9}{result['phase']:>6}{result['evaluations']:>7}{result['failedEvaluations']:>7}"
+              f"{result['bytes']:>11}{result['work']:>11}{result['pythonSeconds'] * 1000:>11.1f}{result['estimatedSeconds']:>9.2f}")
+    print(f"est. s: {options.expressionLatency}s per expression + {options.workCost * 1e9:.0f}ns per class/method/file visited")
+
+
+def compareWithBaseline(results: List[Dict[str, Any]], baselinePath: str, tolerance: float) -> int:
+    with open(baselinePath, "r") as file:
+        baseline = {(result["case"], result["classes"], result["phase"]): result for result in json.load(file)}
+
+    regressions = 0
+    for result in results:
+        baselineResult = baseline.get((result["case"], result["classes"], result["phase"]))
+        if baselineResult is None:
+            continue
+        for counter in gComparedCounters:
+            if result[counter] > baselineResult[counter] * (1 + tolerance):
+                regressions += 1
+                print(f"Regression: {result['case']} ({result['classes']} classes, {result['phase']}) {counter} {baselineResult[counter]} -> {result[counter]}")
+        if result["failedEvaluations"] > baselineResult["failedEvaluations"]:
+            regressions += 1
+            print(f"Regression: {result['case']} ({result['classes']} classes, {result['phase']}) failed evaluations {baselineResult['failedEvaluations']} -> {result['failedEvaluations']}")
+
+    return 1 if regressions > 0 else 0
+
+
+def generate_option_parser() -> optparse.OptionParser:
+    usage = "usage: HMBenchmark.py [--classes <count,count>] [--case <command>] [--json <path>] [--baseline <path>]"
+    parser = optparse.OptionParser(usage=usage, prog="HMBenchmark.py")
+    parser.add_option("--classes",
+                      action="store",
+                      default="1000,10000",
+                      dest="classes",
+                      help="Comma separated class counts of the simulated runtime, e.g. 1000,10000,100000")
+    parser.add_option("--methods",
+                      action="store",
+                      type="int",
+                      default=20,
+                      dest="methods",
+                      help="Instance methods per class, a quarter of it for class methods")
+    parser.add_option("--files",
+                      action="store",
+                      type="int",
+                      default=200,
+                      dest="files",
+                      help="Files in the simulated sandbox")
+    parser.add_option("--seed",
+                      action="store",
+                      type="int",
+                      default=1,
+                      dest="seed",
+                      help="Seed of the simulated runtime")
+    parser.add_option("--load-image",
+                      action="store",
+                      type="int",
+                      default=0,
+                      dest="loadedClasses",
+                      help="Load an image with this many classes at a new stop before the warm phase")
+    parser.add_option("--disk-cache",
+                      action="store_true",
+                      default=False,
+                      dest="diskCache",
+                      help="Run each case in an earlier session first, the cold phase loads the indexes from the disk cache")
+    parser.add_option("-c", "--case",
+                      action="append",
+                      default=[],
+                      dest="cases",
+                      help="Command to benchmark, can be repeated. Defaults to the cases of gDefaultCases")
+    parser.add_option("--expression-latency",
+                      action="store",
+                      type="float",
+                      default=0.15,
+                      dest="expressionLatency",
+                      help="Seconds of one expression evaluation on a device, used by the estimate")
+    parser.add_option("--work-cost",
+                      action="store",
+                      type="float",
+                      default=2e-7,
+                      dest="workCost",
+                      help="Seconds per class/method/file visited in the process, used by the estimate")
+    parser.add_option("--json",
+                      action="store",
+                      default=None,
+                      dest="json",
+                      help="Write the results to a JSON file")
+    parser.add_option("--baseline",
+                      action="store",
+                      default=None,
+                      dest="baseline",
+                      help="Compare with the JSON file of --json, exit with 1 if a counter regresses")
+    parser.add_option("--tolerance",
+                      action="store",
+                      type="float",
+                      default=0.1,
+                      dest="tolerance",
+                      help="Allowed growth of the counters compared with the baseline")
+    parser.add_option("-v", "--verbose",
+                      action="store_true",
+                      default=False,
+                      dest="verbose",
+                      help="Print the output of the commands")
+
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(main())
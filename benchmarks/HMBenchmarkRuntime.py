@@ -0,0 +1,1029 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Synthetic Objective-C runtime and sandbox behind the fake lldb module.
+# Expressions are not compiled: each expression is routed by the functions of HMExpressionLibrary it calls
+# and answered from the model. Expressions that call no handled helper raise HMUnsupportedExpression,
+# only plain Objective-C without any helper, e.g. the UI of the debug HUD, gets a generic result.
+
+import bisect
+import importlib.util
+import os
+import random
+import re
+import struct
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import lldb
+
+
+kImageAddressBase = 0x100000000  # Images are kImageSize apart: header, then the classes at kClassOffset, then the IMPs at kIMPOffset
+kImageSize = 0x1000000
+kClassOffset = 0x100000
+kIMPOffset = 0x800000
+kIMPAddressBase = 0x180000000
+kObjectAddressBase = 0x280000000
+kMemoryAddressBase = 0x300000000
+kMachOAddressBase = 0x400000000  # class_ro_t, class_rw_t, names and __objc_classlist of the modules
+kPageSize = 0x4000
+kFieldSeparator = "\x1f"
+kMainExecutable = "HMBenchmarkApp"
+kSwiftModule = "HMBenchmarkApp"
+
+# Helpers of HMExpressionLibrary.gLibrary: function names, variable names
+gLibraryFunctions: Set[str] = set()
+gLibraryVariables: List[str] = []
+
+# Helpers that read the expression arguments
+gArgumentHelpers = ["HMArgString", "HMArgPointer", "HMLookUpClass"]
+
+# (name, superclass, image)
+gCoreClasses: List[Tuple[str, Optional[str], str]] = [
+    ("NSObject", None, "libobjc.A.dylib"),
+    ("NSProxy", None, "Foundation"),
+    ("NSString", "NSObject", "Foundation"),
+    ("NSArray", "NSObject", "CoreFoundation"),
+    ("NSDictionary", "NSObject", "CoreFoundation"),
+    ("UIResponder", "NSObject", "UIKitCore"),
+    ("UIApplication", "UIResponder", "UIKitCore"),
+    ("UIView", "UIResponder", "UIKitCore"),
+    ("UIControl", "UIView", "UIKitCore"),
+    ("UIButton", "UIControl", "UIKitCore"),
+    ("UILabel", "UIView", "UIKitCore"),
+    ("UIWindow", "UIView", "UIKitCore"),
+    ("UIScrollView", "UIView", "UIKitCore"),
+    ("UITableView", "UIScrollView", "UIKitCore"),
+    ("UITableViewCell", "UIView", "UIKitCore"),
+    ("UIViewController", "UIResponder", "UIKitCore"),
+    ("UINavigationController", "UIViewController", "UIKitCore"),
+    ("UITabBarController", "UIViewController", "UIKitCore"),
+    ("UITableViewController", "UIViewController", "UIKitCore"),
+]
+
+gCoreMethods: Dict[str, List[str]] = {
+    "NSObject": ["init", "description", "class", "isKindOfClass:", "respondsToSelector:", "performSelector:"],
+    "UIView": ["initWithFrame:", "layoutSubviews", "addSubview:", "removeFromSuperview", "setNeedsLayout"],
+    "UIViewController": ["viewDidLoad", "viewWillAppear:", "viewDidAppear:", "viewWillLayoutSubviews", "viewDidLayoutSubviews", "presentViewController:animated:completion:"],
+    "UINavigationController": ["pushViewController:animated:", "popViewControllerAnimated:", "viewDidLayoutSubviews"],
+    "UITableViewController": ["viewDidLoad", "tableView:numberOfRowsInSection:", "tableView:cellForRowAtIndexPath:"],
+}
+
+# (protocol, inherited protocols)
+gProtocols: List[Tuple[str, List[str]]] = [
+    ("NSObject", []),
+    ("NSCopying", []),
+    ("NSCoding", []),
+    ("NSSecureCoding", ["NSCoding"]),
+    ("UIAppearance", ["NSObject"]),
+    ("UITraitEnvironment", ["NSObject"]),
+    ("UIScrollViewDelegate", ["NSObject"]),
+    ("UITableViewDataSource", ["NSObject"]),
+    ("UITableViewDelegate", ["UIScrollViewDelegate"]),
+    ("UICollectionViewDataSource", ["NSObject"]),
+    ("UICollectionViewDelegate", ["UIScrollViewDelegate"]),
+    (f"{kSwiftModule}.FeedDataSource", ["UITableViewDataSource"]),
+]
+
+# Protocols adopted by the core classes, the generated classes adopt some by their suffixes
+gCoreProtocols: Dict[str, List[str]] = {
+    "NSObject": ["NSObject"],
+    "NSString": ["NSCopying", "NSSecureCoding"],
+    "UIView": ["UIAppearance", "UITraitEnvironment", "NSCoding"],
+    "UIViewController": ["UITraitEnvironment", "NSCoding"],
+    "UITableViewController": ["UITableViewDelegate", "UITableViewDataSource"],
+}
+
+# Images of the generated classes: (image, class name prefix, weight)
+gImages: List[Tuple[str, str, int]] = [
+    ("UIKitCore", "UI", 30),
+    ("UIKitCore", "_UI", 10),
+    ("Foundation", "NS", 12),
+    ("CoreFoundation", "__NSCF", 4),
+    ("QuartzCore", "CA", 6),
+    ("WebKit", "WK", 8),
+    ("AVFoundation", "AV", 6),
+    ("SwiftUI", "SwiftUI.", 8),
+    (kMainExecutable, "HM", 6),
+    (kMainExecutable, kSwiftModule + ".", 10),
+]
+
+gWords = ["Table", "Collection", "Scroll", "Text", "Image", "Button", "Switch", "Picker", "Search", "Page", "Split",
+          "Navigation", "Tab", "Tool", "Status", "Alert", "Action", "Context", "Menu", "Input", "Keyboard", "Focus",
+          "Drag", "Drop", "Gesture", "Animation", "Transition", "Presentation", "Layout", "Constraint", "Stack",
+          "Activity", "Progress", "Slider", "Stepper", "Segmented", "Date", "Color", "Font", "Document", "Cloud",
+          "Photo", "Video", "Audio", "Player", "Network", "Session", "Cache", "Store", "Account", "Profile", "Feed"]
+gSuffixes = ["View", "ViewController", "Controller", "Manager", "Cell", "Layer", "Delegate", "Helper", "Store",
+             "Model", "Coordinator", "Configuration", "Item", "Container", "Representation"]
+gVerbs = ["set", "get", "update", "reload", "handle", "load", "layout", "configure", "prepare", "present", "dismiss",
+          "view", "did", "will", "should", "perform", "apply", "register", "remove", "insert", "scroll", "animate"]
+
+
+class HMUnsupportedExpression(Exception):
+    # HMBenchmarkRuntime has no handler for the expression
+    pass
+
+
+def loadLibraryNames() -> None:
+    # The top-level declarations of the helper library
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "commands", "HMExpressionLibrary.py")
+    spec = importlib.util.spec_from_file_location("HMBenchmarkExpressionLibrary", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    gLibraryFunctions.update(re.findall(r"^[A-Za-z_][\w\s\*\(\)]*?\b(HM\w+)\(", module.gLibrary, re.M))
+    gLibraryVariables.extend(re.findall(r"^[A-Za-z_][\w\s\*]*?\b(HM\w+)(?:\[\d+\])?(?: = [^;]*)?;$", module.gLibrary, re.M))
+
+
+def stripCasts(argument: str) -> str:
+    # "(id)(HMArgPointer(1))" -> "HMArgPointer(1)"
+    while True:
+        argument = argument.strip()
+        cast = re.match(r"\((?:const\s+)?[A-Za-z_]\w*\s*\**\s*\)", argument)
+        if cast is not None and cast.end() < len(argument):
+            argument = argument[cast.end():]
+        elif argument.startswith("(") and argument.endswith(")") and enclosedByParentheses(argument):
+            argument = argument[1:-1]
+        else:
+            return argument
+
+
+def plainResultType(expression: str) -> Optional[str]:
+    # The leading cast of a single expression, or the declared type of the variable that ends a script
+    cast = re.match(r"\s*\(\s*(\w+)\s*\)", expression)
+    if cast is not None:
+        return cast.group(1)
+    variable = re.search(r"\b(\w+)\s*;?\s*$", expression)
+    if variable is not None:
+        declaration = re.search(rf"\b(\w+)\s*\**\s*\b{variable.group(1)}\s*=", expression)
+        return declaration.group(1) if declaration is not None else None
+    return None
+
+
+def enclosedByParentheses(argument: str) -> bool:
+    # "(a)" but not "(a)(b)"
+    depth = 0
+    for position, character in enumerate(argument):
+        depth += 1 if character == "(" else -1 if character == ")" else 0
+        if depth == 0 and position < len(argument) - 1:
+            return False
+    return True
+
+
+loadLibraryNames()
+
+
+class HMRuntime(object):
+    # Counters shared by the simulated runtime and HMReplay
+
+    def __init__(self) -> None:
+        self.resetCounters()
+
+    def resetCounters(self) -> None:
+        self.evaluations = 0
+        self.failedEvaluations = 0
+        self.bytesSent = 0        # Expression source
+        self.bytesRead = 0        # SBProcess.ReadMemory
+        self.bytesWritten = 0     # SBProcess.WriteMemory
+        self.bytesDescribed = 0   # SBValue.GetObjectDescription
+        self.work = 0             # Classes, methods and files visited by the expressions
+        self.seconds = 0.0        # Time spent in this model, not in HMLLDB
+
+    def counters(self) -> Dict[str, float]:
+        return {
+            "evaluations": self.evaluations,
+            "failedEvaluations": self.failedEvaluations,
+            "bytes": self.bytesSent + self.bytesRead + self.bytesWritten + self.bytesDescribed,
+            "bytesSent": self.bytesSent,
+            "bytesRead": self.bytesRead,
+            "bytesWritten": self.bytesWritten,
+            "bytesDescribed": self.bytesDescribed,
+            "work": self.work,
+            "runtimeSeconds": self.seconds
+        }
+
+    def evaluate(self, expression: str, options: lldb.SBExpressionOptions) -> lldb.SBValue:
+        startTime = time.perf_counter()
+        self.evaluations += 1
+        self.bytesSent += len(expression.encode("utf-8"))
+        value = self.evaluateExpression(expression, options)
+        if not value.GetError().Success() and value.GetError().GetError() != lldb.kNoResult:
+            self.failedEvaluations += 1
+        self.seconds += time.perf_counter() - startTime
+        return value
+
+    def evaluateExpression(self, expression: str, options: lldb.SBExpressionOptions) -> lldb.SBValue:
+        raise NotImplementedError
+
+    def handleCommand(self, command: str, debugger: lldb.SBDebugger) -> None:
+        # lldb commands other than the ones added by "command script add"
+        if command.startswith("expression"):
+            self.evaluate(command.split(" -- ", 1)[-1], lldb.SBExpressionOptions())
+        elif command.startswith("process continue"):
+            # The process stops again before the next command of the benchmark
+            debugger.GetSelectedTarget().GetProcess().stopID += 1
+
+
+class HMBenchmarkRuntime(HMRuntime):
+    def __init__(self, classCount=1000, methodCount=20, fileCount=100, seed=1) -> None:
+        super().__init__()
+        self.methodCount = methodCount
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        # Classes, indexed by creation order
+        self.classNames: List[str] = []
+        self.classSuperclasses: List[int] = []  # -1 for root classes
+        self.classImages: List[str] = []
+        self.classIndexes: Dict[str, int] = {}
+        self.classAddresses: List[int] = []
+        self.addressIndexes: Dict[int, int] = {}  # class address -> index
+        self.imageBases: Dict[str, int] = {}
+        self.imageClassCounts: Dict[str, int] = {}
+        self.registeredClasses: Dict[str, bool] = {}  # Classes created by objc_allocateClassPair -> registered
+        self.addedMethods: Dict[Tuple[str, bool], List[Tuple[str, str]]] = {}  # (class name, isMeta) -> [(selector, types)]
+        self.selectors: List[str] = self.makeSelectors()
+        self.prefixes: Optional[List[str]] = None  # Swift module prefixes of the class names
+        self.makeClasses(classCount)
+
+        self.homeDirectory = "/var/mobile/Containers/Data/Application/7F3C2E1A-5B2D-4C4E-9A51-B1D4E2C9A0F1"
+        self.files: Dict[str, Optional[set]] = {}  # path -> names of the children, None for regular files
+        self.makeSandbox(fileCount)
+
+        # Memory of the process
+        self.memory: Dict[int, bytearray] = {}
+        self.memoryStarts: List[int] = []
+        self.nextMemoryAddress = kMemoryAddressBase
+        self.nextIMPAddress = kIMPAddressBase
+        self.nextObjectAddress = kObjectAddressBase
+        self.helperLibraryLoaded = False
+        self.trapAddresses: Dict[str, int] = {}  # HMLazyMethodTrap and HMPrewarmTrap of the helper library
+        self.argumentsAddress = 0
+        self.transportAddress = 0
+        self.machOModules: List[Tuple[str, str, int, Dict[str, Tuple[int, int, List[Tuple[str, int, int]]]]]] = []
+        self.machOClassCount = -1
+        self.machORegions: List[int] = []
+
+        # Expressions are routed by the functions of the helper library they call, see evaluateExpression.
+        # Transport expressions by the first helper of recordHandlers, the others by the first helper of valueHandlers.
+        self.recordHandlers: Dict[str, Callable[[str], Optional[List[str]]]] = {
+            "HMAllocateSpecClass": self.classSpecRecords,
+            "HMAppendBatchItem": self.batchRecords,
+            "HMAppendDescription": self.descriptionRecords,
+            "HMAppendClassMethods": self.classMethodRecords,
+            "HMAppendClassPrefixes": lambda expression: ["\n".join(self.classPrefixes())],
+            "HMAppendClassBatch": lambda expression: self.classIndexRecords(*[int(value) for value in self.argumentsOf(expression, "HMAppendClassBatch")]),
+            "HMAppendRuntimeClasses": lambda expression: self.runtimeClassRecords(int(self.argumentsOf(expression, "HMAppendRuntimeClasses")[0])),
+            "HMAppendImageClasses": lambda expression: self.imageClassRecords(self.argumentsOf(expression, "HMAppendImageClasses")[0].split("\n")),
+            "HMAppendMethodBatch": self.methodBatchRecords,
+            "HMAppendProtocols": self.protocolBatchRecords,
+        }
+        # Evaluated arguments -> bool for BOOL, "0x..." for pointers, None for void, other strings for NSString
+        self.valueHandlers: Dict[str, Callable[[List[str]], Any]] = {
+            "HMSchedulePrewarm": lambda arguments: f"0x{self.trapAddress('HMPrewarmTrap'):x}",
+            "HMExistClass": lambda arguments: self.lookUpClassExactly(arguments[0]) >= 0,
+            "HMAllocateClass": lambda arguments: f"0x{self.allocateClass(arguments[0], arguments[1]):x}",
+            "HMAddIvar": lambda arguments: True,
+            "HMAddInstanceMethod": lambda arguments: self.addMethod(arguments[0], arguments[1], arguments[3], False),
+            "HMAddClassMethod": lambda arguments: self.addMethod(arguments[0], arguments[1], arguments[3], True),
+            "HMNewObject": lambda arguments: f"0x{self.newObject():x}" if int(arguments[0], 16) in self.addressIndexes else "0x0",
+            "HMSandboxDirectory": lambda arguments: self.sandboxDirectory(arguments[0]),
+            "HMContentsOfDirectory": lambda arguments: "\n".join(sorted(self.files.get(arguments[0]) or [])),
+            "HMRemoveFilesInDirectory": lambda arguments: self.removeFilesInDirectory(arguments[0]),
+            "HMRemoveFileOrDirectory": lambda arguments: self.removeFileOrDirectory(arguments[0]),
+            "HMArgString": lambda arguments: self.argument(int(arguments[0])),
+            "HMArgPointer": lambda arguments: self.argument(int(arguments[0])),
+            "HMLookUpClass": lambda arguments: self.lookUpClassAddress(arguments[0]),
+        }
+        unknownHelpers = [name for name in list(self.recordHandlers) + list(self.valueHandlers) if name not in gLibraryFunctions]
+        assert len(unknownHelpers) == 0, f"Not functions of HMExpressionLibrary: {unknownHelpers}"
+
+    # Model
+
+    def makeSelectors(self) -> List[str]:
+        selectors = []
+        for verb in gVerbs:
+            for word in gWords:
+                selectors.append(f"{verb}{word}")
+                selectors.append(f"{verb}{word}:")
+                selectors.append(f"{verb}{word}:animated:")
+        return selectors
+
+    def makeClasses(self, classCount: int) -> None:
+        for name, superclassName, image in gCoreClasses:
+            self.addClass(name, self.classIndexes[superclassName] if superclassName else -1, image)
+
+        weights = [weight for _, _, weight in gImages]
+        while len(self.classNames) < classCount:
+            image, prefix, _ = self.random.choices(gImages, weights)[0]
+            suffix = self.random.choice(gSuffixes)
+            name = f"{prefix}{self.random.choice(gWords)}{self.random.choice(gWords)}{suffix}"
+            if name in self.classIndexes:
+                name += str(len(self.classNames))
+
+            # Prefer the matching UIKit superclass, the hierarchy stays shallow like a real one
+            if suffix.endswith("ViewController") and self.random.random() < 0.7:
+                superclass = self.classIndexes["UIViewController"]
+            elif suffix in ("View", "Cell") and self.random.random() < 0.7:
+                superclass = self.classIndexes["UIView"]
+            else:
+                superclass = self.random.randrange(len(self.classNames))
+            self.addClass(name, superclass, image)
+
+    def loadImage(self, image: str, classCount: int) -> None:
+        # Like dlopen of a framework with classCount classes, the caller broadcasts the module event
+        for i in range(classCount):
+            name = f"{image}.{self.random.choice(gWords)}{self.random.choice(gSuffixes)}{i}"
+            superclass = self.classIndexes["UIViewController" if name.endswith("Controller") else "NSObject"]
+            self.addClass(name, superclass, image)
+
+    def addClass(self, name: str, superclass: int, image: str, address: Optional[int] = None) -> int:
+        # address: In the data of the image by default
+        self.prefixes = None
+        index = len(self.classNames)
+        self.classNames.append(name)
+        self.classSuperclasses.append(superclass)
+        self.classImages.append(image)
+        self.classIndexes[name] = index
+        if image not in self.imageBases:
+            self.imageBases[image] = kImageAddressBase + len(self.imageBases) * kImageSize
+            self.imageClassCounts[image] = 0
+        if address is None:
+            address = self.imageBases[image] + kClassOffset + self.imageClassCounts[image] * 0x40
+            self.imageClassCounts[image] += 1
+        self.classAddresses.append(address)
+        self.addressIndexes[address] = index
+        return index
+
+    def classAddress(self, index: int) -> int:
+        return self.classAddresses[index]
+
+    def methodIMP(self, index: int, methodIndex: int, isMeta: bool) -> int:
+        image = self.classImages[index]
+        offset = (self.classAddress(index) - self.imageBases[image] - kClassOffset) * 8 + methodIndex * 16 + isMeta * 8
+        return self.imageBases[image] + kIMPOffset + offset % (kImageSize - kIMPOffset)
+
+    def methodsOfClass(self, index: int, isMeta: bool) -> List[Tuple[str, str]]:
+        # Deterministic per class, generated on demand to keep large models small
+        name = self.classNames[index]
+        methods = [(selector, "v16@0:8") for selector in gCoreMethods.get(name, []) if not isMeta]
+        generator = random.Random(self.seed * 1000003 + index * 2 + isMeta)
+        count = self.methodCount // 4 if isMeta else self.methodCount
+        for selector in generator.sample(self.selectors, min(count, len(self.selectors))):
+            methods.append((selector, "v24@0:8@16" if selector.endswith(":") else "v16@0:8"))
+        methods.extend(self.addedMethods.get((name, isMeta), []))
+        self.work += len(methods)
+        return methods
+
+    def classPrefixes(self) -> List[str]:
+        # HMCollectClassPrefixes visits every class once per process
+        if self.prefixes is None:
+            self.prefixes = []
+            self.work += len(self.classNames)
+            for name in self.classNames:
+                if "." in name:
+                    prefix = name.split(".", 1)[0]
+                    if prefix not in self.prefixes:
+                        self.prefixes.append(prefix)
+        return self.prefixes
+
+    def lookUpClass(self, name: str) -> int:
+        index = self.classIndexes.get(name, -1)
+        if index < 0:
+            for prefix in self.classPrefixes():
+                self.work += 1
+                index = self.classIndexes.get(f"{prefix}.{name}", -1)
+                if index >= 0:
+                    break
+        if index >= 0 and self.registeredClasses.get(self.classNames[index], True) is False:
+            return -1
+        return index
+
+    def lookUpClassAddress(self, name: str) -> str:
+        # HMLookUpClass
+        index = self.lookUpClass(name)
+        return f"0x{self.classAddress(index):x}" if index >= 0 else "0x0"
+
+    def makeSandbox(self, fileCount: int) -> None:
+        directories = [self.homeDirectory]
+        for path in ["Documents", "Library", "Library/Caches", "Library/Preferences", "tmp", "SystemData"]:
+            directories.append(f"{self.homeDirectory}/{path}")
+        for directory in directories:
+            self.files[directory] = set()
+            if directory != self.homeDirectory:
+                parent, name = directory.rsplit("/", 1)
+                self.files[parent].add(name)
+
+        for i in range(fileCount):
+            directory = self.random.choice(directories[1:])
+            if self.random.random() < 0.2:
+                subdirectory = f"{directory}/folder{i % 7}"
+                if subdirectory not in self.files:
+                    self.files[subdirectory] = set()
+                    self.files[directory].add(f"folder{i % 7}")
+                directory = subdirectory
+            self.files[f"{directory}/file{i}.dat"] = None
+            self.files[directory].add(f"file{i}.dat")
+
+    def removeFile(self, path: str) -> bool:
+        if path not in self.files:
+            return False
+        for child in list(self.files[path] or []):
+            self.removeFile(f"{path}/{child}")
+        del self.files[path]
+        parent, name = path.rsplit("/", 1)
+        self.files.get(parent, set()).discard(name)
+        self.work += 1
+        return True
+
+    # Mach-O
+
+    def mainExecutable(self) -> str:
+        return kMainExecutable
+
+    def modules(self) -> List[Tuple[str, str, int, Dict[str, Tuple[int, int, List[Tuple[str, int, int]]]]]]:
+        # [(path, UUID, header address, {segment: (address, size, [(section, address, size)])})],
+        # the memory of the classes is laid out like objc4 does
+        if self.machOClassCount != len(self.classNames):
+            startTime = time.perf_counter()
+            self.makeMachOMemory()
+            self.seconds += time.perf_counter() - startTime
+        return self.machOModules
+
+    def imageUUID(self, image: str, classCount: int) -> str:
+        # Stable for the same seed and classes of the image, like the same build
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{image}/{self.seed}/{classCount}")).upper()
+
+    def makeMachOMemory(self) -> None:
+        for start in self.machORegions:
+            self.deallocateMemory(start)
+
+        classData = {image: bytearray(count * 0x40) for image, count in self.imageClassCounts.items()}
+        machOData = bytearray()
+        classLists: Dict[str, List[int]] = {}
+
+        def append(data: bytes) -> int:
+            address = kMachOAddressBase + len(machOData)
+            machOData.extend(data)
+            machOData.extend(bytes(-len(machOData) % 8))
+            return address
+
+        for index, name in enumerate(self.classNames):
+            if name in self.registeredClasses:
+                # Created at run time, not in a class list
+                continue
+            if "." in name:
+                module, className = name.split(".", 1)
+                module = "s" if module == "Swift" else f"{len(module)}{module}"
+                name = f"_TtC{module}{len(className)}{className}"
+            nameAddress = append(name.encode("utf-8") + b"\0")
+            ro = append(struct.pack("<IIIIQQ", 0x80 if index % 5 else 0, 8, 16, 0, 0, nameAddress) + bytes(24))
+            # Some classes are realized, their data is a class_rw_t, some of them with a class_rw_ext_t
+            if index % 3 == 0:
+                data = append(struct.pack("<IIQ", 0x80000000 | 0x19, 7, ro))
+            elif index % 3 == 1:
+                rwExt = append(struct.pack("<QQ", ro, 0))
+                data = append(struct.pack("<IIQ", 0x80000000 | 0x19, 7, rwExt | 1))
+            else:
+                data = ro
+            superclass = self.classSuperclasses[index]
+            superclassAddress = self.classAddress(superclass) if superclass >= 0 else 0
+            image = self.classImages[index]
+            offset = self.classAddress(index) - self.imageBases[image] - kClassOffset
+            classData[image][offset:offset + 40] = struct.pack("<QQQQQ", 0, superclassAddress, 0, 0, data | (2 if "." in self.classNames[index] else 0))
+            classLists.setdefault(image, []).append(self.classAddress(index))
+
+        self.machOModules = [("/usr/lib/system/libsystem_kernel.dylib", self.imageUUID("libsystem_kernel", 0), kImageAddressBase - kImageSize, {})]
+        for image, classes in classLists.items():
+            base = self.imageBases[image]
+            address = append(struct.pack(f"<{len(classes)}Q", *classes))
+            self.machOModules.append((image, self.imageUUID(image, len(classes)), base, {
+                "__TEXT": (base + kIMPOffset, kImageSize - kIMPOffset, []),
+                "__DATA": (base + kClassOffset, kIMPOffset - kClassOffset, []),
+                "__DATA_CONST": (address - 8, len(classes) * 8 + 8, [("__objc_imageinfo", address - 8, 8), ("__objc_classlist", address, len(classes) * 8)])
+            }))
+
+        regions = [(self.imageBases[image] + kClassOffset, data) for image, data in classData.items()] + [(kMachOAddressBase, machOData)]
+        self.machORegions = []
+        for start, data in regions:
+            data.extend(bytes(-len(data) % kPageSize))
+            self.memory[start] = data
+            bisect.insort(self.memoryStarts, start)
+            self.machORegions.append(start)
+        self.machOClassCount = len(self.classNames)
+
+    # Memory
+
+    def allocateMemory(self, size: int, error: Optional[lldb.SBError] = None) -> int:
+        address = self.nextMemoryAddress
+        self.nextMemoryAddress += (size + 0x1fff) & ~0xfff  # Page aligned, with a guard page
+        self.memory[address] = bytearray(size)
+        bisect.insort(self.memoryStarts, address)
+        return address
+
+    def deallocateMemory(self, address: int) -> None:
+        if address in self.memory:
+            del self.memory[address]
+            self.memoryStarts.remove(address)
+
+    def memoryRegion(self, address: int, size: int) -> Optional[Tuple[int, bytearray]]:
+        index = bisect.bisect_right(self.memoryStarts, address) - 1
+        if index < 0:
+            return None
+        start = self.memoryStarts[index]
+        region = self.memory[start]
+        if address + size > start + len(region):
+            return None
+        return start, region
+
+    def readMemory(self, address: int, size: int, error: lldb.SBError) -> Optional[bytes]:
+        region = self.memoryRegion(address, size)
+        if region is None:
+            error.SetErrorString(f"memory read failed for 0x{address:x}")
+            return None
+        start, data = region
+        self.bytesRead += size
+        return bytes(data[address - start:address - start + size])
+
+    def writeMemory(self, address: int, data: bytes, error: lldb.SBError) -> int:
+        region = self.memoryRegion(address, len(data))
+        if region is None:
+            error.SetErrorString(f"memory write failed for 0x{address:x}")
+            return 0
+        start, memory = region
+        memory[address - start:address - start + len(data)] = data
+        self.bytesWritten += len(data)
+        return len(data)
+
+    def readCString(self, address: int) -> str:
+        region = self.memoryRegion(address, 1)
+        if region is None:
+            return ""
+        start, data = region
+        end = data.index(b"\0", address - start)
+        return data[address - start:end].decode("utf-8")
+
+    def argument(self, index: int) -> str:
+        pointer = struct.unpack_from("<Q", self.memory[self.argumentsAddress], index * 8)[0]
+        return self.readCString(pointer)
+
+    # Expressions
+
+    def evaluateExpression(self, expression: str, options: lldb.SBExpressionOptions) -> lldb.SBValue:
+        if options.settings.get("TopLevel"):
+            self.helperLibraryLoaded = True
+            self.argumentsAddress = self.allocateMemory(8 * 16)
+            return self.noResult()
+        if expression.strip().startswith("@import"):
+            return self.noResult()
+
+        helpers = self.calledHelpers(expression)
+        variables = [name for name in gLibraryVariables if re.search(rf"\b{name}\b", expression)]
+        if (len(helpers) > 0 or len(variables) > 0) and not self.helperLibraryLoaded:
+            return self.failure("error: use of undeclared identifier, the helper library is not loaded")
+
+        if "HMTransportReset" in helpers:
+            name = next((name for name in self.recordHandlers if name in helpers), None)
+            if name is None:
+                raise HMUnsupportedExpression(f"No record handler for the helpers {helpers} of: {expression.strip()[:200]}")
+            records = self.recordHandlers[name](expression)
+            if records is None:
+                return self.failure("error: use of undeclared identifier")
+            return self.pointer(self.writeTransport(records))
+        if len(helpers) > 0:
+            # The helpers that read the arguments are only evaluated as arguments of other helpers
+            name = next((name for name in self.valueHandlers if name in helpers and name not in gArgumentHelpers), None)
+            if name is None:
+                raise HMUnsupportedExpression(f"No value handler for the helpers {helpers} of: {expression.strip()[:200]}")
+            return self.sbValue(self.callHelper(name, self.callArguments(expression, name)[0], expression))
+        if variables == ["HMArgs"] and not re.search(r"\bHMArgs\s*\[", expression):
+            # HMLLDBHelpers.injectHelperLibrary reads the address of HMArgs
+            return self.pointer(self.argumentsAddress)
+        if len(variables) > 0:
+            raise HMUnsupportedExpression(f"No handler for the variables {variables} of: {expression.strip()[:200]}")
+
+        # Plain Objective-C, e.g. the UI of the debug HUD, is not simulated. BOOL results are YES.
+        resultType = plainResultType(expression)
+        if resultType == "void":
+            return self.noResult()
+        if resultType == "BOOL":
+            return self.boolean(True)
+        return self.pointer(self.newObject())
+
+    def calledHelpers(self, expression: str) -> List[str]:
+        # The functions of the helper library called by the expression, in order of appearance
+        helpers = []
+        for name in re.findall(r"\b(HM\w+)\s*\(", expression):
+            if name not in gLibraryFunctions:
+                raise HMUnsupportedExpression(f"{name} is not a function of HMExpressionLibrary: {expression.strip()[:200]}")
+            if name not in helpers:
+                helpers.append(name)
+        return helpers
+
+    def callArguments(self, expression: str, name: str) -> List[List[str]]:
+        # The arguments of each call of the helper, split at the top-level commas
+        calls = []
+        for match in re.finditer(rf"\b{name}\s*\(", expression):
+            arguments = []
+            depth = 0
+            start = match.end()
+            quoted = False
+            for position in range(match.end(), len(expression)):
+                character = expression[position]
+                if character == '"' and expression[position - 1] != "\\":
+                    quoted = not quoted
+                elif quoted:
+                    continue
+                elif character in "([{":
+                    depth += 1
+                elif character in ")]}" and depth > 0:
+                    depth -= 1
+                elif character == ")" or (character == "," and depth == 0):
+                    argument = expression[start:position].strip()
+                    if len(argument) > 0:
+                        arguments.append(argument)
+                    start = position + 1
+                    if character == ")":
+                        break
+            calls.append(arguments)
+        return calls
+
+    def evaluateArgument(self, argument: str, expression: str) -> Optional[str]:
+        # Value of an argument of a helper as a string, pointers are "0x..." strings.
+        # None for the receivers that the caller evaluates, e.g. "self" or "[UIView class]".
+        argument = stripCasts(argument)
+        match = re.fullmatch(r"HMArgs\s*\[\s*(\d+)\s*\]", argument)
+        if match is not None:
+            return self.argument(int(match.group(1)))
+        if re.fullmatch(r'"[^"]*"', argument) or re.fullmatch(r"\d+(\.\d+)?", argument):
+            return argument.strip('"')
+        if argument in ["YES", "NO"]:
+            return "1" if argument == "YES" else "0"
+        match = re.fullmatch(r"@encode\((.*)\)", argument, re.S)
+        if match is not None:
+            return match.group(1).strip()
+        match = re.fullmatch(r"(HM\w+)\s*\(.*\)", argument, re.S)
+        if match is not None:
+            name = match.group(1)
+            if name not in self.valueHandlers:
+                raise HMUnsupportedExpression(f"No value handler for {name} in: {expression.strip()[:200]}")
+            return self.callHelper(name, self.callArguments(argument, name)[0], expression)
+        declaration = re.search(rf"\b{re.escape(argument)}\s*=\s*([^;]*);", expression) if re.fullmatch(r"[A-Za-z_]\w*", argument) else None
+        if declaration is not None:
+            # A variable of the expression, e.g. "inputClass" of HMClassResolver.classStatement
+            return self.evaluateArgument(declaration.group(1), expression)
+        return None
+
+    def callHelper(self, name: str, arguments: List[str], expression: str) -> Any:
+        return self.valueHandlers[name]([self.requiredArgument(argument, expression) for argument in arguments])
+
+    def sbValue(self, result: Any) -> lldb.SBValue:
+        # bool for BOOL helpers, "0x..." for pointers, None for void
+        if result is None:
+            return self.noResult()
+        if isinstance(result, bool):
+            return self.boolean(result)
+        if re.fullmatch(r"0x[0-9a-f]+", result):
+            return self.pointer(int(result, 16))
+        return lldb.SBValue(f"0x{self.newObject():x}", result, lldb.SBError())
+
+    def batchRecords(self, expression: str) -> List[str]:
+        # HMLLDBHelpers.evaluateExpressionsDescription, the items must call a helper
+        records = []
+        for arguments in self.callArguments(expression, "HMAppendBatchItem"):
+            records.append("1" + self.requiredArgument(arguments[0], expression))
+        return records
+
+    def argumentsOf(self, expression: str, name: str) -> List[str]:
+        # The evaluated arguments of the first call of the helper
+        return [self.requiredArgument(argument, expression) for argument in self.callArguments(expression, name)[0]]
+
+    def requiredArgument(self, argument: str, expression: str) -> str:
+        value = self.evaluateArgument(argument, expression)
+        if value is None:
+            raise HMUnsupportedExpression(f"Unable to evaluate the argument {argument} in: {expression.strip()[:200]}")
+        return value
+
+    # Handlers
+
+    def classList(self) -> List[int]:
+        # objc_copyClassList
+        return [index for index, name in enumerate(self.classNames) if self.registeredClasses.get(name, True) is not False]
+
+    def classIndexRecords(self, start: int, count: int) -> List[str]:
+        classList = self.classList()
+        records = [str(len(classList))]
+        imageIndexes: Dict[str, int] = {}
+        for index in classList[start:start + count]:
+            name = self.classNames[index]
+            image = self.classImageName(index)
+            if image not in imageIndexes:
+                imageIndexes[image] = len(imageIndexes)
+                records.append(f"image{kFieldSeparator}{image}")
+            superclass = self.classSuperclasses[index]
+            superclassAddress = self.classAddress(superclass) if superclass >= 0 else 0
+            records.append(kFieldSeparator.join([name, f"0x{self.classAddress(index):x}", f"0x{superclassAddress:x}", str(imageIndexes[image])]))
+        self.work += len(classList[start:start + count])
+        return records
+
+    def classImageName(self, index: int) -> str:
+        # class_getImageName, NULL for the classes created by objc_allocateClassPair
+        return "" if self.classNames[index] in self.registeredClasses else self.classImages[index]
+
+    def runtimeClassRecords(self, expectedCount: int) -> List[str]:
+        # HMClassIndex.updateRuntimeClasses
+        classList = self.classList()
+        records = [str(len(classList))]
+        if len(classList) == expectedCount:
+            return records
+        for index in classList:
+            if self.classImageName(index) != "":
+                continue
+            superclass = self.classSuperclasses[index]
+            superclassAddress = self.classAddress(superclass) if superclass >= 0 else 0
+            records.append(kFieldSeparator.join([self.classNames[index], f"0x{self.classAddress(index):x}", f"0x{superclassAddress:x}", "0"]))
+        self.work += len(classList)
+        return records
+
+    def imageClassRecords(self, images: List[str]) -> List[str]:
+        records = []
+        for imageIndex, image in enumerate(images):
+            for index, name in enumerate(self.classNames):
+                if self.classImages[index] != image or self.registeredClasses.get(name, True) is False:
+                    continue
+                superclass = self.classSuperclasses[index]
+                superclassAddress = self.classAddress(superclass) if superclass >= 0 else 0
+                records.append(kFieldSeparator.join([name, f"0x{self.classAddress(index):x}", f"0x{superclassAddress:x}", str(imageIndex)]))
+                self.work += 1
+        return records
+
+    def classProtocols(self, index: int) -> List[str]:
+        name = self.classNames[index]
+        if name in gCoreProtocols:
+            return gCoreProtocols[name]
+        protocols = []
+        if name.endswith("ViewController") and index % 3 == 0:
+            protocols = [f"{kSwiftModule}.FeedDataSource"] if name.startswith(kSwiftModule) else ["UITableViewDataSource", "UITableViewDelegate"]
+        elif name.endswith("View") and index % 4 == 0:
+            protocols = ["UICollectionViewDataSource", "UICollectionViewDelegate"]
+        if index % 5 == 0:
+            protocols.append("NSSecureCoding")
+        if index % 7 == 0:
+            protocols.append("NSCopying")
+        return protocols
+
+    def protocolRecords(self, dumpProtocols: bool, images: List[str], classAddresses: List[str]) -> List[str]:
+        records = []
+        adoptedProtocols: Set[str] = set()
+        # objc_copyClassNamesForImage finds no classes created at run time, they are passed by address
+        imageSet = {image for image in images if len(image) > 0}
+        addressSet = {int(address, 16) for address in classAddresses if len(address) > 0}
+        for index in self.classList():
+            if self.classImageName(index) not in imageSet and self.classAddress(index) not in addressSet:
+                continue
+            self.work += 1
+            protocols = self.classProtocols(index)
+            if len(protocols) > 0:
+                records.append(f"0x{self.classAddress(index):x}{kFieldSeparator}{','.join(protocols)}")
+                adoptedProtocols.update(protocols)
+
+        # All protocols, or the adopted protocols and the protocols they inherit
+        parentsOfProtocols = dict(gProtocols)
+        pending = list(parentsOfProtocols) if dumpProtocols else sorted(adoptedProtocols)
+        visited: Set[str] = set()
+        while len(pending) > 0:
+            name = pending.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            parents = parentsOfProtocols.get(name, [])
+            pending.extend(parents)
+            records.append(kFieldSeparator.join(["protocol", name, ",".join(parents)]))
+            self.work += 1
+        return records
+
+    def methodRecordsOfClass(self, index: int) -> List[str]:
+        if index < 0:
+            return []
+        records = [f"{self.classNames[index]}{kFieldSeparator}0x{self.classAddress(index):x}"]
+        for isMeta, sign in [(False, "-"), (True, "+")]:
+            for selector, types in self.methodsOfClass(index, isMeta):
+                records.append(kFieldSeparator.join([sign, selector, types]))
+        return records
+
+    def classMethodRecords(self, expression: str) -> List[str]:
+        # "if (inputClass)" guards HMAppendClassMethods
+        address, includeIMP = self.argumentsOf(expression, "HMAppendClassMethods")
+        index = self.addressIndexes.get(int(address, 16), -1)
+        if index < 0:
+            return []
+        if includeIMP == "1":
+            records: List[str] = []
+            self.appendMethodRecords(index, records)
+            return records
+        return self.methodRecordsOfClass(index)
+
+    def methodBatchRecords(self, expression: str) -> List[str]:
+        start, count, runtimeClassesOnly = self.argumentsOf(expression, "HMAppendMethodBatch")
+        return self.selectorIndexRecords(int(start), int(count), runtimeClassesOnly == "1")
+
+    def protocolBatchRecords(self, expression: str) -> List[str]:
+        dumpProtocols, images, classAddresses = self.argumentsOf(expression, "HMAppendProtocols")
+        return self.protocolRecords(dumpProtocols == "1", images.split("\n"), classAddresses.split("\n"))
+
+    def selectorIndexRecords(self, start: int, count: int, runtimeClassesOnly: bool) -> List[str]:
+        # The classes that have an image, then the classes created at run time after "runtime" in the last batch
+        classList = self.classList()
+        records = [str(len(classList))]
+        if not runtimeClassesOnly:
+            for index in classList[start:start + count]:
+                if self.classImageName(index) != "":
+                    self.appendMethodRecords(index, records)
+        if runtimeClassesOnly or start + count >= len(classList):
+            records.append("runtime")
+            for index in classList:
+                if self.classImageName(index) == "":
+                    self.appendMethodRecords(index, records)
+        return records
+
+    def appendMethodRecords(self, index: int, records: List[str]) -> None:
+        records.append(f"{self.classNames[index]}{kFieldSeparator}0x{self.classAddress(index):x}")
+        for isMeta, sign in [(False, "-"), (True, "+")]:
+            for methodIndex, (selector, types) in enumerate(self.methodsOfClass(index, isMeta)):
+                imp = self.methodIMP(index, methodIndex, isMeta)
+                records.append(kFieldSeparator.join([sign, selector, types, f"0x{imp:x}"]))
+
+    def methodDescription(self, index: int, selectorName: str) -> str:
+        lines = [f"<{self.classNames[index]}: 0x{self.classAddress(index):x}>:", f"in {self.classNames[index]}:"]
+        if selectorName == "_propertyDescription":
+            lines.append("\tProperties:")
+            lines.extend(f"\t\t@property (nonatomic) id {selector.rstrip(':')};" for selector, _ in self.methodsOfClass(index, False)[:5])
+        else:
+            for isMeta, title, sign in [(True, "Class Methods", "+"), (False, "Instance Methods", "-")]:
+                lines.append(f"\t{title}:")
+                lines.extend(f"\t\t{sign} (void) {selector}; (0x{kIMPAddressBase:x})" for selector, _ in self.methodsOfClass(index, isMeta))
+        return "\n".join(lines)
+
+    def descriptionRecords(self, expression: str) -> Optional[List[str]]:
+        # The receiver of the methods/properties/ivars commands is a class name, a class address, or an instance
+        receiver, selectorArgument = self.callArguments(expression, "HMAppendDescription")[0]
+        selectorName = self.requiredArgument(selectorArgument, expression)
+        address = self.evaluateArgument(receiver, expression)
+        if address is not None:
+            # Passed as a pointer, or looked up by HMLookUpClass
+            if int(address, 16) == 0:
+                return ["notFound"]
+            index = self.addressIndexes.get(int(address, 16), -1)
+            if index < 0:
+                return self.ivarDescriptionRecords(int(address, 16))
+        else:
+            # The input of the user, evaluated in the selected frame
+            receiver = stripCasts(receiver)
+            match = re.fullmatch(r"\[(.*) class\]", receiver, re.S)
+            if match is None:
+                instance = re.fullmatch(r"0x[0-9a-fA-F]+", receiver)
+                return self.ivarDescriptionRecords(int(receiver, 16) if instance else self.newObject())
+            name = re.sub(r"^\[(\w+) new\]$", r"\1", match.group(1).strip())
+            if name == "self":
+                # The selected frame is a method of UIViewController
+                name = "UIViewController"
+            if re.match(r"^0x[0-9a-fA-F]+$", name):
+                name = "NSObject"
+            index = self.classIndexes.get(name, -1)
+            if index < 0 or "." in self.classNames[index]:
+                # "use of undeclared identifier"
+                return None
+        if index < 0:
+            return ["notFound"]
+        return [f"found{kFieldSeparator}0x{self.classAddress(index):x}", self.methodDescription(index, selectorName)]
+
+    def ivarDescriptionRecords(self, address: int) -> List[str]:
+        return [f"found{kFieldSeparator}0x{address:x}", f"<NSObject: 0x{address:x}>:\nin NSObject:\n\tisa (Class): NSObject (isa, 0x{address:x})"]
+
+    def classSpecRecords(self, expression: str) -> List[str]:
+        # HMLLDBHelpers.registerClassSpec
+        className, superclassName = self.argumentsOf(expression, "HMAllocateSpecClass")
+        if self.lookUpClassExactly(className) >= 0:
+            return ["exists"]
+        address = self.allocateClass(className, superclassName)
+        self.registerClass(address)
+        superclass = self.classSuperclasses[self.addressIndexes[address]]
+        superclassAddress = self.classAddress(superclass) if superclass >= 0 else 0
+        records = [kFieldSeparator.join(["registered", f"0x{address:x}", f"0x{superclassAddress:x}"])]
+        if "HMAppendLazyMethodTrap" in self.calledHelpers(expression):
+            records.append(f"trap{kFieldSeparator}0x{self.trapAddress('HMLazyMethodTrap'):x}")
+        for arguments in self.callArguments(expression, "HMAddSpecMethod"):
+            # (cls, sign, selector, imp, types)
+            sign, selector, types = [self.requiredArgument(arguments[index], expression) for index in [1, 2, 4]]
+            self.nextIMPAddress += 0x20
+            added = self.addMethod(className, selector, types, sign == "+")
+            records.append(kFieldSeparator.join([sign, selector, f"0x{self.nextIMPAddress:x}", "1" if added else "0"]))
+        return records
+
+    def trapAddress(self, name: str) -> int:
+        if name not in self.trapAddresses:
+            self.nextIMPAddress += 0x20
+            self.trapAddresses[name] = self.nextIMPAddress
+        return self.trapAddresses[name]
+
+    def lookUpClassExactly(self, name: str) -> int:
+        index = self.classIndexes.get(name, -1)
+        if index >= 0 and self.registeredClasses.get(name, True) is False:
+            return -1
+        return index
+
+    def allocateClass(self, name: str, superclassName: str) -> int:
+        index = self.classIndexes.get(name, -1)
+        if index < 0:
+            # Allocated on the heap
+            self.nextObjectAddress += 0x40
+            index = self.addClass(name, self.classIndexes.get(superclassName, -1), kMainExecutable, self.nextObjectAddress)
+            self.registeredClasses[name] = False
+        return self.classAddress(index)
+
+    def registerClass(self, address: int) -> None:
+        index = self.addressIndexes.get(address, -1)
+        if index >= 0:
+            self.registeredClasses[self.classNames[index]] = True
+
+    def addMethod(self, className: str, selector: str, types: str, isMeta: bool) -> bool:
+        if self.lookUpClassExactly(className) < 0:
+            return False
+        self.addedMethods.setdefault((className, isMeta), []).append((selector, types))
+        return True
+
+    def sandboxDirectory(self, name: str) -> str:
+        # HMSandboxDirectory
+        if name == "Home":
+            return self.homeDirectory
+        if name == "tmp":
+            return f"{self.homeDirectory}/tmp/"
+        if name in ["Caches", "Preferences"]:
+            return f"{self.homeDirectory}/Library/{name}"
+        if name in ["Documents", "Library"]:
+            return f"{self.homeDirectory}/{name}"
+        raise HMUnsupportedExpression(f"HMSandboxDirectory of {name}")
+
+    def removeFilesInDirectory(self, path: str) -> str:
+        if self.files.get(path) is None:
+            return f"failed to remove non-existing file: {path}\n"
+        result = ""
+        for child in sorted(self.files[path]):
+            self.removeFile(f"{path}/{child}")
+            result += f"removed file: {path}/{child}\n"
+        return result or "There are no files in this directory.\n"
+
+    def removeFileOrDirectory(self, path: str) -> str:
+        if not path.startswith(self.homeDirectory):
+            return "The file path must be in the sandbox\n"
+        if self.removeFile(path):
+            return f"removed file: {path}\n"
+        return f"failed to remove non-existing file: {path}\n"
+
+    def writeTransport(self, records: List[str]) -> int:
+        # Same layout as HMExpressionLibrary: [uint64 payload length] [uint32 length][UTF-8 bytes]...
+        payload = bytearray()
+        for record in records:
+            data = record.encode("utf-8")
+            payload += struct.pack("<I", len(data)) + data
+        if self.transportAddress:
+            self.deallocateMemory(self.transportAddress)
+        self.transportAddress = self.allocateMemory(8 + len(payload))
+        self.memory[self.transportAddress][:] = struct.pack("<Q", len(payload)) + payload
+        return self.transportAddress
+
+    # Values
+
+    def newObject(self) -> int:
+        self.nextObjectAddress += 0x10
+        return self.nextObjectAddress
+
+    def pointer(self, address: int, children: Optional[List[lldb.SBValue]] = None) -> lldb.SBValue:
+        return lldb.SBValue(f"0x{address:x}", f"<NSObject: 0x{address:x}>", lldb.SBError(), children)
+
+    def boolean(self, value: bool) -> lldb.SBValue:
+        return lldb.SBValue("YES" if value else "NO", "YES" if value else "NO", lldb.SBError())
+
+    def noResult(self) -> lldb.SBValue:
+        return lldb.SBValue(None, None, lldb.SBError("error: Expression evaluation produced no result", lldb.kNoResult))
+
+    def failure(self, message: str) -> lldb.SBValue:
+        return lldb.SBValue(None, None, lldb.SBError(message, lldb.eExpressionParseError))
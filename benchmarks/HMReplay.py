@@ -0,0 +1,260 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Replays traces recorded by the hmtrace command against the command functions, no device is needed.
+# Usage: python3 benchmarks/HMReplay.py /tmp/hmtrace.json [--repeat 10] [--profile]
+
+import contextlib
+import cProfile
+import difflib
+import io
+import json
+import optparse
+import pstats
+import sys
+import time
+from typing import Any, Dict, List, Optional
+import lldb
+import HMBenchmark
+import HMBenchmarkRuntime
+
+
+class HMReplayDivergence(Exception):
+    # The command evaluated something else than the recorded session
+    pass
+
+
+class HMReplayRuntime(HMBenchmarkRuntime.HMRuntime):
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: List[Dict[str, Any]] = []
+        self.position = 0
+        self.recordedSeconds = 0.0  # Time of the expressions in the recorded session
+
+    def load(self, events: List[Dict[str, Any]]) -> None:
+        self.events = events
+        self.position = 0
+        self.recordedSeconds = 0.0
+
+    def remainingEvents(self) -> int:
+        return len(self.events) - self.position
+
+    def nextEvent(self, kind: str, summary: str) -> Dict[str, Any]:
+        if self.position >= len(self.events):
+            raise HMReplayDivergence(f"Unexpected {kind} after the end of the trace: {summary}")
+        event = self.events[self.position]
+        if event["kind"] != kind:
+            raise HMReplayDivergence(f"Event {self.position}: expected {event['kind']}, got {kind}: {summary}")
+        self.position += 1
+        return event
+
+    def evaluateExpression(self, expression: str, options: lldb.SBExpressionOptions) -> lldb.SBValue:
+        event = self.nextEvent("expression", expression.strip()[:200])
+        if event["expression"] != expression:
+            diff = difflib.unified_diff(event["expression"].splitlines(), expression.splitlines(), "recorded", "replayed", lineterm="")
+            raise HMReplayDivergence(f"Event {self.position - 1}: the expression differs\n" + "\n".join(list(diff)[:40]))
+
+        self.recordedSeconds += event["seconds"]
+        error = lldb.SBError(event["error"], event["errorCode"])
+        children = [lldb.SBValue(None, description, lldb.SBError()) for description in event["children"]]
+        return lldb.SBValue(event["value"], event["description"], error, children)
+
+    def readMemory(self, address: int, size: int, error: lldb.SBError) -> Optional[bytes]:
+        event = self.nextEvent("read", f"0x{address:x} ({size} bytes)")
+        if event["address"] != address or event["size"] != size:
+            raise HMReplayDivergence(f"Event {self.position - 1}: expected a read of 0x{event['address']:x} ({event['size']} bytes), got 0x{address:x} ({size} bytes)")
+        if event["error"] is not None:
+            error.SetErrorString(event["error"])
+            return None
+        self.bytesRead += size
+        return bytes.fromhex(event["data"])
+
+    def writeMemory(self, address: int, data: bytes, error: lldb.SBError) -> int:
+        # Writes only pass expression arguments, the recorded expressions already reflect them
+        self.bytesWritten += len(data)
+        return len(data)
+
+    def allocateMemory(self, size: int, error: Optional[lldb.SBError] = None) -> int:
+        event = self.nextEvent("allocate", f"{size} bytes")
+        if event["error"] is not None and error is not None:
+            error.SetErrorString(event["error"])
+        return event["address"]
+
+    def deallocateMemory(self, address: int) -> None:
+        pass
+
+    def handleCommand(self, command: str, debugger: lldb.SBDebugger) -> None:
+        event = self.nextEvent("command", command)
+        if event["command"] != command:
+            raise HMReplayDivergence(f"Event {self.position - 1}: expected the command \"{event['command']}\", got \"{command}\"")
+        if command.startswith("expression"):
+            self.evaluations += 1
+            self.bytesSent += len(command.encode("utf-8"))
+        elif command.startswith("process continue"):
+            debugger.GetSelectedTarget().GetProcess().stopID += 1
+
+
+def main() -> int:
+    parser = generate_option_parser()
+    (options, args) = parser.parse_args()
+    if len(args) != 1:
+        parser.print_usage()
+        return 2
+
+    with open(args[0], "r") as file:
+        traceData = json.load(file)
+
+    profiler = cProfile.Profile() if options.profile else None
+    results: List[List[Dict[str, Any]]] = [[] for _ in traceData["commands"]]  # Results of each traced command
+    try:
+        for _ in range(options.repeat):
+            for index, result in enumerate(replay(traceData, profiler, options.verbose)):
+                results[index].append(result)
+    except HMReplayDivergence as error:
+        print(f"Replay diverged from the trace: {error}", file=sys.stderr)
+        return 1
+
+    printResults(results)
+    if profiler is not None:
+        stats = pstats.Stats(profiler)
+        stats.sort_stats("cumulative").print_stats(options.profileLimit)
+    return 0
+
+
+def replay(traceData: Dict[str, Any], profiler: Optional[cProfile.Profile], verbose: bool) -> List[Dict[str, Any]]:
+    # The commands of the trace are replayed in order in one process, like the recorded session
+    runtime = HMReplayRuntime()
+    processUID = traceData["processUID"]
+    debugger, _ = lldb.makeDebugger(runtime, processUID)
+    HMBenchmark.loadCommands(debugger)
+
+    results = []
+    for tracedCommand in traceData["commands"]:
+        restoreState(tracedCommand["state"], processUID)
+        runtime.load(tracedCommand["events"])
+        runtime.resetCounters()
+
+        output = io.StringIO()
+        if profiler is not None:
+            profiler.enable()
+        startTime = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            debugger.HandleCommand(tracedCommand["command"])
+        seconds = time.perf_counter() - startTime
+        if profiler is not None:
+            profiler.disable()
+
+        if runtime.remainingEvents() > 0:
+            raise HMReplayDivergence(f"\"{tracedCommand['command']}\" finished with {runtime.remainingEvents()} events left in the trace")
+        if verbose:
+            print(f"===== {tracedCommand['command']} =====")
+            print(output.getvalue())
+
+        counters = runtime.counters()
+        result = {
+            "command": tracedCommand["command"],
+            "pythonSeconds": seconds - counters["runtimeSeconds"],
+            "recordedSeconds": runtime.recordedSeconds
+        }
+        result.update(counters)
+        results.append(result)
+    return results
+
+
+def restoreState(state: Dict[str, Any], processUID: int) -> None:
+    # The reverse of HMTrace.traceState
+    HM = sys.modules["HMLLDBHelpers"]
+    if state["prepared"]:
+        HM.gPreparedProcessUIDs.add(processUID)
+    else:
+        HM.gPreparedProcessUIDs.discard(processUID)
+    HM.gHelperLibraryProcessUID = processUID if state["helperLibrary"] else 0
+
+    if state["argumentsAddress"] is None:
+        HM.gArgumentsAddresses.pop(processUID, None)
+    else:
+        HM.gArgumentsAddresses[processUID] = state["argumentsAddress"]
+    if state["argumentsArena"] is None:
+        HM.gArgumentsArenas.pop(processUID, None)
+    else:
+        HM.gArgumentsArenas[processUID] = tuple(state["argumentsArena"])
+
+    HM.gClassPrefixes = list(state["classPrefixes"])
+    HM.gClassPrefixesProcessUID = processUID if state["classPrefixesCollected"] else 0
+    HM.clearExpressionCache()
+    if "HMClassIndex" in sys.modules:
+        sys.modules["HMClassIndex"].clearClassIndex()
+    if "HMSelectorIndex" in sys.modules:
+        sys.modules["HMSelectorIndex"].clearSelectorIndex()
+    if "HMProtocolIndex" in sys.modules:
+        sys.modules["HMProtocolIndex"].clearProtocolIndex()
+    if "HMClassInfoCommands" in sys.modules:
+        sys.modules["HMClassInfoCommands"].clearDescriptions()
+    if "HMClassResolver" in sys.modules:
+        sys.modules["HMClassResolver"].clearResolvedClasses()
+    if "HMDiskCache" in sys.modules:
+        # The trace has been recorded without the disk cache
+        sys.modules["HMDiskCache"].gCacheDirectory = None
+
+
+def printResults(results: List[List[Dict[str, Any]]]) -> None:
+    print(f"{'command':<40}{'evals':>7}{'failed':>7}{'bytes':>11}{'recorded s':>12}{'python ms':>11}")
+    for items in results:
+        first = items[0]
+        command = first["command"]
+        pythonSeconds = sum(item["pythonSeconds"] for item in items) / len(items)
+        print(f"{command[:39]:<40}{first['evaluations']:>7}{first['failedEvaluations']:>7}{first['bytes']:>11}"
+              f"{first['recordedSeconds']:>12.3f}{pythonSeconds * 1000:>11.2f}")
+    print("recorded s: time of the expressions in the recorded session. python ms: mean of the replays")
+
+
+def generate_option_parser() -> optparse.OptionParser:
+    usage = "usage: HMReplay.py [--repeat <count>] [--profile] <trace.json>"
+    parser = optparse.OptionParser(usage=usage, prog="HMReplay.py")
+    parser.add_option("-r", "--repeat",
+                      action="store",
+                      type="int",
+                      default=1,
+                      dest="repeat",
+                      help="Replay the trace several times")
+    parser.add_option("-p", "--profile",
+                      action="store_true",
+                      default=False,
+                      dest="profile",
+                      help="Profile the Python side of the commands with cProfile")
+    parser.add_option("--profile-limit",
+                      action="store",
+                      type="int",
+                      default=30,
+                      dest="profileLimit",
+                      help="Number of functions printed by --profile")
+    parser.add_option("-v", "--verbose",
+                      action="store_true",
+                      default=False,
+                      dest="verbose",
+                      help="Print the output of the commands")
+
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(main())
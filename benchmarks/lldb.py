@@ -0,0 +1,550 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Stand-in for the lldb module, only used by the benchmarks.
+# It implements the subset of the SB API that HMLLDB uses, expressions are evaluated by an HMBenchmarkRuntime.HMRuntime.
+
+import importlib
+import os
+import shlex
+import sys
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+eExpressionCompleted = 0
+eExpressionSetupError = 1
+eExpressionParseError = 2
+eExpressionDiscarded = 3
+eExpressionInterrupted = 4
+eExpressionHitBreakpoint = 5
+eExpressionTimedOut = 6
+eExpressionResultUnavailable = 7
+eExpressionStoppedForDebug = 8
+
+ePermissionsWritable = 1
+ePermissionsReadable = 2
+ePermissionsExecutable = 4
+
+eLanguageTypeObjC_plus_plus = 0x0011
+eStateStopped = 5
+eStateDetached = 9
+eStateExited = 10
+
+kNoResult = 0x1001
+
+debugger: Optional["SBDebugger"] = None
+
+
+def __getattr__(name: str) -> Any:
+    # Type annotations and constants that the benchmarks never exercise
+    if name.startswith("SB"):
+        placeholder = type(name, (object,), {})
+        globals()[name] = placeholder
+        return placeholder
+    if name.startswith("e"):
+        return 0
+    raise AttributeError(name)
+
+
+class SBError(object):
+    def __init__(self, message: Optional[str] = None, value=0) -> None:
+        self.message = message
+        self.value = value
+
+    @property
+    def success(self) -> bool:
+        return self.message is None
+
+    def Success(self) -> bool:
+        return self.success
+
+    def Fail(self) -> bool:
+        return not self.success
+
+    def GetError(self) -> int:
+        return self.value
+
+    def GetCString(self) -> Optional[str]:
+        return self.message
+
+    def SetErrorString(self, message: str) -> None:
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message if self.message is not None else "success"
+
+
+class SBValue(object):
+    def __init__(self, value: Optional[str] = None, description: Optional[str] = None, error: Optional[SBError] = None, children: Optional[List["SBValue"]] = None) -> None:
+        self.value = value
+        self.description = description
+        self.error = error if error is not None else SBError("error: invalid value")
+        self.children = children or []
+
+    def IsValid(self) -> bool:
+        return self.error.success
+
+    def GetError(self) -> SBError:
+        return self.error
+
+    def GetValue(self) -> Optional[str]:
+        return self.value
+
+    def GetValueAsUnsigned(self, failValue=0) -> int:
+        return parseInteger(self.value, failValue)
+
+    def GetValueAsSigned(self, failValue=0) -> int:
+        return parseInteger(self.value, failValue)
+
+    def GetObjectDescription(self) -> Optional[str]:
+        if self.description is not None:
+            debugger.runtime.bytesDescribed += len(self.description.encode("utf-8"))
+        return self.description
+
+    def GetSummary(self) -> Optional[str]:
+        return self.description
+
+    def GetNumChildren(self) -> int:
+        return len(self.children)
+
+    def GetChildAtIndex(self, index: int) -> "SBValue":
+        return self.children[index]
+
+
+def parseInteger(value: Optional[str], failValue=0) -> int:
+    if value is None:
+        return failValue
+    if value in ("YES", "true"):
+        return 1
+    if value in ("NO", "false"):
+        return 0
+    try:
+        return int(value, 0)
+    except ValueError:
+        return failValue
+
+
+class SBExpressionOptions(object):
+    def __init__(self) -> None:
+        self.settings: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Callable:
+        # SetXxx(value) stores the option, GetXxx() returns it
+        if name.startswith("Set"):
+            return lambda value: self.settings.__setitem__(name[3:], value)
+        if name.startswith("Get"):
+            return lambda: self.settings.get(name[3:])
+        raise AttributeError(name)
+
+
+class SBEvent(object):
+    def __init__(self, eventType=0, broadcaster: Optional["SBBroadcaster"] = None, data: Any = None) -> None:
+        self.eventType = eventType
+        self.broadcaster = broadcaster
+        self.data = data
+
+    def GetType(self) -> int:
+        return self.eventType
+
+
+class SBListener(object):
+    def __init__(self, name="") -> None:
+        self.name = name
+        self.events: List[SBEvent] = []
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetNextEvent(self, event: SBEvent) -> bool:
+        if len(self.events) == 0:
+            return False
+        nextEvent = self.events.pop(0)
+        event.eventType, event.broadcaster, event.data = nextEvent.eventType, nextEvent.broadcaster, nextEvent.data
+        return True
+
+
+class SBBroadcaster(object):
+    def __init__(self, owner: Any) -> None:
+        self.owner = owner
+        self.listeners: List[Tuple[SBListener, int]] = []
+
+    def AddListener(self, listener: SBListener, eventMask: int) -> int:
+        self.listeners.append((listener, eventMask))
+        return eventMask
+
+    def RemoveListener(self, listener: SBListener, eventMask=0xffffffff) -> bool:
+        count = len(self.listeners)
+        self.listeners = [(other, mask) for other, mask in self.listeners if other is not listener]
+        return len(self.listeners) < count
+
+    def broadcast(self, eventType: int, data: Any) -> None:
+        for listener, eventMask in self.listeners:
+            if eventType & eventMask:
+                listener.events.append(SBEvent(eventType, self, data))
+
+
+class SBFileSpec(object):
+    def __init__(self, path: Optional[str]) -> None:
+        self.fullpath = path
+
+    def IsValid(self) -> bool:
+        return self.fullpath is not None
+
+    def GetFilename(self) -> Optional[str]:
+        return os.path.basename(self.fullpath) if self.fullpath is not None else None
+
+
+class SBSection(object):
+    def __init__(self, name: Optional[str] = None, address=0, size=0, subsections: Optional[List["SBSection"]] = None) -> None:
+        self.name = name
+        self.address = address
+        self.size = size
+        self.subsections = subsections or []
+
+    def IsValid(self) -> bool:
+        return self.name is not None
+
+    def GetName(self) -> Optional[str]:
+        return self.name
+
+    def GetNumSubSections(self) -> int:
+        return len(self.subsections)
+
+    def GetSubSectionAtIndex(self, index: int) -> "SBSection":
+        return self.subsections[index]
+
+    def GetLoadAddress(self, target: "SBTarget") -> int:
+        return self.address
+
+    def GetByteSize(self) -> int:
+        return self.size
+
+
+class SBAddress(object):
+    def __init__(self, address: Optional[int] = None) -> None:
+        self.address = address
+
+    def IsValid(self) -> bool:
+        return self.address is not None
+
+    def GetLoadAddress(self, target: "SBTarget") -> int:
+        return self.address if self.address is not None else 0xffffffffffffffff
+
+
+class SBModule(object):
+    def __init__(self, path: str, uuid: Optional[str] = None, headerAddress: Optional[int] = None, segments: Optional[Dict[str, Tuple[int, int, List[Tuple[str, int, int]]]]] = None) -> None:
+        self.path = path
+        self.uuid = uuid
+        self.headerAddress = headerAddress
+        self.segments = [self.makeSegment(name, segment) for name, segment in (segments or {}).items()]
+
+    @staticmethod
+    def makeSegment(name: str, segment: Tuple[int, int, List[Tuple[str, int, int]]]) -> SBSection:
+        address, size, sections = segment
+        return SBSection(name, address, size, [SBSection(sectionName, sectionAddress, sectionSize) for sectionName, sectionAddress, sectionSize in sections])
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetUUIDString(self) -> Optional[str]:
+        return self.uuid
+
+    def GetObjectFileHeaderAddress(self) -> SBAddress:
+        return SBAddress(self.headerAddress)
+
+    def GetNumSections(self) -> int:
+        return len(self.segments)
+
+    def GetSectionAtIndex(self, index: int) -> SBSection:
+        return self.segments[index]
+
+    def FindSection(self, name: str) -> SBSection:
+        for segment in self.segments:
+            if segment.name == name:
+                return segment
+        return SBSection()
+
+    def GetFileSpec(self) -> SBFileSpec:
+        return SBFileSpec(self.path)
+
+    def GetPlatformFileSpec(self) -> SBFileSpec:
+        return SBFileSpec(self.path)
+
+
+class SBBreakpoint(object):
+    def __init__(self, address: int, breakpointID=0) -> None:
+        self.address = address
+        self.breakpointID = breakpointID
+        self.names: List[str] = []
+        self.oneShot = False
+        self.callback = ""
+
+    def AddName(self, name: str) -> bool:
+        self.names.append(name)
+        return True
+
+    def GetID(self) -> int:
+        return self.breakpointID
+
+    def SetOneShot(self, oneShot: bool) -> None:
+        self.oneShot = oneShot
+
+    def SetScriptCallbackFunction(self, callback: str) -> None:
+        self.callback = callback
+
+    def IsValid(self) -> bool:
+        return True
+
+
+class SBBreakpointList(object):
+    def __init__(self, target: "SBTarget") -> None:
+        self.target = target
+        self.breakpoints: List[SBBreakpoint] = []
+
+    def GetSize(self) -> int:
+        return len(self.breakpoints)
+
+    def GetBreakpointAtIndex(self, index: int) -> SBBreakpoint:
+        return self.breakpoints[index]
+
+
+class SBFrame(object):
+    def __init__(self, thread: "SBThread") -> None:
+        self.thread = thread
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetThread(self) -> "SBThread":
+        return self.thread
+
+    def EvaluateExpression(self, expression: str, options: Optional[SBExpressionOptions] = None) -> SBValue:
+        return self.thread.process.runtime.evaluate(expression, options or SBExpressionOptions())
+
+
+class SBThread(object):
+    def __init__(self, process: "SBProcess") -> None:
+        self.process = process
+        self.frame = SBFrame(self)
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetProcess(self) -> "SBProcess":
+        return self.process
+
+    def GetSelectedFrame(self) -> SBFrame:
+        return self.frame
+
+    def GetFrameAtIndex(self, index: int) -> SBFrame:
+        return self.frame
+
+
+class SBProcess(object):
+    eBroadcastBitStateChanged = 1
+
+    def __init__(self, runtime, uniqueID: int) -> None:
+        self.runtime = runtime
+        self.uniqueID = uniqueID
+        self.stopID = 1
+        self.thread = SBThread(self)
+        self.broadcaster = SBBroadcaster(self)
+
+    @staticmethod
+    def EventIsProcessEvent(event: SBEvent) -> bool:
+        return event.broadcaster is not None and isinstance(event.broadcaster.owner, SBProcess)
+
+    @staticmethod
+    def GetStateFromEvent(event: SBEvent) -> int:
+        return event.data
+
+    def GetBroadcaster(self) -> SBBroadcaster:
+        return self.broadcaster
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetUniqueID(self) -> int:
+        return self.uniqueID
+
+    def GetStopID(self, includeExpressionStops=False) -> int:
+        return self.stopID
+
+    def GetState(self) -> int:
+        return eStateStopped
+
+    def GetSelectedThread(self) -> SBThread:
+        return self.thread
+
+    def ReadMemory(self, address: int, size: int, error: SBError) -> Optional[bytes]:
+        return self.runtime.readMemory(address, size, error)
+
+    def WriteMemory(self, address: int, data: bytes, error: SBError) -> int:
+        return self.runtime.writeMemory(address, data, error)
+
+    def AllocateMemory(self, size: int, permissions: int, error: SBError) -> int:
+        return self.runtime.allocateMemory(size, error)
+
+    def DeallocateMemory(self, address: int) -> SBError:
+        self.runtime.deallocateMemory(address)
+        return SBError()
+
+
+class SBTarget(object):
+    eBroadcastBitModulesLoaded = 2
+    eBroadcastBitModulesUnloaded = 4
+
+    def __init__(self, process: SBProcess) -> None:
+        self.process = process
+        self.breakpoints: List[SBBreakpoint] = []
+        self.nextBreakpointID = 0
+        self.broadcaster = SBBroadcaster(self)
+
+    @staticmethod
+    def EventIsTargetEvent(event: SBEvent) -> bool:
+        return event.broadcaster is not None and isinstance(event.broadcaster.owner, SBTarget)
+
+    @staticmethod
+    def GetNumModulesFromEvent(event: SBEvent) -> int:
+        return len(event.data)
+
+    @staticmethod
+    def GetModuleAtIndexFromEvent(index: int, event: SBEvent) -> SBModule:
+        return SBModule(event.data[index])
+
+    def GetBroadcaster(self) -> SBBroadcaster:
+        return self.broadcaster
+
+    def GetNumModules(self) -> int:
+        return len(self.process.runtime.modules())
+
+    def GetModuleAtIndex(self, index: int) -> SBModule:
+        return SBModule(*self.process.runtime.modules()[index])
+
+    def broadcastModules(self, eventType: int, paths: List[str]) -> None:
+        # Sent by dyld in a real process
+        self.broadcaster.broadcast(eventType, paths)
+
+    def IsValid(self) -> bool:
+        return True
+
+    def GetProcess(self) -> SBProcess:
+        return self.process
+
+    def GetTriple(self) -> str:
+        return "arm64-apple-ios"
+
+    def GetExecutable(self) -> SBFileSpec:
+        return SBFileSpec(self.process.runtime.mainExecutable())
+
+    def BreakpointCreateByAddress(self, address: int) -> SBBreakpoint:
+        self.nextBreakpointID += 1
+        breakpoint = SBBreakpoint(address, self.nextBreakpointID)
+        self.breakpoints.append(breakpoint)
+        return breakpoint
+
+    def BreakpointDelete(self, breakpointID: int) -> bool:
+        count = len(self.breakpoints)
+        self.breakpoints = [breakpoint for breakpoint in self.breakpoints if breakpoint.breakpointID != breakpointID]
+        return len(self.breakpoints) < count
+
+    def FindBreakpointsByName(self, name: str, breakpoints: SBBreakpointList) -> bool:
+        breakpoints.breakpoints = [breakpoint for breakpoint in self.breakpoints if name in breakpoint.names]
+        return True
+
+    def GetNumBreakpoints(self) -> int:
+        return len(self.breakpoints)
+
+
+class SBCommandReturnObject(object):
+    def __init__(self) -> None:
+        self.error: Optional[str] = None
+
+    def SetError(self, error: Any) -> None:
+        self.error = str(error)
+
+    def AppendMessage(self, message: str) -> None:
+        print(message)
+
+
+class SBDebugger(object):
+    def __init__(self, runtime, uniqueID=1) -> None:
+        self.runtime = runtime
+        self.target = SBTarget(SBProcess(runtime, uniqueID))
+        self.async_ = False
+        self.commands: Dict[str, Callable] = {}  # Commands added by "command script add"
+        self.handledCommands: List[str] = []
+        self.initializedModules: Set[str] = set()
+
+    def GetSelectedTarget(self) -> SBTarget:
+        return self.target
+
+    def GetAsync(self) -> bool:
+        return self.async_
+
+    def SetAsync(self, async_: bool) -> None:
+        self.async_ = async_
+
+    def GetVersionString(self) -> str:
+        return "lldb-benchmark"
+
+    def InterruptRequested(self) -> bool:
+        return False
+
+    def HandleCommand(self, command: str) -> None:
+        self.handledCommands.append(command)
+        name, _, arguments = command.partition(" ")
+        if command.startswith("command script add"):
+            self.addScriptCommand(shlex.split(command)[3:])
+        elif command.startswith("command script import"):
+            self.importScript(arguments.split(" ", 2)[-1].strip())
+        elif command.startswith("command "):
+            # "command source" of the .h files, their commands are not benchmarked
+            pass
+        elif name in self.commands:
+            self.commands[name](self, arguments, None, SBCommandReturnObject(), {})
+        else:
+            self.runtime.handleCommand(command, self)
+
+    def addScriptCommand(self, arguments: List[str]) -> None:
+        functionPath = arguments[arguments.index("-f") + 1]
+        name = [argument for argument in arguments if not argument.startswith("-") and argument != functionPath][0]
+        moduleName, functionName = functionPath.rsplit(".", 1)
+        self.commands[name] = getattr(sys.modules[moduleName], functionName)
+
+    def importScript(self, path: str) -> None:
+        directory, fileName = os.path.split(path)
+        if directory not in sys.path:
+            sys.path.append(directory)
+        module = importlib.import_module(os.path.splitext(fileName)[0])
+        # Modules imported by other modules have not been initialized yet.
+        # getattr avoids the name mangling of "__lldb_init_module" inside the class.
+        initFunction = getattr(module, "__lldb_init_module", None)
+        if module.__name__ not in self.initializedModules and initFunction is not None:
+            self.initializedModules.add(module.__name__)
+            initFunction(self, {})
+
+
+def makeDebugger(runtime, uniqueID=1) -> Tuple[SBDebugger, SBProcess]:
+    global debugger
+    debugger = SBDebugger(runtime, uniqueID)
+    return debugger, debugger.target.process
@@ -0,0 +1,628 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+import fnmatch
+import os
+import re
+from typing import Any, Callable, Collection, Dict, List, Optional, Set, Tuple
+import HMLLDBHelpers as HM
+import HMDiskCache
+import HMStaticClassIndex
+
+
+# Index of the Objective-C runtime classes, dumped by expressions in batches of classes and queried in Python.
+# Classes are identified by their addresses.
+# Without JIT, HMStaticClassIndex reads the classes from the __objc_classlist sections instead.
+# The index lives as long as the process. A listener of the module load/unload events merges the classes of
+# the images loaded since the last query. Classes created at run time by objc_allocateClassPair, e.g. NSKVONotifying_*,
+# have no image: once per stop the number of classes of the runtime is compared with the index, and these classes
+# are scanned again if it changed, see updateRuntimeClasses. The classes registered by HMLLDB are known by name
+# and address, they are merged without expressions, see mergeRegisteredClasses.
+# A build stopped by a batch handler or by an interrupt is continued by the next load at the same stop.
+# The classes of each image are saved by HMDiskCache with the UUID of the image, a new session only scans
+# the images that aren't cached. Classes created at run time aren't in the cache.
+kClassBatchSize = 10000
+
+gClassIndexGeneration: Optional[int] = None    # Process unique ID of the index
+gClassIndexRegistrations = 0                   # Number of HM.gRegisteredClasses merged into the index
+gClassIndexStopID = 0                          # Stop ID of the index, only compared without gClassIndexListener
+gClassIndexStatic = False                      # The index has been read from the Mach-O sections, see HMStaticClassIndex.py
+gClassIndexNextBatch: Optional[int] = None     # Index of the next class in objc_copyClassList, or of the next module if static. None if the index is complete
+gClassIndexListener: Optional[lldb.SBListener] = None
+gClassIndexListenerProcess: Optional[lldb.SBProcess] = None  # Process whose state events gClassIndexListener receives
+gClassIndexClassCount = -1                     # Number of classes of the runtime when the index was last checked, -1 to scan the classes created at run time
+gClassIndexCheckedStopID = 0                   # Stop ID of gClassIndexClassCount
+kRuntimeImage = ""                             # Image of the classes created at run time, class_getImageName returns NULL
+gClassNames: Dict[int, str] = {}               # class -> name, in the order of objc_copyClassList
+gClassAddresses: Dict[str, int] = {}           # name -> class
+gSuperclasses: Dict[int, int] = {}             # class -> superclass, 0 for root classes
+gSubclasses: Dict[int, List[int]] = {}         # class -> direct subclasses
+gClassImages: Dict[int, int] = {}              # class -> index of gImageNames
+gImageNames: List[str] = []
+gImageIndexes: Dict[str, int] = {}             # image path -> index of gImageNames
+gUnqualifiedClasses: Dict[str, int] = {}       # name without the module prefix -> class, e.g. "MyViewController" of "MyApp.MyViewController"
+
+
+def classIndexGeneration() -> int:
+    return lldb.debugger.GetSelectedTarget().GetProcess().GetUniqueID()
+
+
+def loadClassIndex(refresh=False, static=False, batchHandler: Optional[Callable[[List[int]], bool]] = None) -> bool:
+    # Build the index once per process, or again if refresh is True.
+    # Later calls only merge the classes of the images loaded in the meantime.
+    # static: Read the classes from memory without evaluating expressions
+    # batchHandler: Called with the classes already in the index, then with the classes of each new batch.
+    # Return False from it to stop the build, loadClassIndex returns True and the index stays incomplete.
+    # Without batchHandler, True means the index is complete.
+    generation = classIndexGeneration()
+    if not refresh and generation == gClassIndexGeneration and (gClassIndexStatic or not static):
+        imageChanges = pollImageChanges()
+        if gClassIndexNextBatch is None and imageChanges is not None:
+            if not updateClassIndex(imageChanges):
+                return False
+            mergeRegisteredClasses()
+            if not updateRuntimeClasses():
+                return False
+            if batchHandler is not None:
+                batchHandler(list(gClassNames))
+            return True
+
+        # objc_copyClassList keeps its order until classes are added
+        if gClassIndexNextBatch is not None and imageChanges == {} and HM.currentStopGeneration()[1] == gClassIndexStopID \
+                and gClassIndexRegistrations == len(HM.gRegisteredClasses):
+            if batchHandler is not None and not batchHandler(list(gClassNames)):
+                return True
+            return continueClassIndex(batchHandler)
+
+    return buildClassIndex(generation, static, batchHandler, not refresh)
+
+
+def buildClassIndex(generation: int, static: bool, batchHandler: Optional[Callable[[List[int]], bool]], useDiskCache: bool) -> bool:
+    # Events before the dump are already covered by it
+    listenToImageChanges()
+    pollImageChanges()
+
+    if useDiskCache and loadCachedClassIndex(generation, static, batchHandler):
+        return True
+
+    HM.DPrint("Building the class index...")
+    startClassIndex(generation, static)
+    if continueClassIndex(batchHandler):
+        return True
+    if static or gClassIndexGeneration is not None:
+        # It failed without expressions, or it has been interrupted
+        return False
+
+    HM.DPrint("Reading the classes from the Mach-O sections instead...")
+    startClassIndex(generation, True)
+    return continueClassIndex(batchHandler)
+
+
+def startClassIndex(generation: int, static: bool) -> None:
+    global gClassIndexGeneration
+    global gClassIndexRegistrations
+    global gClassIndexStopID
+    global gClassIndexStatic
+    global gClassIndexNextBatch
+
+    clearClassIndex()
+    gClassIndexGeneration = generation
+    # The classes registered before are in objc_copyClassList, or scanned by updateRuntimeClasses
+    gClassIndexRegistrations = len(HM.gRegisteredClasses)
+    gClassIndexStopID = HM.currentStopGeneration()[1]
+    gClassIndexStatic = static
+    gClassIndexNextBatch = 0
+
+
+def continueClassIndex(batchHandler: Optional[Callable[[List[int]], bool]]) -> bool:
+    # Dump the batches up to the end, clear the index if a batch fails
+    while gClassIndexNextBatch is not None:
+        classes = dumpStaticClassBatch() if gClassIndexStatic else dumpRuntimeClassBatch()
+        if classes is None:
+            clearClassIndex()
+            return False
+        if gClassIndexNextBatch is None:
+            saveClassIndexCache()
+        if batchHandler is not None and not batchHandler(classes):
+            return True
+        if gClassIndexNextBatch is not None and HM.interruptRequested():
+            HM.DPrint(f"Interrupted, the class index has {len(gClassNames)} classes. It will be continued at the same stop.")
+            return False
+    return True
+
+
+def loadCachedClassIndex(generation: int, static: bool, batchHandler: Optional[Callable[[List[int]], bool]]) -> bool:
+    # Build the index from the classes of the cached images and scan the other images.
+    # False if no image is cached or the scan fails.
+    global gClassIndexNextBatch
+    if HMDiskCache.gCacheDirectory is None:
+        return False
+    target = lldb.debugger.GetSelectedTarget()
+    modules = HMDiskCache.loadedModules(target)
+    caches = {}
+    for _, uuid, _ in modules:
+        cache = HMDiskCache.loadCache("classes", uuid)
+        if cache is not None:
+            caches[uuid] = cache
+    if len(caches) == 0:
+        return False
+
+    HM.DPrint(f"Loading the class index of {len(caches)} images from {HMDiskCache.gCacheDirectory}...")
+    startClassIndex(generation, static)
+    headerAddresses = {uuid: headerAddress for _, uuid, headerAddress in modules}
+    superclassNames: List[Tuple[str, int, str, int]] = []  # Superclasses saved by name, resolved after the other classes
+    for module, uuid, headerAddress in modules:
+        cache = caches.get(uuid)
+        if cache is None or len(cache["classes"]) == 0:
+            continue
+        imageIndex = addImage(modulePath(module))
+        for name, offset, superclassRef in cache["classes"]:
+            if isinstance(superclassRef, str):
+                superclassNames.append((name, headerAddress + offset, superclassRef, imageIndex))
+                continue
+            superclass = 0
+            if superclassRef is not None and superclassRef[0] in headerAddresses:
+                superclass = headerAddresses[superclassRef[0]] + superclassRef[1]
+            addClass(name, headerAddress + offset, superclass, imageIndex)
+    for name, cls, superclassName, imageIndex in superclassNames:
+        addClass(name, cls, gClassAddresses.get(superclassName, 0), imageIndex)
+
+    uncachedImages = [modulePath(module) for module, uuid, _ in modules if uuid not in caches]
+    if len(uncachedImages) > 0:
+        HM.DPrint(f"Scanning {len(uncachedImages)} images that aren't cached...")
+        if not addImageClasses(uncachedImages):
+            return False
+        saveClassIndexCache(uncachedImages)
+
+    gClassIndexNextBatch = None
+    if not updateRuntimeClasses():
+        return False
+    if batchHandler is not None:
+        batchHandler(list(gClassNames))
+    return True
+
+
+def saveClassIndexCache(imagePaths: Optional[Collection[str]] = None) -> None:
+    # Save the classes of the loaded images, of all of them if imagePaths is None.
+    # Images with classes out of the loaded modules, e.g. allocated at run time, aren't saved.
+    if HMDiskCache.gCacheDirectory is None:
+        return
+    target = lldb.debugger.GetSelectedTarget()
+    modules = HMDiskCache.loadedModules(target)
+    ranges = HMDiskCache.moduleRanges(target, modules)
+    imageClasses: Dict[int, List[int]] = {}
+    for cls, imageIndex in gClassImages.items():
+        imageClasses.setdefault(imageIndex, []).append(cls)
+
+    for module, uuid, _ in modules:
+        imagePath = modulePath(module)
+        if imagePaths is not None and imagePath not in imagePaths:
+            continue
+        classes: Optional[List[List[Any]]] = []
+        for cls in imageClasses.get(gImageIndexes.get(imagePath, -1), []):
+            location = HMDiskCache.moduleOffset(ranges, cls)
+            superclass = gSuperclasses[cls]
+            superclassRef = None
+            if superclass != 0:
+                # By name if the superclass is out of the modules
+                superclassLocation = HMDiskCache.moduleOffset(ranges, superclass)
+                superclassRef = list(superclassLocation) if superclassLocation is not None else gClassNames.get(superclass)
+            if location is None or location[0] != uuid or (superclass != 0 and superclassRef is None):
+                classes = None
+                break
+            classes.append([gClassNames[cls], location[1], superclassRef])
+        if classes is not None:
+            HMDiskCache.saveCache("classes", uuid, {"path": imagePath, "classes": classes})
+
+
+def dumpRuntimeClassBatch() -> Optional[List[int]]:
+    # Classes [HMArgs[0], HMArgs[0] + HMArgs[1]) of objc_copyClassList, or None if the expression fails.
+    # The first record is the number of classes.
+    # Class records are "name<0x1f>address<0x1f>superclass address<0x1f>image index".
+    # "image<0x1f>path" records introduce the image indexes of the batch in order.
+    global gClassIndexNextBatch
+    command_script = 'HMAppendClassBatch(HMArgs[0], HMArgs[1]);'
+
+    start = gClassIndexNextBatch
+    records = HM.evaluateExpressionRecords(command_script, timeoutClass=HM.kTimeoutBulk, arguments=[str(start), str(kClassBatchSize)])
+    if records is None or len(records) == 0:
+        return None
+
+    classes = []
+    imageIndexes = []  # Index of the batch -> index of gImageNames
+    for record in records[1:]:
+        fields = HM.splitRecordFields(record)
+        if len(fields) == 2:
+            imageIndexes.append(addImage(fields[1]))
+        else:
+            classes.append(addClassRecord(fields, imageIndexes))
+
+    end = start + kClassBatchSize
+    gClassIndexNextBatch = end if end < int(records[0]) else None
+    if gClassIndexNextBatch is None:
+        setRuntimeClassCount(int(records[0]))
+    return classes
+
+
+def dumpStaticClassBatch() -> Optional[List[int]]:
+    # The classes of the next module
+    global gClassIndexNextBatch
+    target = lldb.debugger.GetSelectedTarget()
+    moduleIndex = gClassIndexNextBatch
+    HMStaticClassIndex.clearMemoryBlocks()
+    classes = addModuleClasses(target, target.GetModuleAtIndex(moduleIndex)) if moduleIndex < target.GetNumModules() else []
+    HMStaticClassIndex.clearMemoryBlocks()
+
+    gClassIndexNextBatch = moduleIndex + 1 if moduleIndex + 1 < target.GetNumModules() else None
+    if gClassIndexNextBatch is None and len(gClassNames) == 0:
+        # Nothing could be read
+        return None
+    return classes
+
+
+def updateClassIndex(imageChanges: Dict[str, bool]) -> bool:
+    # imageChanges: image path -> True if the image has been loaded, False if it has been unloaded
+    for imagePath in imageChanges:
+        removeImage(imagePath)
+
+    loadedImages = [imagePath for imagePath, loaded in imageChanges.items() if loaded]
+    if len(loadedImages) == 0:
+        return True
+    if not addImageClasses(loadedImages):
+        return False
+    saveClassIndexCache(loadedImages)
+    return True
+
+
+def addImageClasses(imagePaths: List[str]) -> bool:
+    # Add the classes of the images, clear the index if it fails
+    if gClassIndexStatic:
+        target = lldb.debugger.GetSelectedTarget()
+        HMStaticClassIndex.clearMemoryBlocks()
+        for i in range(target.GetNumModules()):
+            module = target.GetModuleAtIndex(i)
+            if modulePath(module) in imagePaths:
+                addModuleClasses(target, module)
+        HMStaticClassIndex.clearMemoryBlocks()
+        return True
+
+    # Same class records as buildClassIndex, the image index is the index of the image in HMArgs[0]
+    command_script = 'HMAppendImageClasses(HMArgString(0));'
+
+    records = HM.evaluateExpressionRecords(command_script, timeoutClass=HM.kTimeoutBulk, arguments=["\n".join(imagePaths)])
+    if records is None:
+        # The index would miss the classes of the images, build it again next time
+        clearClassIndex()
+        return False
+
+    imageIndexes = [addImage(imagePath) for imagePath in imagePaths]
+    for record in records:
+        addClassRecord(HM.splitRecordFields(record), imageIndexes)
+    return True
+
+
+def updateRuntimeClasses() -> bool:
+    # Once per stop, scan the classes created at run time again if the number of classes of the runtime has changed.
+    # The first record is the number of classes, then the class records of addImageClasses if it has changed.
+    # Clear the index if it fails.
+    if gClassIndexStatic or HM.currentStopGeneration()[1] == gClassIndexCheckedStopID:
+        return True
+
+    command_script = 'HMAppendRuntimeClasses(HMArgs[0]);'
+
+    records = HM.evaluateExpressionRecords(command_script, timeoutClass=HM.kTimeoutBulk, arguments=[str(gClassIndexClassCount)])
+    if records is None or len(records) == 0:
+        clearClassIndex()
+        return False
+
+    classCount = int(records[0])
+    if classCount != gClassIndexClassCount:
+        removeImage(kRuntimeImage)
+        imageIndexes = [addImage(kRuntimeImage)]
+        for record in records[1:]:
+            addClassRecord(HM.splitRecordFields(record), imageIndexes)
+    setRuntimeClassCount(classCount)
+    return True
+
+
+def mergeRegisteredClasses() -> None:
+    # Add the classes registered by HMLLDB since the last merge to a complete index.
+    # They are classes created at run time, the number of classes of the runtime is updated with them.
+    global gClassIndexRegistrations
+    global gClassIndexClassCount
+    if gClassIndexGeneration is None or gClassIndexNextBatch is not None:
+        return
+
+    registrations = HM.gRegisteredClasses[gClassIndexRegistrations:]
+    gClassIndexRegistrations = len(HM.gRegisteredClasses)
+    for processUID, name, cls, superclass in registrations:
+        if processUID != gClassIndexGeneration or cls in gClassNames:
+            continue
+        addClass(name, cls, superclass, addImage(kRuntimeImage))
+        if gClassIndexClassCount >= 0:
+            gClassIndexClassCount += 1
+
+
+def setRuntimeClassCount(classCount: int) -> None:
+    global gClassIndexClassCount
+    global gClassIndexCheckedStopID
+    gClassIndexClassCount = classCount
+    gClassIndexCheckedStopID = HM.currentStopGeneration()[1]
+
+
+def addImage(imagePath: str) -> int:
+    imageIndex = gImageIndexes.get(imagePath)
+    if imageIndex is None:
+        imageIndex = len(gImageNames)
+        gImageNames.append(imagePath)
+        gImageIndexes[imagePath] = imageIndex
+    return imageIndex
+
+
+def addModuleClasses(target: lldb.SBTarget, module: lldb.SBModule) -> List[int]:
+    classes = HMStaticClassIndex.readModuleClasses(target, module)
+    if len(classes) == 0:
+        return []
+    imageIndex = addImage(modulePath(module))
+    for name, cls, superclass in classes:
+        addClass(name, cls, superclass, imageIndex)
+    return [cls for _, cls, _ in classes]
+
+
+def addClassRecord(fields: List[str], imageIndexes: List[int]) -> int:
+    # fields: name, address, superclass address, index of imageIndexes
+    name, address, superclassAddress, image = fields
+    cls = int(address, 16)
+    addClass(name, cls, int(superclassAddress, 16), imageIndexes[int(image)])
+    return cls
+
+
+def addClass(name: str, cls: int, superclass: int, imageIndex: int) -> None:
+    gClassNames[cls] = name
+    gClassAddresses[name] = cls
+    gSuperclasses[cls] = superclass
+    gClassImages[cls] = imageIndex
+    gSubclasses.setdefault(superclass, []).append(cls)
+
+    if "." in name:
+        prefix, unqualifiedName = name.split(".", 1)
+        if "NSKVONotifying_" not in prefix and "_NSZombie_" not in prefix:
+            gUnqualifiedClasses.setdefault(unqualifiedName, cls)
+
+
+def removeImage(imagePath: str) -> None:
+    imageIndex = gImageIndexes.get(imagePath)
+    if imageIndex is None:
+        return
+
+    for cls in [cls for cls, index in gClassImages.items() if index == imageIndex]:
+        name = gClassNames.pop(cls)
+        if gClassAddresses.get(name) == cls:
+            del gClassAddresses[name]
+        if "." in name and gUnqualifiedClasses.get(name.split(".", 1)[1]) == cls:
+            del gUnqualifiedClasses[name.split(".", 1)[1]]
+        superclass = gSuperclasses.pop(cls)
+        siblings = gSubclasses.get(superclass, [])
+        if cls in siblings:
+            siblings.remove(cls)
+        del gClassImages[cls]
+
+
+def listenToImageChanges() -> None:
+    # Listen to the module events of the target and the state events of the process of the index.
+    # One listener per process, a rebuild at a later stop reuses it.
+    global gClassIndexListener
+    global gClassIndexListenerProcess
+    target = lldb.debugger.GetSelectedTarget()
+    process = target.GetProcess()
+    if gClassIndexListener is not None and gClassIndexListenerProcess is not None:
+        if gClassIndexListenerProcess.GetUniqueID() == process.GetUniqueID():
+            return
+        # The listener of the previous process
+        target.GetBroadcaster().RemoveListener(gClassIndexListener)
+        gClassIndexListenerProcess.GetBroadcaster().RemoveListener(gClassIndexListener)
+
+    gClassIndexListener = None
+    gClassIndexListenerProcess = None
+    listener = lldb.SBListener("HMLLDB.HMClassIndex")
+    moduleEvents = lldb.SBTarget.eBroadcastBitModulesLoaded | lldb.SBTarget.eBroadcastBitModulesUnloaded
+    if target.GetBroadcaster().AddListener(listener, moduleEvents) != moduleEvents:
+        # Fall back to building the index at each stop
+        target.GetBroadcaster().RemoveListener(listener)
+        return
+    process.GetBroadcaster().AddListener(listener, lldb.SBProcess.eBroadcastBitStateChanged)
+    gClassIndexListener = listener
+    gClassIndexListenerProcess = process
+
+
+def pollImageChanges() -> Optional[Dict[str, bool]]:
+    # Image path -> True if the image has been loaded since the last poll, False if it has been unloaded.
+    # None if the index has to be built again.
+    if gClassIndexListener is None:
+        return {} if HM.currentStopGeneration()[1] == gClassIndexStopID else None
+
+    imageChanges: Optional[Dict[str, bool]] = {}
+    event = lldb.SBEvent()
+    while gClassIndexListener.GetNextEvent(event):
+        if lldb.SBProcess.EventIsProcessEvent(event):
+            if lldb.SBProcess.GetStateFromEvent(event) in (lldb.eStateExited, lldb.eStateDetached):
+                imageChanges = None
+            continue
+        if imageChanges is None or not lldb.SBTarget.EventIsTargetEvent(event):
+            continue
+
+        eventType = event.GetType()
+        if eventType & lldb.SBTarget.eBroadcastBitModulesLoaded:
+            loaded = True
+        elif eventType & lldb.SBTarget.eBroadcastBitModulesUnloaded:
+            loaded = False
+        else:
+            continue
+        for i in range(lldb.SBTarget.GetNumModulesFromEvent(event)):
+            imageChanges[modulePath(lldb.SBTarget.GetModuleAtIndexFromEvent(i, event))] = loaded
+
+    return imageChanges
+
+
+def modulePath(module: lldb.SBModule) -> str:
+    # The path in the process, it is the path of class_getImageName
+    fileSpec = module.GetPlatformFileSpec()
+    if not fileSpec.IsValid() or fileSpec.fullpath is None:
+        fileSpec = module.GetFileSpec()
+    return fileSpec.fullpath
+
+
+def clearClassIndex() -> None:
+    global gClassIndexGeneration
+    global gClassIndexNextBatch
+    global gClassIndexClassCount
+    global gClassIndexCheckedStopID
+    gClassIndexGeneration = None
+    gClassIndexNextBatch = None
+    gClassIndexClassCount = -1
+    gClassIndexCheckedStopID = 0
+    gClassNames.clear()
+    gClassAddresses.clear()
+    gSuperclasses.clear()
+    gSubclasses.clear()
+    gClassImages.clear()
+    gImageNames.clear()
+    gImageIndexes.clear()
+    gUnqualifiedClasses.clear()
+
+
+def lookUpClass(className: str) -> Optional[int]:
+    # The Swift module prefix of the name can be omitted, a mangled Swift name is demangled first
+    className = HMStaticClassIndex.demangleSwiftClassName(className)
+    cls = gClassAddresses.get(className)
+    if cls is None:
+        cls = gUnqualifiedClasses.get(className)
+    return cls
+
+
+def className(cls: int) -> str:
+    return gClassNames.get(cls, f"0x{cls:x}")
+
+
+def imageName(cls: int) -> str:
+    return gImageNames[gClassImages[cls]]
+
+
+def findClasses(keyword: str, classes: Optional[List[int]] = None) -> List[int]:
+    # The classes whose names contain the keyword, case insensitive.
+    # classes: The classes to search, all classes of the index by default
+    keyword = keyword.lower()
+    if classes is None:
+        classes = list(gClassNames)
+    return [cls for cls in classes if keyword in gClassNames[cls].lower()]
+
+
+def searchClasses(pattern: str, mode: str) -> List[int]:
+    # mode: "regex", "glob" or "fuzzy", case insensitive.
+    # The classes are ranked by score, then the classes of the main executable first, then the shorter names first.
+    if mode == "regex":
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as error:
+            HM.DPrint(f"Invalid regular expression: {error}")
+            return []
+        scoreFunction = lambda name: regexScore(regex, name)
+    elif mode == "glob":
+        regex = re.compile(fnmatch.translate(pattern), re.IGNORECASE)
+        scoreFunction = lambda name: 0 if regex.match(name) else None
+    else:
+        if len(pattern) == 0:
+            return []
+        regex = re.compile(".*?".join(f"({re.escape(character)})" for character in pattern), re.IGNORECASE)
+        scoreFunction = lambda name: fuzzyScore(regex, name)
+
+    mainImageIndexes = mainExecutableImageIndexes()
+    rankedClasses = []
+    for cls, name in gClassNames.items():
+        score = scoreFunction(name)
+        if score is not None:
+            rankedClasses.append((-score, gClassImages[cls] not in mainImageIndexes, len(name), name, cls))
+    rankedClasses.sort()
+    return [cls for *_, cls in rankedClasses]
+
+
+def regexScore(regex: re.Pattern, name: str) -> Optional[float]:
+    # A match of the whole name first, then a match at the start
+    match = regex.search(name)
+    if match is None:
+        return None
+    if match.start() == 0 and match.end() == len(name):
+        return 2
+    return 1 if match.start() == 0 else 0
+
+
+def fuzzyScore(regex: re.Pattern, name: str) -> Optional[float]:
+    # The characters of the pattern are a subsequence of the name. Characters at the start of the name or of a word,
+    # and consecutive characters score higher, gaps and long names score lower.
+    match = regex.search(name)
+    if match is None:
+        return None
+    score = 0.0
+    previousPosition = -1
+    for group in range(1, (match.lastindex or 0) + 1):
+        position = match.start(group)
+        if position == 0:
+            score += 4
+        elif name[position - 1] in "._" or (name[position].isupper() and name[position - 1].islower()):
+            score += 3
+        if position == previousPosition + 1:
+            score += 5
+        elif previousPosition >= 0:
+            score -= 0.1 * (position - previousPosition - 1)
+        previousPosition = position
+    return score - 0.01 * len(name)
+
+
+def mainExecutableImageIndexes() -> Set[int]:
+    # Indexes of gImageNames of the main executable, compared by file name because the path in the process
+    # can differ from the path of the target.
+    executable = lldb.debugger.GetSelectedTarget().GetExecutable()
+    fileName = executable.GetFilename() if executable.IsValid() else None
+    return {index for index, imagePath in enumerate(gImageNames) if fileName is not None and os.path.basename(imagePath) == fileName}
+
+
+def subclassTree(cls: int, maxDepth: Optional[int] = None) -> List[Tuple[int, int]]:
+    # (subclass, depth) in depth first order, each class is followed by its subclasses.
+    # The direct subclasses have depth 1, the subclasses deeper than maxDepth are skipped.
+    result = []
+    stack = [(subclass, 1) for subclass in reversed(gSubclasses.get(cls, []))]
+    while len(stack) > 0:
+        subclass, depth = stack.pop()
+        result.append((subclass, depth))
+        if maxDepth is None or depth < maxDepth:
+            stack.extend((child, depth + 1) for child in reversed(gSubclasses.get(subclass, [])))
+    return result
+
+
+def superclassChain(cls: int) -> List[int]:
+    # The class itself, its superclass, ..., the root class
+    chain = []
+    while cls != 0 and cls not in chain:
+        chain.append(cls)
+        cls = gSuperclasses.get(cls, 0)
+    return chain
@@ -21,31 +21,50 @@
 # SOFTWARE.
 
 import lldb
+import difflib
 import shlex
 import optparse
+from typing import Dict, List, Optional, Tuple
 import HMLLDBHelpers as HM
 import HMLLDBClassInfo
+import HMClassIndex
+import HMClassResolver
+import HMProtocolIndex
+import HMSelectorIndex
 
 
 def __lldb_init_module(debugger, internal_dict):
     debugger.HandleCommand('command script add -f HMClassInfoCommands.methods methods -h "Execute [inputClass _methodDescription] or [inputClass _shortMethodDescription]."')
     debugger.HandleCommand('command script add -f HMClassInfoCommands.properties properties -h "Execute [inputClass _propertyDescription]."')
+    debugger.HandleCommand('command script add -f HMClassInfoCommands.ivars ivars -h "Execute [instance _ivarDescription]."')
 
     debugger.HandleCommand('command script add -f HMClassInfoCommands.findClass fclass -h "Find the class containing the input name(Case insensitive)."')
     debugger.HandleCommand('command script add -f HMClassInfoCommands.findSubclass fsubclass -h "Find the subclass of the input."')
     debugger.HandleCommand('command script add -f HMClassInfoCommands.findSuperClass fsuperclass -h "Find the superclass of the input."')
+    debugger.HandleCommand('command script add -f HMClassInfoCommands.findProtocol fprotocol -h "Find the classes that conform to the input protocol."')
     debugger.HandleCommand('command script add -f HMClassInfoCommands.findMethod fmethod -h "Find the specified method in the method list, you can also find the method list of the specified class."')
 
 
+# Descriptions of the methods and properties of classes, memoized at the current stop.
+# A class name is resolved once per stop, then each description costs at most one expression.
+# Other input, e.g. "self" or an instance, is evaluated every time: the selected frame or the instance may change
+# without a new stop, e.g. after "frame select" or "expression obj.x = 1".
+gDescriptionGeneration: Tuple[int, int] = (0, 0)      # (process unique ID, stop ID)
+gDescriptionReceivers: Dict[str, int] = {}             # class name -> address of the class
+gDescriptions: Dict[Tuple[int, str], str] = {}          # (class, selector name) -> description
+gPrintedDescriptions: Dict[Tuple[int, int, str], str] = {}  # (process unique ID, receiver, selector name) -> last printed description, for --diff
+
+
 def methods(debugger, command, exe_ctx, result, internal_dict):
     """
     Syntax:
-        methods [--short] <className/classInstance>
+        methods [--short] [--diff] <className/classInstance>
 
     Examples:
         (lldb) methods UIViewController
         (lldb) methods -s UIViewController
         (lldb) methods [UIView new]
+        (lldb) methods --diff UIViewController
 
         (lldb) expression -l objc -O -- [NSObject new]
         <NSObject: 0x60000375f9a0>
@@ -53,6 +72,10 @@ def methods(debugger, command, exe_ctx, result, internal_dict):
 
     Options:
         --short/-s; Use [inputClass _shortMethodDescription] instead of [inputClass _methodDescription]
+        --diff/-d; Only print the lines that changed since the last description of the class, e.g. after a category was loaded
+
+    Notice:
+        The description of a class is memoized until the process continues
 
     This command is implemented in HMClassInfoCommands.py
     """
@@ -67,11 +90,7 @@ def methods(debugger, command, exe_ctx, result, internal_dict):
         result.SetError(parser.usage)
         return
 
-    inputStr: str = ""
-    for string in args:
-        inputStr += string + " "
-    inputStr = inputStr.rstrip()
-
+    inputStr = " ".join(args)
     if len(inputStr) == 0:
         HM.DPrint("Requires a argument, Please enter \"help methods\" for help.")
         return
@@ -81,164 +100,324 @@ def methods(debugger, command, exe_ctx, result, internal_dict):
     else:
         selName = "_methodDescription"
 
-    value = HM.evaluateExpressionValue(expression=f'(NSString *)[{inputStr} performSelector:NSSelectorFromString(@"{selName}")]', printErrors=False)
-    if HM.successOfSBError(value.GetError()):
-        HM.DPrint(value.GetObjectDescription())
-        return
-
-    clsPrefixesValue = HM.getClassPrefixes()[1]
-    command_script = f'''
-        Class inputClass = objc_lookUpClass("{inputStr}");
-
-        if (inputClass == nil) {{   //  Find prefixed class
-            for (NSString *prefix in (NSMutableArray *){clsPrefixesValue.GetValue()}) {{
-                NSString *clsName = [prefix stringByAppendingString:@".{inputStr}"];
-                inputClass = objc_lookUpClass((char *)[clsName UTF8String]);
-                if (inputClass) {{
-                    break;
-                }}
-            }}
-        }}
-
-        NSMutableString *result = [[NSMutableString alloc] init];
-        if (inputClass == nil) {{
-            [result appendString:@"Unable to resolve {inputStr} or find {inputStr} class, maybe {inputStr} is not a subclass of NSObject\\n"];
-        }} else {{
-            if ((BOOL)[(Class)inputClass respondsToSelector:(SEL)NSSelectorFromString(@"{selName}")]) {{
-                [result appendString:(NSString *)[inputClass performSelector:NSSelectorFromString(@"{selName}")]];
-            }} else {{
-                [result appendString:@"{inputStr} is not a subclass of NSObject"];
-            }}
-        }}
-
-        result;
-    '''
-
-    result = HM.evaluateExpressionValue(command_script).GetObjectDescription()
-    HM.DPrint(result)
+    printDescription(inputStr, selName, True, options.diff)
 
 
 def properties(debugger, command, exe_ctx, result, internal_dict):
     """
     Syntax:
-        properties <className/classInstance>
+        properties [--diff] <className/classInstance>
 
     Examples:
         (lldb) properties UIViewController
         (lldb) properties [NSObject new]
+        (lldb) properties --diff UIViewController
 
         (lldb) expression -l objc -O -- [NSObject new]
         <NSObject: 0x60000372f760>
         (lldb) properties 0x60000372f760
 
+    Options:
+        --diff/-d; Only print the lines that changed since the last description of the class
+
+    Notice:
+        The description of a class is memoized until the process continues
+
     This command is implemented in HMClassInfoCommands.py
     """
 
-    if len(command) == 0:
+    parser = generate_description_option_parser("properties", "<className/classInstance>")
+    try:
+        (options, inputStr) = parseLeadingOptions(command, parser)
+    except:
+        result.SetError(parser.usage)
+        return
+
+    if len(inputStr) == 0:
         HM.DPrint("Requires a argument, Please enter \"help properties\" for help.")
         return
 
-    value = HM.evaluateExpressionValue(expression=f'(NSString *)[{command} performSelector:NSSelectorFromString(@"_propertyDescription")]', printErrors=False)
-    if HM.successOfSBError(value.GetError()):
-        HM.DPrint(value.GetObjectDescription())
+    printDescription(inputStr, "_propertyDescription", True, options.diff)
+
+
+def ivars(debugger, command, exe_ctx, result, internal_dict):
+    """
+    Syntax:
+        ivars [--diff] <Instance>
+
+    Examples:
+        (lldb) ivars [UIView new]
+        (lldb) ivars 0x10e016000
+        (lldb) ivars --diff 0x10e016000
+
+    Options:
+        --diff/-d; Only print the ivars that changed since the last description of the instance
+
+    This command is implemented in HMClassInfoCommands.py
+    """
+
+    parser = generate_description_option_parser("ivars", "<Instance>")
+    try:
+        (options, inputStr) = parseLeadingOptions(command, parser)
+    except:
+        result.SetError(parser.usage)
+        return
+
+    if len(inputStr) == 0:
+        HM.DPrint("Requires a argument, Please enter \"help ivars\" for help.")
         return
 
-    clsPrefixesValue = HM.getClassPrefixes()[1]
-    command_script = f'''
-        Class inputClass = objc_lookUpClass("{command}");
-
-        if (inputClass == nil) {{   //  Find prefixed class
-            for (NSString *prefix in (NSMutableArray *){clsPrefixesValue.GetValue()}) {{
-                NSString *clsName = [prefix stringByAppendingString:@".{command}"];
-                inputClass = objc_lookUpClass((char *)[clsName UTF8String]);
-                if (inputClass) {{
-                    break;
-                }}
-            }}
-        }}
+    printDescription(inputStr, "_ivarDescription", False, options.diff)
+
+
+def parseLeadingOptions(command: str, parser: optparse.OptionParser) -> Tuple[optparse.Values, str]:
+    # Parse the options before the input, the input is returned unchanged because it may contain quotes,
+    # e.g. [obj valueForKey:@"name"]. "--" ends the options.
+    optionArgs = []
+    inputStr = command.strip()
+    while len(inputStr) > 0:
+        token = inputStr.split(maxsplit=1)[0]
+        if token == "--":
+            inputStr = inputStr[len(token):].lstrip()
+            break
+        if not parser.has_option(token):
+            break
+        optionArgs.append(token)
+        inputStr = inputStr[len(token):].lstrip()
+
+    (options, _) = parser.parse_args(optionArgs)
+    return options, inputStr
 
-        NSMutableString *result = [[NSMutableString alloc] init];
-        if (inputClass == nil) {{
-            [result appendString:@"Unable to resolve {command} or find {command} class, maybe {command} is not a subclass of NSObject\\n"];
-        }} else {{
-            if ((BOOL)[(Class)inputClass respondsToSelector:(SEL)NSSelectorFromString(@"_propertyDescription")]) {{
-                [result appendString:(NSString *)[inputClass performSelector:NSSelectorFromString(@"_propertyDescription")]];
-            }} else {{
-                [result appendString:@"{command} is not a subclass of NSObject"];
-            }}
-        }}
 
-        result;
+def printDescription(inputStr: str, selName: str, isClass: bool, diff: bool) -> None:
+    # isClass: Describe the class of inputStr, otherwise the instance
+    receiverDescription = describe(inputStr, selName, isClass)
+    if receiverDescription is None:
+        return
+
+    receiver, description = receiverDescription
+    printedKey = (gDescriptionGeneration[0], receiver, selName)
+    previousDescription = gPrintedDescriptions.get(printedKey)
+    gPrintedDescriptions[printedKey] = description
+    if not diff:
+        HM.DPrint(description)
+    elif previousDescription is None:
+        HM.DPrint(f"{inputStr} has not been described before, there is nothing to compare with.\n{description}")
+    else:
+        lines = [line for line in difflib.unified_diff(previousDescription.splitlines(), description.splitlines(), n=0, lineterm="")
+                 if not line.startswith(("---", "+++", "@@"))]
+        HM.DPrint("\n".join(lines) if len(lines) > 0 else f"No changes since the last description of {inputStr}")
+
+
+def describe(inputStr: str, selName: str, isClass: bool) -> Optional[Tuple[int, str]]:
+    # (receiver, [receiver selName]) of the memoized receiver of inputStr, None if it fails
+    global gDescriptionGeneration
+    generation = HM.currentStopGeneration()
+    if generation != gDescriptionGeneration:
+        gDescriptionGeneration = generation
+        gDescriptionReceivers.clear()
+        gDescriptions.clear()
+
+    isClassName = isClass and HMClassResolver.isClassName(inputStr)
+    receiver = gDescriptionReceivers.get(inputStr) if isClassName else None
+    if receiver is not None:
+        if (receiver, selName) not in gDescriptions:
+            state = evaluateDescription("HMArgPointer(1)", [selName, hex(receiver)])
+            if not checkDescriptionState(state, inputStr):
+                return None
+            gDescriptions[(receiver, selName)] = state[2]
+        return receiver, gDescriptions[(receiver, selName)]
+
+    # The input is evaluated in the expression first, e.g. "self", "vc" or "[UIView new]", as the baseline did.
+    # A class name is passed as a pointer when HMClassResolver already knows it, and it's only looked up
+    # by HMClassResolver when the evaluation fails, e.g. a Swift class name without the module prefix.
+    state = None
+    lookUpState = None
+    cls = HMClassResolver.cachedClass(inputStr) if isClassName else None
+    if cls is not None:
+        lookUpState = evaluateDescription("HMArgPointer(1)", [selName, hex(cls)])
+        state = lookUpState
+    if state is None:
+        receiverExpression = f"[{inputStr} class]" if isClass else inputStr
+        state = evaluateDescription(receiverExpression, [selName], printErrors=not isClassName)
+    if isClassName and (state is None or state[0] == "notFound") and not HMClassResolver.isUnresolved(inputStr):
+        statement, argument = HMClassResolver.classStatement(inputStr, 1)
+        lookUpState = evaluateDescription("inputClass", [selName, argument], statement=statement)
+        if lookUpState is not None and lookUpState[0] == "notFound":
+            HMClassResolver.addUnresolvedClass(inputStr)
+        elif lookUpState is not None:
+            HMClassResolver.addResolvedClass(inputStr, lookUpState[1])
+        state = lookUpState or state
+    if not checkDescriptionState(state, inputStr):
+        return None
+
+    _, receiver, description = state
+    if state is lookUpState:
+        # Resolved as a class name, not as a variable of the selected frame such as "self"
+        gDescriptionReceivers[inputStr] = receiver
+        gDescriptions[(receiver, selName)] = description
+    return receiver, description
+
+
+def evaluateDescription(receiver: str, arguments: List[str], printErrors=True, statement='') -> Optional[Tuple[str, int, str]]:
+    # (state, receiver, [receiver HMArgs[0]]) of the receiver expression, None if the expression fails.
+    # statement declares the variables of the receiver expression, e.g. "inputClass" of HMClassResolver.classStatement.
+    # The first record is the state of the receiver.
+    command_script = f'''
+        {statement}
+        HMAppendDescription((id)({receiver}), HMArgs[0]);
     '''
 
-    result = HM.evaluateExpressionValue(command_script).GetObjectDescription()
-    HM.DPrint(result)
+    records = HM.evaluateExpressionRecords(command_script, printErrors=printErrors, arguments=arguments)
+    if records is None or len(records) == 0:
+        return None
+    fields = HM.splitRecordFields(records[0])
+    if fields[0] == "found" and len(records) > 1:
+        return "found", int(fields[1], 16), records[1]
+    return fields[0], 0, ""
+
+
+def checkDescriptionState(state: Optional[Tuple[str, int, str]], inputStr: str) -> bool:
+    # Print why the description of inputStr is missing
+    if state is None:
+        HM.DPrint(f"Unable to resolve {inputStr}")
+        return False
+    if state[0] == "notFound":
+        HM.DPrint(f"Unable to resolve {inputStr} or find {inputStr} class, maybe {inputStr} is not a subclass of NSObject\n")
+        return False
+    if state[0] != "found":
+        HM.DPrint(f"{inputStr} is not a subclass of NSObject")
+        return False
+    return True
+
+
+def clearDescriptions() -> None:
+    global gDescriptionGeneration
+    gDescriptionGeneration = (0, 0)
+    gDescriptionReceivers.clear()
+    gDescriptions.clear()
+    gPrintedDescriptions.clear()
 
 
 def findClass(debugger, command, exe_ctx, result, internal_dict):
     """
     Syntax:
-        fclass <className>
+        fclass [--refresh] [--static] [--limit <count>] [--regex | --glob | --fuzzy] <className>
+
+    Options:
+        --refresh/-r; Rebuild the class index, ignoring the disk cache
+        --static/-s; Read the classes from the __objc_classlist sections without evaluating expressions
+        --limit/-l; Stop after <count> classes
+        --regex/-e; Search with a regular expression
+        --glob/-g; Search with a glob pattern, e.g. "UI*Controller"
+        --fuzzy/-f; Search the classes containing the characters in order, e.g. "uivc" for "UIViewController"
 
     Examples:
         (lldb) fclass
         (lldb) fclass UITabBarController
         (lldb) fclass controller
+        (lldb) fclass -l 20 controller
+        (lldb) fclass -r controller
+        (lldb) fclass -s controller
+        (lldb) fclass -e "^UI.*Cell$"
+        (lldb) fclass -g "*Table*Controller"
+        (lldb) fclass -f -l 10 tbvc
 
     Notice:
         Case insensitive.
+        The classes are indexed once per process and updated when images are loaded or classes are created at run time, see HMClassIndex.py
+        The classes are printed while the index is built, Control-C stops it.
+        The results of --regex, --glob and --fuzzy are ranked by score, then the classes of the main executable first.
 
     This command is implemented in HMClassInfoCommands.py
     """
 
-    HM.DPrint("Waiting...")
+    command_args = shlex.split(command)
+    parser = generate_findClass_option_parser()
+    try:
+        # options: optparse.Values
+        # args: list
+        (options, args) = parser.parse_args(command_args)
+    except:
+        result.SetError(parser.usage)
+        return
+
+    keyword = " ".join(args)
+    modes = [mode for mode in ["regex", "glob", "fuzzy"] if getattr(options, mode)]
+    if len(modes) > 1:
+        HM.DPrint("--regex, --glob and --fuzzy can't be used together.")
+        return
+    if len(modes) == 1:
+        findClassesRanked(keyword, modes[0], options)
+        return
 
-    if len(command) == 0:
-        addObjectScript = '[classNames appendFormat:@"%@ (%p)\\n", name, classList[i]]; findCount += 1;'
+    count = 0
+
+    def printClasses(classes: List[int]) -> bool:
+        # Print the matching classes of each batch, stop the index at --limit
+        nonlocal count
+        classNames = ""
+        for cls in HMClassIndex.findClasses(keyword, classes):
+            if options.limit is not None and count >= options.limit:
+                break
+            classNames += f"{HMClassIndex.className(cls)} (0x{cls:x})\n"
+            count += 1
+        if len(classNames) > 0:
+            print(classNames, end="")
+        return options.limit is None or count < options.limit
+
+    if not HMClassIndex.loadClassIndex(options.refresh, options.static, printClasses):
+        if count > 0:
+            HM.DPrint(f"Count: {count} \n")
+        return
+
+    if count == 0:
+        HM.DPrint("No class found.\n")
+    elif options.limit is not None and count >= options.limit:
+        HM.DPrint(f"Count: {count} (--limit {options.limit}) \n")
     else:
-        command = command.lower()
-        addObjectScript = f'''
-            if ([[name lowercaseString] containsString:@"{command}"]) {{
-                [classNames appendFormat:@"%@ (%p)\\n", name, classList[i]];
-                findCount += 1;
-            }}
-        '''
+        HM.DPrint(f"Count: {count} \n")
 
-    command_script = f'''
-        unsigned int findCount = 0;
-        unsigned int classCount;
-        Class *classList = objc_copyClassList(&classCount);
-        NSMutableString *classNames = [[NSMutableString alloc] init];
-        for (int i = 0; i < classCount; i++) {{
-            NSString *name = [[NSString alloc] initWithUTF8String:class_getName(classList[i])];
-            {addObjectScript}
-        }}
-        free(classList);
 
-        if (findCount == 0) {{
-            [classNames insertString:@"No class found.\\n" atIndex:0];
-        }} else {{
-            [classNames insertString:[[NSString alloc] initWithFormat:@"Count: %u \\n", findCount] atIndex:0];
-        }}
-        classNames;
-    '''
+def findClassesRanked(pattern: str, mode: str, options: optparse.Values) -> None:
+    # The ranking needs all classes, the results are printed after the index is complete
+    if not HMClassIndex.loadClassIndex(options.refresh, options.static):
+        return
 
-    classNames = HM.evaluateExpressionValue(command_script).GetObjectDescription()
-    HM.DPrint(classNames)
+    classes = HMClassIndex.searchClasses(pattern, mode)
+    if len(classes) == 0:
+        HM.DPrint("No class found.\n")
+        return
+
+    limited = options.limit is not None and len(classes) > options.limit
+    if limited:
+        classes = classes[:options.limit]
+    print("".join(f"{HMClassIndex.className(cls)} (0x{cls:x})\n" for cls in classes), end="")
+    HM.DPrint(f"Count: {len(classes)} (--limit {options.limit}) \n" if limited else f"Count: {len(classes)} \n")
 
 
 def findSubclass(debugger, command, exe_ctx, result, internal_dict):
     """
     Syntax:
-        fsubclass [--nonrecursively] <className>
+        fsubclass [--nonrecursively] [--depth <depth>] [--count-only] [--image <image>] [--refresh] [--static] <className>
 
     Options:
-        --nonrecursively/-n; Find subclass non-recursively
+        --nonrecursively/-n; Find subclass non-recursively, the same as --depth 1
+        --depth/-d; Only find the subclasses up to <depth> levels below the class
+        --count-only/-c; Only print the number of subclasses
+        --image/-i; Only count the subclasses in the images whose paths contain <image>, their superclasses are printed for context
+        --refresh/-r; Rebuild the class index, ignoring the disk cache
+        --static/-s; Read the classes from the __objc_classlist sections without evaluating expressions
 
     Examples:
         (lldb) fsubclass UIViewController
         (lldb) fsubclass -n UIViewController
+        (lldb) fsubclass -d 2 UIView
+        (lldb) fsubclass -c NSObject
+        (lldb) fsubclass -i MyApp UIViewController
 
+    Notice:
+        The subclasses are printed as a tree, each level is indented by 4 spaces.
 
     This command is implemented in HMClassInfoCommands.py
     """
@@ -257,134 +436,235 @@ def findSubclass(debugger, command, exe_ctx, result, internal_dict):
         HM.DPrint("Requires a argument, Please enter \"help fsubclass\" for help.")
         return
 
-    HM.DPrint("Waiting...")
-
-    if options.nonrecursively:
-        compareScript = '''
-            if (class_getSuperclass(cls) == inputClass){
-                NSString *name = [[NSString alloc] initWithUTF8String:class_getName(cls)];
-                [result appendFormat:@"%@\\n", name];
-                findCount += 1;
-            }
-        '''
-
-    else:
-        compareScript = '''
-            for (Class superClass = class_getSuperclass(cls); superClass != nil; superClass = class_getSuperclass(superClass)) {
-                if (superClass == inputClass) {
-                    NSString *name = [[NSString alloc] initWithUTF8String:class_getName(cls)];
-                    [result appendFormat:@"%@\\n", name];
-                    findCount += 1;
-
-                    break;
-                }
-            }
-        '''
-
-    clsPrefixesValue = HM.getClassPrefixes()[1]
-    command_script = f'''
-        Class inputClass = objc_lookUpClass("{args[0]}");
-
-        if (inputClass == nil) {{   //  Find prefixed class
-            for (NSString *prefix in (NSMutableArray *){clsPrefixesValue.GetValue()}) {{
-                NSString *clsName = [prefix stringByAppendingString:@".{args[0]}"];
-                inputClass = objc_lookUpClass((char *)[clsName UTF8String]);
-                if (inputClass) {{
-                    break;
-                }}
-            }}
-        }}
+    if not HMClassIndex.loadClassIndex(options.refresh, options.static):
+        return
 
-        NSMutableString *result = [[NSMutableString alloc] init];
-        if (inputClass == nil) {{
-            [result appendString:@"Can't find {args[0]} class\\n"];
-        }} else {{
-            unsigned int classCount;
-            unsigned int findCount = 0;
-            Class *classList = objc_copyClassList(&classCount);
-
-            for (int i = 0; i < classCount; i++) {{
-                Class cls = classList[i];
-                {compareScript}
-            }}
-
-            if (findCount == 0) {{
-                [result insertString:@"No subclass found.\\n" atIndex:0];
-            }} else {{
-                [result insertString:[[NSString alloc] initWithFormat:@"Subclass count: %u \\n", findCount] atIndex:0];
-            }}
-            
-            free(classList);
-        }}
+    inputClass = HMClassIndex.lookUpClass(args[0])
+    if inputClass is None:
+        HM.DPrint(f"Can't find {args[0]} class\n")
+        return
 
-        result;
-    '''
+    maxDepth = 1 if options.nonrecursively else options.depth
+    tree = HMClassIndex.subclassTree(inputClass, maxDepth)
+    subclassCount = len(tree)
+    if options.image:
+        # Walk backwards, the superclass of a kept class is the first previous class with a lower depth
+        image = options.image.lower()
+        subclassCount = 0
+        keptTree = []
+        ancestorDepth = 0
+        for cls, depth in reversed(tree):
+            inImage = image in HMClassIndex.imageName(cls).lower()
+            if inImage:
+                subclassCount += 1
+            if inImage or depth <= ancestorDepth:
+                keptTree.append((cls, depth))
+                ancestorDepth = depth - 1
+        tree = keptTree[::-1]
+
+    if subclassCount == 0:
+        HM.DPrint("No subclass found.\n")
+        return
+    if options.count_only:
+        HM.DPrint(f"Subclass count: {subclassCount} \n")
+        return
 
-    classNames = HM.evaluateExpressionValue(command_script).GetObjectDescription()
-    HM.DPrint(classNames)
+    lines = [HMClassIndex.className(inputClass)]
+    lines.extend("    " * depth + HMClassIndex.className(cls) for cls, depth in tree)
+    HM.DPrint(f"Subclass count: {subclassCount} \n" + "\n".join(lines) + "\n")
 
 
 def findSuperClass(debugger, command, exe_ctx, result, internal_dict):
     """
     Syntax:
-        fsuperclass <className>
+        fsuperclass [--refresh] [--static] <className>
+
+    Options:
+        --refresh/-r; Rebuild the class index, ignoring the disk cache
+        --static/-s; Read the classes from the __objc_classlist sections without evaluating expressions
 
     Examples:
         (lldb) fsuperclass UIButton
+        (lldb) fsuperclass -s UIButton
 
     This command is implemented in HMClassInfoCommands.py
     """
 
-    if len(command) == 0:
+    command_args = shlex.split(command)
+    parser = generate_classIndex_option_parser("fsuperclass", "[--refresh] [--static] <className>")
+    try:
+        # options: optparse.Values
+        # args: list
+        (options, args) = parser.parse_args(command_args)
+    except:
+        result.SetError(parser.usage)
+        return
+
+    if len(args) != 1:
         HM.DPrint("Requires a argument, Please enter \"help fsuperclass\" for help.")
         return
 
-    clsPrefixesValue = HM.getClassPrefixes()[1]
-    command_script = f'''
-        Class inputClass = objc_lookUpClass("{command}");
-
-        if (inputClass == nil) {{   //  Find prefixed class
-            for (NSString *prefix in (NSMutableArray *){clsPrefixesValue.GetValue()}) {{
-                NSString *clsName = [prefix stringByAppendingString:@".{command}"];
-                inputClass = objc_lookUpClass((char *)[clsName UTF8String]);
-                if (inputClass) {{
-                    break;
-                }}
-            }}
-        }}
+    if not HMClassIndex.loadClassIndex(options.refresh, options.static):
+        return
 
-        NSMutableString *result = [[NSMutableString alloc] init];
-        if (inputClass == nil) {{
-            [result appendString:@"Can't find {command} class\\n"];
-        }} else {{
-            [result appendString:[[NSString alloc] initWithUTF8String:class_getName(inputClass)]];
-            for (Class superClass = class_getSuperclass(inputClass); superClass != nil; superClass = class_getSuperclass(superClass)) {{
-                NSString *name = [[NSString alloc] initWithUTF8String:class_getName(superClass)];
-                [result appendFormat:@" : %@", name];
-            }}
-        }}
+    inputClass = HMClassIndex.lookUpClass(args[0])
+    if inputClass is None:
+        HM.DPrint(f"Can't find {args[0]} class\n")
+    else:
+        HM.DPrint(" : ".join(HMClassIndex.className(cls) for cls in HMClassIndex.superclassChain(inputClass)))
 
-        result;
-    '''
 
-    classNames = HM.evaluateExpressionValue(command_script).GetObjectDescription()
-    HM.DPrint(classNames)
+def findProtocol(debugger, command, exe_ctx, result, internal_dict):
+    """
+    Syntax:
+        fprotocol [--subclasses] [--refresh] <protocolName>
+        fprotocol --class <className> [<protocolName>]
+        fprotocol --tree <protocolName>
+
+    Options:
+        --subclasses/-a; Also print the subclasses of the adopting classes, they conform to the protocol too
+        --class/-c; Print the protocols that the class conforms to, or whether it conforms to <protocolName>
+        --tree/-t; Print the protocols that <protocolName> inherits and the protocols that inherit it
+        --refresh/-r; Rebuild the class index and the protocol index
+
+    Examples:
+        (lldb) fprotocol UITableViewDataSource
+        (lldb) fprotocol -a UITableViewDataSource
+        (lldb) fprotocol -c UITableViewController
+        (lldb) fprotocol -c UITableViewController UIScrollViewDelegate
+        (lldb) fprotocol -t UIScrollViewDelegate
+
+    Notice:
+        The protocols of an image are dumped once, by the first query that needs its classes.
+        A class adopts a protocol if it declares the protocol or a protocol that inherits it.
+
+    This command is implemented in HMClassInfoCommands.py
+    """
+
+    command_args = shlex.split(command)
+    parser = generate_findProtocol_option_parser()
+    try:
+        # options: optparse.Values
+        # args: list
+        (options, args) = parser.parse_args(command_args)
+    except:
+        result.SetError(parser.usage)
+        return
+
+    if len(args) != 1 and not (options.cls and len(args) == 0):
+        HM.DPrint("Requires a argument, Please enter \"help fprotocol\" for help.")
+        return
+
+    if options.refresh:
+        HMProtocolIndex.clearProtocolIndex()
+    if not HMClassIndex.loadClassIndex(options.refresh):
+        return
+
+    if options.cls:
+        inputClass = HMClassIndex.lookUpClass(options.cls)
+        if inputClass is None:
+            HM.DPrint(f"Can't find {options.cls} class\n")
+            return
+        chain = HMClassIndex.superclassChain(inputClass)
+        if not HMProtocolIndex.loadProtocols(chain):
+            return
+        if len(args) == 0:
+            printClassProtocols(chain)
+            return
+        protocolName = lookUpProtocolName(args[0])
+        if protocolName is None:
+            return
+        adoption = HMProtocolIndex.conformance(inputClass, protocolName)
+        if adoption is None:
+            HM.DPrint(f"{HMClassIndex.className(inputClass)} doesn't conform to {protocolName}\n")
+        else:
+            HM.DPrint(f"{HMClassIndex.className(inputClass)} conforms to {protocolName}, {HMClassIndex.className(adoption[0])} adopts {adoption[1]}\n")
+        return
+
+    if not HMProtocolIndex.loadProtocols([] if options.tree else None):
+        return
+    protocolName = lookUpProtocolName(args[0])
+    if protocolName is None:
+        return
+
+    if options.tree:
+        lines = []
+        for title, tree in [(f"{protocolName} inherits:", HMProtocolIndex.protocolTree(protocolName, children=False)),
+                            ("Inherited by:", HMProtocolIndex.protocolTree(protocolName))]:
+            lines.append(title)
+            lines.extend("    " * depth + name for name, depth in tree)
+            if len(tree) == 0:
+                lines.append("    None")
+        HM.DPrint("\n".join(lines) + "\n")
+        return
+
+    adoptingClasses = HMProtocolIndex.adoptingClasses(protocolName)
+    adoptingClassSet = {cls for cls, _ in adoptingClasses}
+    lines = []
+    classCount = 0
+    for cls, adoptedProtocol in adoptingClasses:
+        if options.subclasses and any(superclass in adoptingClassSet for superclass in HMClassIndex.superclassChain(cls)[1:]):
+            # Printed in the tree of its superclass
+            continue
+        classCount += 1
+        lines.append(HMClassIndex.className(cls) + ("" if adoptedProtocol == protocolName else f" ({adoptedProtocol})"))
+        if options.subclasses:
+            for subclass, depth in HMClassIndex.subclassTree(cls):
+                classCount += 1
+                lines.append("    " * depth + HMClassIndex.className(subclass))
+    if classCount == 0:
+        HM.DPrint(f"No class conforms to {protocolName}\n")
+        return
+    lines.append(f"Count: {classCount}")
+    HM.DPrint("\n".join(lines) + "\n")
+
+
+def lookUpProtocolName(protocolName: str) -> Optional[str]:
+    name = HMProtocolIndex.lookUpProtocol(protocolName)
+    if name is None:
+        HM.DPrint(f"Can't find {protocolName} protocol\n")
+    return name
+
+
+def printClassProtocols(chain: List[int]) -> None:
+    # The protocols adopted by each class of the chain, then every protocol the first class conforms to
+    lines = []
+    conformedProtocols = set()
+    for cls in chain:
+        adoptedProtocols = HMProtocolIndex.gClassProtocols.get(cls, [])
+        if len(adoptedProtocols) > 0:
+            lines.append(f"{HMClassIndex.className(cls)}: {', '.join(adoptedProtocols)}")
+        for adoptedProtocol in adoptedProtocols:
+            conformedProtocols |= HMProtocolIndex.protocolAncestors(adoptedProtocol)
+    if len(conformedProtocols) == 0:
+        HM.DPrint(f"{HMClassIndex.className(chain[0])} doesn't conform to any protocol\n")
+        return
+    lines.append(f"Conforms to {len(conformedProtocols)} protocols: {', '.join(sorted(conformedProtocols))}")
+    HM.DPrint("\n".join(lines) + "\n")
 
 
 def findMethod(debugger, command, exe_ctx, result, internal_dict):
     """
     Syntax:
-        fmethod <methodName>  (Case insensitive.)
+        fmethod [--refresh] [--limit <count>] <methodName>  (Case insensitive.)
         fmethod [--class] <className>
 
     Options:
         --class/-c; Find all method in the class
+        --refresh/-r; Rebuild the selector index, ignoring the disk cache
+        --limit/-l; Stop after <count> methods
 
     Examples:
         (lldb) fmethod viewdid
         (lldb) fmethod viewDidLayoutSubviews
+        (lldb) fmethod -l 10 set
         (lldb) fmethod -c UITableViewController
 
+    Notice:
+        The methods are indexed once per stop, see HMSelectorIndex.py
+        While the images don't change, later stops only index the methods of the classes created at run time again.
+        The methods are printed while the index is built, Control-C stops it.
+
     This command is implemented in HMClassInfoCommands.py
     """
 
@@ -398,136 +678,90 @@ def findMethod(debugger, command, exe_ctx, result, internal_dict):
         result.SetError(parser.usage)
         return
 
-    if not options.cls:
-        if len(args) != 1:
-            HM.DPrint("Error input, Please enter \"help fmethod\" for help.")
-            return
-        elif len(args[0]) <= 5:
-            HM.DPrint("Argument length must be greater than 5.")
-            return
+    if not options.cls and len(args) != 1:
+        HM.DPrint("Error input, Please enter \"help fmethod\" for help.")
+        return
 
+    if options.cls:
+        HM.DPrint("Waiting...")
+        findMethodsOfClass(options.cls)
+    else:
+        findMethodsByName(args[0], options.refresh, options.limit)
 
-    HM.DPrint("Waiting...")
 
-    if options.cls:
-        clsPrefixesValue = HM.getClassPrefixes()[1]
-        command_script = f'''
-            NSMutableString *result = [[NSMutableString alloc] init];
-            Class inputClass = objc_lookUpClass("{options.cls}");
-            if (inputClass == nil) {{   //  Find prefixed class
-                for (NSString *prefix in (NSMutableArray *){clsPrefixesValue.GetValue()}) {{
-                    NSString *clsName = [prefix stringByAppendingString:@".{options.cls}"];
-                    inputClass = objc_lookUpClass((char *)[clsName UTF8String]);
-                    if (inputClass) {{
-                        break;
-                    }}
-                }}
-            }}
-
-            if (inputClass == nil) {{
-                [result appendString:@"Can't find {options.cls} class\\n"];
-            }} else {{
-                unsigned int instanceMethodCount;
-                Method *instanceMethodList = class_copyMethodList(inputClass, &instanceMethodCount);
-                for (int j = 0; j < instanceMethodCount; ++j) {{
-                    Method method = instanceMethodList[j];
-                    SEL sel = method_getName(method);
-                    NSString *selName = [[NSString alloc] initWithUTF8String:sel_getName(sel)];
-                    [result appendFormat:@"(-) %@\\n\\tType encoding:%s\\n", selName, method_getTypeEncoding(method)];
-                }}
-                free(instanceMethodList);
-                
-                unsigned int classMethodCount = 0;
-                Class metaCls = object_getClass(inputClass);
-                if (class_isMetaClass(metaCls)) {{
-                    Method *classMethodList = class_copyMethodList(metaCls, &classMethodCount);
-                    for (int j = 0; j < classMethodCount; ++j) {{
-                        Method method = classMethodList[j];
-                        SEL sel = method_getName(method);
-                        NSString *selName = [[NSString alloc] initWithUTF8String:sel_getName(sel)];
-                        [result appendFormat:@"(+) %@\\n\\tType encoding:%s\\n", selName, method_getTypeEncoding(method)];
-                    }}
-                    free(classMethodList);
-                }}
-                
-                if (instanceMethodCount + classMethodCount == 0) {{
-                    [result insertString:@"No method found.\\n" atIndex:0];
-                }} else {{
-                    [result insertString:[[NSString alloc] initWithFormat:@"Instance methods count: %u. Class method count: %u.\\n", instanceMethodCount, classMethodCount] atIndex:0];
-                    NSString *clsName = [[NSString alloc] initWithUTF8String:class_getName(inputClass)];
-                    [result insertString:[[NSString alloc] initWithFormat:@"Class: %@ (%p)\\n", clsName, inputClass] atIndex:0];
-                }}
-            }}
-            
-            result;
-        '''
+def findMethodsOfClass(className: str) -> None:
+    # The first record is "name<0x1f>address" of the class, the other records are "+/-<0x1f>selector<0x1f>type encoding"
+    if HMClassResolver.isUnresolved(className):
+        HM.DPrint(f"Can't find {className} class\n")
+        return
+
+    statement, argument = HMClassResolver.classStatement(className, 0)
+    command_script = f'''
+        {statement}
+        if (inputClass) {{
+            HMAppendClassMethods(inputClass, NO);
+        }}
+    '''
 
+    records = HM.evaluateExpressionRecords(command_script, arguments=[argument])
+    if records is None:
+        return
+
+    if len(records) == 0:
+        HMClassResolver.addUnresolvedClass(className)
+        HM.DPrint(f"Can't find {className} class\n")
+        return
+
+    HMClassResolver.addResolvedClass(className, int(HM.splitRecordFields(records[0])[1], 16))
+
+    if len(records) == 1:
+        HM.DPrint("No method found.\n")
+        return
+
+    clsName, address = HM.splitRecordFields(records[0])
+    methodsDescription = ""
+    instanceMethodCount = 0
+    for record in records[1:]:
+        sign, selName, typeEncoding = HM.splitRecordFields(record)
+        if sign == "-":
+            instanceMethodCount += 1
+        methodsDescription += f"({sign}) {selName}\n\tType encoding:{typeEncoding}\n"
+
+    classMethodCount = len(records) - 1 - instanceMethodCount
+    HM.DPrint(f"Class: {clsName} ({address})\nInstance methods count: {instanceMethodCount}. Class method count: {classMethodCount}.\n" + methodsDescription)
+
+
+def findMethodsByName(methodName: str, refresh=False, limit: Optional[int] = None) -> None:
+    count = 0
+
+    def printMethods(start: int, end: int) -> bool:
+        # Print the matching methods of each batch, stop the index at the limit
+        nonlocal count
+        result = ""
+        for methodID in HMSelectorIndex.findMethods(methodName, start, end):
+            if limit is not None and count >= limit:
+                break
+            result += f"({HMSelectorIndex.gMethodSigns[methodID]}) {HMSelectorIndex.methodSelector(methodID)}\n\tType encoding:{HMSelectorIndex.gMethodTypeEncodings[methodID]}\n\tClass:{HMSelectorIndex.methodClassName(methodID)}\n"
+            count += 1
+        if len(result) > 0:
+            print(result, end="")
+        return limit is None or count < limit
+
+    if not HMSelectorIndex.loadSelectorIndex(refresh, printMethods):
+        if count > 0:
+            HM.DPrint(f"Methods count: {count} \n")
+        return
+
+    if count == 0:
+        HM.DPrint("No method found.\n")
+    elif limit is not None and count >= limit:
+        HM.DPrint(f"Methods count: {count} (--limit {limit}) \n")
     else:
-        inputMethodName = args[0].lower()
-        command_script = f'''
-            NSString *inputMethodName = [[NSString alloc] initWithUTF8String:"{inputMethodName}"];
-            
-            NSMutableString *result = [[NSMutableString alloc] init];
-        
-            unsigned int classCount;
-            unsigned int findCount = 0;
-            Class *classList = objc_copyClassList(&classCount);
-        
-            for (int i = 0; i < classCount; ++i) {{
-                Class cls = classList[i];
-                // Instance Methods
-                unsigned int instanceMethodCount;
-                Method *instanceMethodList = class_copyMethodList(cls, &instanceMethodCount);
-        
-                for (int j = 0; j < instanceMethodCount; ++j) {{
-                    Method method = instanceMethodList[j];
-                    SEL sel = method_getName(method);
-                    NSString *selName = [[NSString alloc] initWithUTF8String:sel_getName(sel)];
-                    if ([[selName lowercaseString] containsString:inputMethodName]) {{
-                        NSString *clsName = [[NSString alloc] initWithUTF8String:class_getName(cls)];
-                        [result appendFormat:@"(-) %@\\n\\tType encoding:%s\\n\\tClass:%@\\n", selName, method_getTypeEncoding(method), clsName];
-                        findCount += 1;
-                    }}
-                }}
-                free(instanceMethodList);
-                
-                // Class Methods
-                Class metaCls = object_getClass(cls);
-                if (!class_isMetaClass(metaCls)) {{
-                    continue;
-                }}
-                unsigned int classMethodCount;
-                Method *classMethodList = class_copyMethodList(metaCls, &classMethodCount);
-        
-                for (int j = 0; j < classMethodCount; ++j) {{
-                    Method method = classMethodList[j];
-                    SEL sel = method_getName(method);
-                    NSString *selName = [[NSString alloc] initWithUTF8String:sel_getName(sel)];
-                    if ([[selName lowercaseString] containsString:inputMethodName]) {{
-                        NSString *clsName = [[NSString alloc] initWithUTF8String:class_getName(cls)];
-                        [result appendFormat:@"(+) %@\\n\\tType encoding:%s\\n\\tClass:%@\\n", selName, method_getTypeEncoding(method), clsName];
-                        findCount += 1;
-                    }}
-                }}
-                free(classMethodList);
-            }}
-            if (findCount == 0) {{
-                [result insertString:@"No method found.\\n" atIndex:0];
-            }} else {{
-                [result insertString:[[NSString alloc] initWithFormat:@"Methods count: %u \\n", findCount] atIndex:0];
-            }}
-
-            free(classList);
-            result;
-        '''
-
-    result = HM.evaluateExpressionValue(command_script).GetObjectDescription()
-    HM.DPrint(result)
+        HM.DPrint(f"Methods count: {count} \n")
 
 
 def generate_methods_option_parser() -> optparse.OptionParser:
-    usage = "usage: methods [-s] <className/classInstance>"
-    parser = optparse.OptionParser(usage=usage, prog="fsubclass")
+    parser = generate_description_option_parser("methods", "[-s] <className/classInstance>")
     parser.add_option("-s", "--short",
                       action="store_true",
                       default=False,
@@ -537,25 +771,134 @@ def generate_methods_option_parser() -> optparse.OptionParser:
     return parser
 
 
+def generate_description_option_parser(prog: str, arguments: str) -> optparse.OptionParser:
+    usage = f"usage: {prog} [--diff] {arguments}"
+    parser = optparse.OptionParser(usage=usage, prog=prog)
+    parser.add_option("-d", "--diff",
+                      action="store_true",
+                      default=False,
+                      dest="diff",
+                      help="Only print the lines that changed since the last description")
+
+    return parser
+
+
+def generate_classIndex_option_parser(prog: str, arguments: str) -> optparse.OptionParser:
+    usage = f"usage: {prog} {arguments}"
+    parser = optparse.OptionParser(usage=usage, prog=prog)
+    parser.add_option("-r", "--refresh",
+                      action="store_true",
+                      default=False,
+                      dest="refresh",
+                      help="Rebuild the class index, ignoring the disk cache")
+    parser.add_option("-s", "--static",
+                      action="store_true",
+                      default=False,
+                      dest="static",
+                      help="Read the classes from the __objc_classlist sections without evaluating expressions")
+
+    return parser
+
+
+def generate_findClass_option_parser() -> optparse.OptionParser:
+    parser = generate_classIndex_option_parser("fclass", "[--refresh] [--static] [--limit <count>] [--regex | --glob | --fuzzy] <className>")
+    parser.add_option("-l", "--limit",
+                      action="store",
+                      type="int",
+                      default=None,
+                      dest="limit",
+                      help="Stop after <count> classes")
+    parser.add_option("-e", "--regex",
+                      action="store_true",
+                      default=False,
+                      dest="regex",
+                      help="Search with a regular expression")
+    parser.add_option("-g", "--glob",
+                      action="store_true",
+                      default=False,
+                      dest="glob",
+                      help="Search with a glob pattern")
+    parser.add_option("-f", "--fuzzy",
+                      action="store_true",
+                      default=False,
+                      dest="fuzzy",
+                      help="Search the classes containing the characters in order")
+
+    return parser
+
+
 def generate_findSubclass_option_parser() -> optparse.OptionParser:
-    usage = "usage: fsubclass [-n] <className>"
-    parser = optparse.OptionParser(usage=usage, prog="fsubclass")
+    parser = generate_classIndex_option_parser("fsubclass", "[-n] [-d <depth>] [-c] [-i <image>] [--refresh] [--static] <className>")
     parser.add_option("-n", "--nonrecursively",
                       action="store_true",
                       default=False,
                       dest="nonrecursively",
-                      help="Find subclass non-recursively")
+                      help="Find subclass non-recursively, the same as --depth 1")
+    parser.add_option("-d", "--depth",
+                      action="store",
+                      type="int",
+                      default=None,
+                      dest="depth",
+                      help="Only find the subclasses up to <depth> levels below the class")
+    parser.add_option("-c", "--count-only",
+                      action="store_true",
+                      default=False,
+                      dest="count_only",
+                      help="Only print the number of subclasses")
+    parser.add_option("-i", "--image",
+                      action="store",
+                      default=None,
+                      dest="image",
+                      help="Only count the subclasses in the images whose paths contain <image>")
+
+    return parser
+
+
+def generate_findProtocol_option_parser() -> optparse.OptionParser:
+    usage = "usage: fprotocol [-a] [-r] <protocolName> | fprotocol -c <className> [<protocolName>] | fprotocol -t <protocolName>"
+    parser = optparse.OptionParser(usage=usage, prog="fprotocol")
+    parser.add_option("-a", "--subclasses",
+                      action="store_true",
+                      default=False,
+                      dest="subclasses",
+                      help="Also print the subclasses of the adopting classes")
+    parser.add_option("-c", "--class",
+                      action="store",
+                      default=None,
+                      dest="cls",
+                      help="Print the protocols that the class conforms to")
+    parser.add_option("-t", "--tree",
+                      action="store_true",
+                      default=False,
+                      dest="tree",
+                      help="Print the protocols that the protocol inherits and the protocols that inherit it")
+    parser.add_option("-r", "--refresh",
+                      action="store_true",
+                      default=False,
+                      dest="refresh",
+                      help="Rebuild the class index and the protocol index")
 
     return parser
 
 
 def generate_findMethod_option_parser() -> optparse.OptionParser:
-    usage = "usage: fmethod [-c] <className>"
+    usage = "usage: fmethod [-r] [-l <count>] <methodName> | fmethod -c <className>"
     parser = optparse.OptionParser(usage=usage, prog="fmethod")
     parser.add_option("-c", "--class",
                       action="store",
                       default=None,
                       dest="cls",
                       help="Find all method in the class")
+    parser.add_option("-r", "--refresh",
+                      action="store_true",
+                      default=False,
+                      dest="refresh",
+                      help="Rebuild the selector index, ignoring the disk cache")
+    parser.add_option("-l", "--limit",
+                      action="store",
+                      type="int",
+                      default=None,
+                      dest="limit",
+                      help="Stop after <count> methods")
 
     return parser
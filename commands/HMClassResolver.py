@@ -0,0 +1,102 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+import re
+from typing import Dict, Optional, Tuple
+import HMLLDBHelpers as HM
+import HMClassIndex
+import HMStaticClassIndex
+
+
+# Resolves the class names typed by the user, shared by the commands that take a class name.
+# A name may omit the Swift module prefix, or be a mangled Swift name such as "_TtC5MyApp14ViewController".
+# Classes are never unloaded, so a resolved class is kept until the app is relaunched.
+# A name that isn't found is cached until the next stop or class registration, when new classes may exist.
+gResolverProcessUID = 0
+gResolvedClasses: Dict[str, int] = {}                   # input -> class
+gUnresolvedClasses: Dict[str, Tuple[int, int]] = {}     # input -> (stop ID, class registrations) when it wasn't found
+
+kClassNamePattern = re.compile(r"^[A-Za-z_$][\w$]*(\.[A-Za-z_$][\w$]*)*$")
+
+
+def isClassName(inputStr: str) -> bool:
+    # False for expressions such as "[UIView new]" or "0x10e016000"
+    return kClassNamePattern.match(inputStr) is not None
+
+
+def checkProcess() -> None:
+    global gResolverProcessUID
+    processUID = HM.currentStopGeneration()[0]
+    if processUID != gResolverProcessUID:
+        gResolverProcessUID = processUID
+        gResolvedClasses.clear()
+        gUnresolvedClasses.clear()
+
+
+def cachedClass(className: str) -> Optional[int]:
+    # The class of the name without evaluating expressions, from the resolved names or the class index
+    checkProcess()
+    cls = gResolvedClasses.get(className)
+    if cls is not None:
+        return cls
+
+    if HMClassIndex.gClassIndexGeneration == HMClassIndex.classIndexGeneration():
+        HMClassIndex.mergeRegisteredClasses()
+        cls = HMClassIndex.lookUpClass(HMStaticClassIndex.demangleSwiftClassName(className))
+        if cls is not None:
+            gResolvedClasses[className] = cls
+    return cls
+
+
+def isUnresolved(className: str) -> bool:
+    # The name wasn't found at this stop
+    checkProcess()
+    return gUnresolvedClasses.get(className) == (HM.currentStopGeneration()[1], HM.gClassRegistrations)
+
+
+def addResolvedClass(className: str, cls: int) -> None:
+    checkProcess()
+    gResolvedClasses[className] = cls
+    gUnresolvedClasses.pop(className, None)
+
+
+def addUnresolvedClass(className: str) -> None:
+    checkProcess()
+    gUnresolvedClasses[className] = (HM.currentStopGeneration()[1], HM.gClassRegistrations)
+
+
+def classStatement(className: str, argumentIndex=0) -> Tuple[str, str]:
+    # (Objective-C statement that declares "inputClass", the argument HMArgs[argumentIndex] it reads).
+    # A cached class is passed as a pointer, otherwise the name is looked up in the same expression
+    # and the caller reports the result with addResolvedClass or addUnresolvedClass.
+    cls = cachedClass(className)
+    if cls is not None:
+        return f"Class inputClass = (Class)HMArgPointer({argumentIndex});", hex(cls)
+    return HM.lookUpClassScript(argumentIndex), HMStaticClassIndex.demangleSwiftClassName(className)
+
+
+def clearResolvedClasses() -> None:
+    global gResolverProcessUID
+    gResolverProcessUID = 0
+    gResolvedClasses.clear()
+    gUnresolvedClasses.clear()
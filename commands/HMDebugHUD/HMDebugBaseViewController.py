@@ -37,20 +37,16 @@ def register() -> None:
     HMProgressHUD.show(f"Register {gClassName}...")
     HM.DPrint(f"Register {gClassName}...")
 
-    classValue = HM.allocateClass(gClassName, "UIViewController")
-    HM.registerClass(classValue.GetValue())
-
-    # Add methods
-    HM.DPrint(f"Add methods to {gClassName}...")
-    viewDidLoadIMPValue = makeViewDidLoadIMP()
-    if not HM.judgeSBValueHasValue(viewDidLoadIMPValue):
+    methods = [
+        ("-", "viewDidLoad", "v@:", makeViewDidLoadIMP())
+    ]
+    if HM.registerClassSpec(gClassName, "UIViewController", [], methods) is None:
         return
-    HM.addInstanceMethod(gClassName, "viewDidLoad", viewDidLoadIMPValue.GetValue(), "v@:")
 
     HM.DPrint(f"Register {gClassName} done!")
 
 
-def makeViewDidLoadIMP() -> lldb.SBValue:
+def makeViewDidLoadIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             Class cls = objc_lookUpClass("{gClassName}");
@@ -75,4 +71,4 @@ def makeViewDidLoadIMP() -> lldb.SBValue:
 
      '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
@@ -21,10 +21,13 @@
 # SOFTWARE.
 
 import lldb
+import optparse
+import shlex
 import HMLLDBHelpers as HM
 import HMLLDBClassInfo
 import HMDebugBaseViewController
 import HMDebugMainViewController
+import HMDebugPrewarm
 import HMProgressHUD
 import HMExpressionPrefix
 
@@ -40,10 +43,14 @@ gClassName = "HMDebugHUD"
 def showDebugHUD(debugger, command, exe_ctx, result, internal_dict):
     """
     Syntax:
-        showhud
+        showhud [--prewarm]
+
+    Options:
+        --prewarm/-p; Register the classes of the pages in the background after the process continues
 
     Examples:
         (lldb) showhud
+        (lldb) showhud -p
 
     Summary:
         Show debug HUD.
@@ -52,16 +59,34 @@ def showDebugHUD(debugger, command, exe_ctx, result, internal_dict):
         3.FPS in main thread.
         The UI style is based on https://github.com/meitu/MTHawkeye
 
+    Notice:
+        The pages of the HUD are registered when they are tapped, and the app waits for it.
+        With --prewarm, the app stops briefly every half a second after the command, and registers one class each time.
+
     This command is implemented in HMDebugHUD.py
     """
 
+    command_args = shlex.split(command)
+    parser = generate_option_parser()
+    try:
+        # options: optparse.Values
+        # args: list
+        (options, args) = parser.parse_args(command_args)
+    except:
+        result.SetError(parser.usage)
+        return
+
     global gClassName
     if isDisplayingHUD():
         HM.DPrint(f"{gClassName} is already on display")
+        if options.prewarm:
+            HMDebugPrewarm.startPrewarm()
         HM.processContinue()
         return
     elif HM.existClass(gClassName):
         showHUDFunc()
+        if options.prewarm:
+            HMDebugPrewarm.startPrewarm()
         HM.processContinue()
         return
 
@@ -69,46 +94,36 @@ def showDebugHUD(debugger, command, exe_ctx, result, internal_dict):
     HMProgressHUD.show(f"Register {gClassName}...")
     HM.DPrint(f"Register {gClassName}...")
 
-    classValue = HM.allocateClass(gClassName, "UIView")
-    HM.addIvar(classValue.GetValue(), "_link", "CADisplayLink *")
-    HM.addIvar(classValue.GetValue(), "_count", "int")  # count in 1 second
-    HM.addIvar(classValue.GetValue(), "_lastTime", "double")
-
-    HM.addIvar(classValue.GetValue(), "_memoryLab", "UILabel *")
-    HM.addIvar(classValue.GetValue(), "_cpuUtilizationLab", "UILabel *")
-    HM.addIvar(classValue.GetValue(), "_fpsLab", "UILabel *")
-
-    HM.registerClass(classValue.GetValue())
-
-    # Add methods
-    HM.DPrint(f"Add methods to {gClassName}...")
-
-    addToKeyWindowIMPValue = makeAddToKeyWindowIMP()
-    if not HM.judgeSBValueHasValue(addToKeyWindowIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addClassMethod(gClassName, "addToKeyWindow", addToKeyWindowIMPValue.GetValue(), "@@:")
-
-    tapSelfIMPValue = makeTapSelfIMP()
-    if not HM.judgeSBValueHasValue(tapSelfIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "tapSelf", tapSelfIMPValue.GetValue(), "v@:")
-
-    # Add methods(update)
-    if not addUpdateMethods():
-        HMProgressHUD.hide()
-        return
-
-    # Add methods(move)
-    HM.DPrint(f"Add methods to {gClassName}......")
-    if not addMoveMethods():
+    ivars = [
+        ("_link", "CADisplayLink *"),
+        ("_count", "int"),  # count in 1 second
+        ("_lastTime", "double"),
+        ("_memoryLab", "UILabel *"),
+        ("_cpuUtilizationLab", "UILabel *"),
+        ("_fpsLab", "UILabel *")
+    ]
+    methods = [
+        ("+", "addToKeyWindow", "@@:", makeAddToKeyWindowIMP()),
+        ("-", "tapSelf", "v@:", makeTapSelfIMP()),
+        # update
+        ("-", "debugHUDtick:", "v@:@", makeDebugHUDtickIMP()),
+        ("-", "updateMemoryFootprint", "v@:", makeUpdateMemoryFootprintIMP()),
+        ("-", "updateCPUUtilization", "v@:", makeUpdateCPUUtilizationIMP()),
+        ("-", "updateFPS:", "v@:i", makeUpdateFPSIMP()),
+        # move
+        ("-", "touchesMoved:withEvent:", "v@:@@", makeTouchesMovedWithEventIMP()),
+        ("-", "touchesEnded:withEvent:", "v@:@@", makeTouchesEndedWithEventIMP()),
+        ("-", "touchesCancelled:withEvent:", "v@:@@", makeTouchesCancelledWithEventIMP()),
+        ("-", "attachToEdge", "v@:", makeAttachToEdgeIMP())
+    ]
+    statusTable = HM.registerClassSpec(gClassName, "UIView", ivars, methods, HMExpressionPrefix.gPrefix)
+    if statusTable is None:
         HMProgressHUD.hide()
         return
 
     # Add breakpoint in tapSelf
     HM.DPrint("Add breakpoint to hook method...")
-    HM.addOneShotBreakPointInIMP(tapSelfIMPValue, "HMDebugHUD.tapSelfBreakPointHandler", "HMDebugHUD_TapSelf_Breakpoint")
+    HM.addOneShotBreakPointInIMP(statusTable["-tapSelf"], "HMDebugHUD.tapSelfBreakPointHandler", "HMDebugHUD_TapSelf_Breakpoint")
 
     HM.DPrint(f"Register {gClassName} done!")
 
@@ -117,6 +132,9 @@ def showDebugHUD(debugger, command, exe_ctx, result, internal_dict):
 
     HMProgressHUD.hide()
 
+    if options.prewarm:
+        HMDebugPrewarm.startPrewarm()
+
     HM.processContinue()
 
 
@@ -192,37 +210,11 @@ def showHUDFunc() -> None:
 
 
 def currentTask() -> lldb.SBValue:
-    taskValue = HM.evaluateExpressionValue("(unsigned int)(long)mach_task_self_")
+    taskValue = HM.evaluateExpressionValue("(unsigned int)(long)mach_task_self_", useCache=True)
     return taskValue
 
 
-def addUpdateMethods() -> bool:
-    global gClassName
-
-    debugHUDtickIMPValue = makeDebugHUDtickIMP()
-    if not HM.judgeSBValueHasValue(debugHUDtickIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "debugHUDtick:", debugHUDtickIMPValue.GetValue(), "v@:@")
-
-    updateMemoryFootprintIMPValue = makeUpdateMemoryFootprintIMP()
-    if not HM.judgeSBValueHasValue(updateMemoryFootprintIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "updateMemoryFootprint", updateMemoryFootprintIMPValue.GetValue(), "v@:")
-
-    updateCPUUtilizationIMPValue = makeUpdateCPUUtilizationIMP()
-    if not HM.judgeSBValueHasValue(updateCPUUtilizationIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "updateCPUUtilization", updateCPUUtilizationIMPValue.GetValue(), "v@:")
-
-    updateFPSIMPValue = makeUpdateFPSIMP()
-    if not HM.judgeSBValueHasValue(updateFPSIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "updateFPS:", updateFPSIMPValue.GetValue(), "v@:i")
-
-    return True
-
-
-def makeAddToKeyWindowIMP() -> lldb.SBValue:
+def makeAddToKeyWindowIMP() -> str:
     command_script = f'''
 
         UIView * (^addToKeyWindowBlock)(id) = ^UIView *(id classSelf) {{
@@ -263,10 +255,10 @@ def makeAddToKeyWindowIMP() -> lldb.SBValue:
 
     '''
 
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeTapSelfIMP() -> lldb.SBValue:
+def makeTapSelfIMP() -> str:
     command_script = f'''
         void (^tapSelfBlock)(UIView *) = ^(UIView *HUD) {{
             Class cls = (Class)objc_lookUpClass("{HMDebugMainViewController.gClassName}");
@@ -276,10 +268,10 @@ def makeTapSelfIMP() -> lldb.SBValue:
         imp_implementationWithBlock(tapSelfBlock);
 
     '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeDebugHUDtickIMP() -> lldb.SBValue:
+def makeDebugHUDtickIMP() -> str:
     command_script = '''
 
         void (^debugHUDtickBlock)(UIView *, CADisplayLink *) = ^(UIView *HUD, CADisplayLink *link) {
@@ -306,10 +298,10 @@ def makeDebugHUDtickIMP() -> lldb.SBValue:
         imp_implementationWithBlock(debugHUDtickBlock);
 
     '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeUpdateMemoryFootprintIMP() -> lldb.SBValue:
+def makeUpdateMemoryFootprintIMP() -> str:
 
     command_script = f'''
     
@@ -345,10 +337,10 @@ def makeUpdateMemoryFootprintIMP() -> lldb.SBValue:
         
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeUpdateCPUUtilizationIMP() -> lldb.SBValue:
+def makeUpdateCPUUtilizationIMP() -> str:
     command_script = f'''
 
         void (^updateCPUUtilizationBlock)(UIView *) = ^(UIView *HUD) {{
@@ -408,10 +400,10 @@ def makeUpdateCPUUtilizationIMP() -> lldb.SBValue:
 
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeUpdateFPSIMP() -> lldb.SBValue:
+def makeUpdateFPSIMP() -> str:
     command_script = '''
 
         void (^updateFPSBlock)(UIView *, int) = ^(UIView *HUD, int fps) {
@@ -436,36 +428,10 @@ def makeUpdateFPSIMP() -> lldb.SBValue:
         imp_implementationWithBlock(updateFPSBlock);
 
     '''
-    return HM.evaluateExpressionValue(command_script)
-
-
-def addMoveMethods() -> bool:
-    global gClassName
+    return command_script
 
-    touchesMovedWithEventIMPValue = makeTouchesMovedWithEventIMP()
-    if not HM.judgeSBValueHasValue(touchesMovedWithEventIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "touchesMoved:withEvent:", touchesMovedWithEventIMPValue.GetValue(), "v@:@@")
 
-    touchesEndedWithEventIMPValue = makeTouchesEndedWithEventIMP()
-    if not HM.judgeSBValueHasValue(touchesEndedWithEventIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "touchesEnded:withEvent:", touchesEndedWithEventIMPValue.GetValue(), "v@:@@")
-
-    touchesCancelledWithEventIMPValue = makeTouchesCancelledWithEventIMP()
-    if not HM.judgeSBValueHasValue(touchesCancelledWithEventIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "touchesCancelled:withEvent:", touchesCancelledWithEventIMPValue.GetValue(), "v@:@@")
-
-    attachToEdgeIMPValue = makeAttachToEdgeIMP()
-    if not HM.judgeSBValueHasValue(attachToEdgeIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "attachToEdge", attachToEdgeIMPValue.GetValue(), "v@:")
-
-    return True
-
-
-def makeTouchesMovedWithEventIMP() -> lldb.SBValue:
+def makeTouchesMovedWithEventIMP() -> str:
     command_script = f'''
 
         void (^touchesMovedWithEventBlock)(UIView *, NSSet *, UIEvent *) = ^(UIView *HUD, NSSet * touches, UIEvent *event) {{
@@ -501,10 +467,10 @@ def makeTouchesMovedWithEventIMP() -> lldb.SBValue:
         imp_implementationWithBlock(touchesMovedWithEventBlock);
 
     '''
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeTouchesEndedWithEventIMP() -> lldb.SBValue:
+def makeTouchesEndedWithEventIMP() -> str:
     command_script = f'''
 
         void (^touchesEndedWithEventBlock)(UIView *, NSSet *, UIEvent *) = ^(UIView *HUD, NSSet * touches, UIEvent *event) {{
@@ -522,10 +488,10 @@ def makeTouchesEndedWithEventIMP() -> lldb.SBValue:
         imp_implementationWithBlock(touchesEndedWithEventBlock);
 
     '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeTouchesCancelledWithEventIMP() -> lldb.SBValue:
+def makeTouchesCancelledWithEventIMP() -> str:
     command_script = f'''
 
         void (^touchesCancelledWithEventBlock)(UIView *, NSSet *, UIEvent *) = ^(UIView *HUD, NSSet * touches, UIEvent *event) {{
@@ -543,10 +509,10 @@ def makeTouchesCancelledWithEventIMP() -> lldb.SBValue:
         imp_implementationWithBlock(touchesCancelledWithEventBlock);
 
     '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeAttachToEdgeIMP() -> lldb.SBValue:
+def makeAttachToEdgeIMP() -> str:
     command_script = '''
 
         void (^attachToEdgeBlock)(UIView *, NSSet *, UIEvent *) = ^(UIView *HUD, NSSet * touches, UIEvent *event) {
@@ -594,10 +560,22 @@ def makeAttachToEdgeIMP() -> lldb.SBValue:
         imp_implementationWithBlock(attachToEdgeBlock);
 
     '''
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
 def tapSelfBreakPointHandler(frame, bp_loc, internal_dict) -> bool:
     HMDebugMainViewController.register()
     HM.processContinue()
     return True
+
+
+def generate_option_parser() -> optparse.OptionParser:
+    usage = "usage: showhud [--prewarm]"
+    parser = optparse.OptionParser(usage=usage, prog="showhud")
+    parser.add_option("-p", "--prewarm",
+                      action="store_true",
+                      default=False,
+                      dest="prewarm",
+                      help="Register the classes of the pages in the background after the process continues")
+
+    return parser
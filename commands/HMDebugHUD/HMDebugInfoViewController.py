@@ -41,23 +41,17 @@ def register() -> None:
     HMProgressHUD.show(f"Register {gClassName}...")
     HM.DPrint(f"Register {gClassName}...")
 
-    classValue = HM.allocateClass(gClassName, HMDebugBaseViewController.gClassName)
-    HM.addIvar(classValue.GetValue(), "_leftTextArray", "NSMutableArray *")
-    HM.addIvar(classValue.GetValue(), "_rightTextArray", "NSMutableArray *")
-    HM.registerClass(classValue.GetValue())
-
-    # Add methods
-    HM.DPrint(f"Add methods to {gClassName}...")
-    viewDidLoadIMPValue = makeViewDidLoadIMP()
-    if not HM.judgeSBValueHasValue(viewDidLoadIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "viewDidLoad", viewDidLoadIMPValue.GetValue(), "v@:")
-
-    # Methods related to tableView.
-    HM.DPrint(f"Add methods to {gClassName}......")
-
-    if not addTableViewMethods():
+    ivars = [
+        ("_leftTextArray", "NSMutableArray *"),
+        ("_rightTextArray", "NSMutableArray *")
+    ]
+    methods = [
+        ("-", "viewDidLoad", "v@:", makeViewDidLoadIMP()),
+        # Methods related to tableView.
+        ("-", "tableView:numberOfRowsInSection:", "q@:@q", makeNumberOfRowsInSectionIMP()),
+        ("-", "tableView:cellForRowAtIndexPath:", "@@:@@", makeCellForRowAtIndexPathIMP())
+    ]
+    if HM.registerClassSpec(gClassName, HMDebugBaseViewController.gClassName, ivars, methods) is None:
         HMProgressHUD.hide()
         return
 
@@ -65,7 +59,7 @@ def register() -> None:
     HMProgressHUD.hide()
 
 
-def makeViewDidLoadIMP() -> lldb.SBValue:
+def makeViewDidLoadIMP() -> str:
     lldbVersion = lldb.debugger.GetVersionString().replace('\n', '\\n')
     targetTriple = lldb.debugger.GetSelectedTarget().GetTriple()
     pythonVersion = sys.version.replace('\n', '\\n')
@@ -172,26 +166,10 @@ def makeViewDidLoadIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
-
-
-def addTableViewMethods() -> bool:
-    global gClassName
-
-    numberOfRowsInSectionIMPValue = makeNumberOfRowsInSectionIMP()
-    if not HM.judgeSBValueHasValue(numberOfRowsInSectionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:numberOfRowsInSection:", numberOfRowsInSectionIMPValue.GetValue(), "q@:@q")
-
-    cellForRowAtIndexPathIMPValue = makeCellForRowAtIndexPathIMP()
-    if not HM.judgeSBValueHasValue(cellForRowAtIndexPathIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:cellForRowAtIndexPath:", cellForRowAtIndexPathIMPValue.GetValue(), "@@:@@")
-
-    return True
+    return command_script
 
 
-def makeNumberOfRowsInSectionIMP() -> lldb.SBValue:
+def makeNumberOfRowsInSectionIMP() -> str:
     command_script = '''
         long (^IMPBlock)(UIViewController *, UITableView *, long) = ^long(UIViewController *vc, UITableView *tv, long section) {
             NSMutableArray *leftTextArray = (NSMutableArray *)[vc valueForKey:@"_leftTextArray"];
@@ -201,10 +179,10 @@ def makeNumberOfRowsInSectionIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeCellForRowAtIndexPathIMP() -> lldb.SBValue:
+def makeCellForRowAtIndexPathIMP() -> str:
     command_script = '''
         UITableViewCell * (^IMPBlock)(UIViewController *, UITableView *, NSIndexPath *) = ^UITableViewCell *(UIViewController *vc, UITableView *tv, NSIndexPath *indexPath) {
             NSString * reuseIdentifier = @"Cell";
@@ -257,4 +235,4 @@ def makeCellForRowAtIndexPathIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
@@ -44,46 +44,34 @@ def register() -> None:
     HMProgressHUD.show(f"Register {gClassName}...")
     HM.DPrint(f"Register {gClassName}...")
 
-    classValue = HM.allocateClass(gClassName, HMDebugBaseViewController.gClassName)
-    HM.registerClass(classValue.GetValue())
-
-    # Add methods
-    HM.DPrint(f"Add methods to {gClassName}...")
-    presentIMPValue = makePresentIMP()
-    if not HM.judgeSBValueHasValue(presentIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addClassMethod(gClassName, "present", presentIMPValue.GetValue(), "@@:")
-
-    viewDidLoadIMPValue = makeViewDidLoadIMP()
-    if not HM.judgeSBValueHasValue(viewDidLoadIMPValue):
+    methods = [
+        ("+", "present", "@@:", makePresentIMP()),
+        ("-", "viewDidLoad", "v@:", makeViewDidLoadIMP()),
+        ("-", "dismissSelf", "v@:", makeDismissSelfIMP()),
+        # Methods related to tableView.
+        ("-", "tableView:numberOfRowsInSection:", "q@:@q", makeNumberOfRowsInSectionIMP()),
+        ("-", "tableView:cellForRowAtIndexPath:", "@@:@@", makeCellForRowAtIndexPathIMP()),
+        ("-", "tableView:didSelectRowAtIndexPath:", "v@:@@", makeDidSelectRowAtIndexPathIMP()),
+        # Methods related to features.
+        ("-", "selectedAPPInfo", "v@:", makeSelectedAPPInfoIMP()),
+        ("-", "selectedSandbox", "v@:", makeSelectedSandboxIMP()),
+        ("-", "selectedInspectView", "v@:", makeSelectedInspectViewIMP())
+    ]
+    statusTable = HM.registerClassSpec(gClassName, HMDebugBaseViewController.gClassName, [], methods)
+    if statusTable is None:
         HMProgressHUD.hide()
         return
-    HM.addInstanceMethod(gClassName, "viewDidLoad", viewDidLoadIMPValue.GetValue(), "v@:")
 
-    dismissSelfIMPValue = makeDismissSelfIMP()
-    if not HM.judgeSBValueHasValue(dismissSelfIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "dismissSelf", dismissSelfIMPValue.GetValue(), "v@:")
-
-    # Methods related to tableView.
-    HM.DPrint(f"Add methods to {gClassName}......")
-    if not addTableViewMethods():
-        HMProgressHUD.hide()
-        return
-
-    # Methods related to features.
-    HM.DPrint(f"Add methods to {gClassName}.........")
-    if not addFeatureMethods():
-        HMProgressHUD.hide()
-        return
+    HM.DPrint("Add breakpoints to hook method...")
+    HM.addOneShotBreakPointInIMP(statusTable["-selectedAPPInfo"], "HMDebugMainViewController.selectedAPPInfoBreakPointHandler", "HMDebugMainViewController_selectedAPPInfo_Breakpoint")
+    HM.addOneShotBreakPointInIMP(statusTable["-selectedSandbox"], "HMDebugMainViewController.selectedSandboxBreakPointHandler", "HMDebugMainViewController_selectedSandbox_Breakpoint")
+    HM.addOneShotBreakPointInIMP(statusTable["-selectedInspectView"], "HMDebugMainViewController.selectedInspectViewBreakPointHandler", "HMDebugMainViewController_selectedInspectView_Breakpoint")
 
     HM.DPrint(f"Register {gClassName} done!")
     HMProgressHUD.hide()
 
 
-def makePresentIMP() -> lldb.SBValue:
+def makePresentIMP() -> str:
     command_script = f'''
         UIViewController * (^presentBlock)(id) = ^UIViewController *(id classSelf) {{
             UIViewController *vc = (UIViewController *)[[NSClassFromString(@"{gClassName}") alloc] init];
@@ -101,10 +89,10 @@ def makePresentIMP() -> lldb.SBValue:
         imp_implementationWithBlock(presentBlock);
      '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeViewDidLoadIMP() -> lldb.SBValue:
+def makeViewDidLoadIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             Class cls = objc_lookUpClass("{gClassName}");
@@ -137,10 +125,10 @@ def makeViewDidLoadIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);
 
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeDismissSelfIMP() -> lldb.SBValue:
+def makeDismissSelfIMP() -> str:
     command_script = '''
         void (^dismissSelfBlock)(UIViewController *) = ^(UIViewController *vc) {
             [vc.navigationController dismissViewControllerAnimated:NO completion:nil];
@@ -149,31 +137,10 @@ def makeDismissSelfIMP() -> lldb.SBValue:
         imp_implementationWithBlock(dismissSelfBlock);
 
      '''
-    return HM.evaluateExpressionValue(command_script)
-
-
-def addTableViewMethods() -> bool:
-    global gClassName
+    return command_script
 
-    numberOfRowsInSectionIMPValue = makeNumberOfRowsInSectionIMP()
-    if not HM.judgeSBValueHasValue(numberOfRowsInSectionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:numberOfRowsInSection:", numberOfRowsInSectionIMPValue.GetValue(), "q@:@q")
 
-    cellForRowAtIndexPathIMPValue = makeCellForRowAtIndexPathIMP()
-    if not HM.judgeSBValueHasValue(cellForRowAtIndexPathIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:cellForRowAtIndexPath:", cellForRowAtIndexPathIMPValue.GetValue(), "@@:@@")
-
-    didSelectRowAtIndexPathIMPValue = makeDidSelectRowAtIndexPathIMP()
-    if not HM.judgeSBValueHasValue(didSelectRowAtIndexPathIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:didSelectRowAtIndexPath:", didSelectRowAtIndexPathIMPValue.GetValue(), "v@:@@")
-
-    return True
-
-
-def makeNumberOfRowsInSectionIMP() -> lldb.SBValue:
+def makeNumberOfRowsInSectionIMP() -> str:
     command_script = '''
         long (^IMPBlock)(UIViewController *, UITableView *, long) = ^long(UIViewController *vc, UITableView *tv, long section) {
             return 3;
@@ -181,10 +148,10 @@ def makeNumberOfRowsInSectionIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeCellForRowAtIndexPathIMP() -> lldb.SBValue:
+def makeCellForRowAtIndexPathIMP() -> str:
     command_script = '''
         UITableViewCell * (^IMPBlock)(UIViewController *, UITableView *, NSIndexPath *) = ^UITableViewCell *(UIViewController *vc, UITableView *tv, NSIndexPath *indexPath) {
             NSString * reuseIdentifier = @"Cell";
@@ -209,10 +176,10 @@ def makeCellForRowAtIndexPathIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeDidSelectRowAtIndexPathIMP() -> lldb.SBValue:
+def makeDidSelectRowAtIndexPathIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *, UITableView *, NSIndexPath *) = ^(UIViewController *vc, UITableView *tv, NSIndexPath *indexPath) {
             long row = indexPath.row;
@@ -228,36 +195,10 @@ def makeDidSelectRowAtIndexPathIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
-
-
-def addFeatureMethods() -> bool:
-    global gClassName
-
-    selectedAPPInfoIMPValue = makeSelectedAPPInfoIMP()
-    if not HM.judgeSBValueHasValue(selectedAPPInfoIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "selectedAPPInfo", selectedAPPInfoIMPValue.GetValue(), "v@:")
-
-    selectedSandboxIMPValue = makeSelectedSandboxIMP()
-    if not HM.judgeSBValueHasValue(selectedSandboxIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "selectedSandbox", selectedSandboxIMPValue.GetValue(), "v@:")
-
-    selectedInspectViewIMPValue = makeSelectedInspectViewIMP()
-    if not HM.judgeSBValueHasValue(selectedInspectViewIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "selectedInspectView", selectedInspectViewIMPValue.GetValue(), "v@:")
-
-    HM.DPrint("Add breakpoints to hook method...")
-    HM.addOneShotBreakPointInIMP(selectedAPPInfoIMPValue, "HMDebugMainViewController.selectedAPPInfoBreakPointHandler", "HMDebugMainViewController_selectedAPPInfo_Breakpoint")
-    HM.addOneShotBreakPointInIMP(selectedSandboxIMPValue, "HMDebugMainViewController.selectedSandboxBreakPointHandler", "HMDebugMainViewController_selectedSandbox_Breakpoint")
-    HM.addOneShotBreakPointInIMP(selectedInspectViewIMPValue, "HMDebugMainViewController.selectedInspectViewBreakPointHandler", "HMDebugMainViewController_selectedInspectView_Breakpoint")
-
-    return True
+    return command_script
 
 
-def makeSelectedAPPInfoIMP() -> lldb.SBValue:
+def makeSelectedAPPInfoIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             Class objClass = (Class)objc_lookUpClass("{HMDebugInfoViewController.gClassName}");
@@ -268,10 +209,10 @@ def makeSelectedAPPInfoIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeSelectedSandboxIMP() -> lldb.SBValue:
+def makeSelectedSandboxIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             Class objClass = (Class)objc_lookUpClass("{HMSandboxViewController.gClassName}");
@@ -282,10 +223,10 @@ def makeSelectedSandboxIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeSelectedInspectViewIMP() -> lldb.SBValue:
+def makeSelectedInspectViewIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             [vc.navigationController dismissViewControllerAnimated:NO completion:nil];
@@ -299,7 +240,7 @@ def makeSelectedInspectViewIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
 def selectedAPPInfoBreakPointHandler(frame, bp_loc, internal_dict) -> bool:
@@ -0,0 +1,129 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+from typing import Callable, Dict, List, Tuple
+import HMLLDBHelpers as HM
+import HMProgressHUD
+import HMDebugWindow
+import HMDebugBaseViewController
+import HMDebugMainViewController
+import HMDebugInfoViewController
+import HMSandboxViewController
+import HMInspectViewController
+
+
+# Class -> (register function, classes it depends on, one-shot breakpoint that registers it when tapped)
+gDebugClasses: Dict[str, Tuple[Callable[[], None], List[str], str]] = {
+    HMProgressHUD.gClassName: (HMProgressHUD.register, [], ""),
+    HMDebugWindow.gClassName: (HMDebugWindow.register, [], ""),
+    HMDebugBaseViewController.gClassName: (HMDebugBaseViewController.register, [], ""),
+    HMDebugMainViewController.gClassName: (HMDebugMainViewController.register, [HMDebugBaseViewController.gClassName], "HMDebugHUD_TapSelf_Breakpoint"),
+    HMDebugInfoViewController.gClassName: (HMDebugInfoViewController.register, [HMDebugMainViewController.gClassName, HMProgressHUD.gClassName], "HMDebugMainViewController_selectedAPPInfo_Breakpoint"),
+    HMSandboxViewController.gClassName: (HMSandboxViewController.register, [HMDebugMainViewController.gClassName, HMProgressHUD.gClassName], "HMDebugMainViewController_selectedSandbox_Breakpoint"),
+    HMInspectViewController.gClassName: (HMInspectViewController.register, [HMDebugMainViewController.gClassName, HMProgressHUD.gClassName, HMDebugWindow.gClassName], "HMDebugMainViewController_selectedInspectView_Breakpoint")
+}
+
+gPrewarmDelay = 0.5  # Seconds that the app runs between two registrations
+gPrewarmQueue: List[str] = []  # Classes waiting for registration, dependencies first
+gPrewarmBreakpoint: Tuple[int, int, int] = (0, 0, 0)  # (process unique ID, address of HMPrewarmTrap, breakpoint ID)
+
+
+def prewarmOrder() -> List[str]:
+    # Depth-first topological order of gDebugClasses, each class is listed once after its dependencies
+    order: List[str] = []
+
+    def visit(className: str) -> None:
+        if className in order:
+            return
+        for dependency in gDebugClasses[className][1]:
+            visit(dependency)
+        order.append(className)
+
+    for className in gDebugClasses:
+        visit(className)
+    return order
+
+
+def startPrewarm() -> None:
+    # Register the classes of the debug HUD in the background after the process continues, one class per stop.
+    # The app stops in HMPrewarmTrap on the main thread every gPrewarmDelay seconds until the queue is empty.
+    global gPrewarmQueue
+    gPrewarmQueue = prewarmOrder()
+    schedulePrewarm()
+
+
+def schedulePrewarm() -> None:
+    global gPrewarmBreakpoint
+
+    trapValue = HM.evaluateExpressionValue(f"(void *)HMSchedulePrewarm({gPrewarmDelay})")
+    trap = trapValue.GetValueAsUnsigned()
+    if not HM.successOfSBError(trapValue.GetError()) or trap == 0:
+        HM.DPrint("Failed to schedule the pre-warming of the debug HUD")
+        return
+
+    target = lldb.debugger.GetSelectedTarget()
+    processUID = target.GetProcess().GetUniqueID()
+    breakpointProcessUID, breakpointAddress, breakpointID = gPrewarmBreakpoint
+    if breakpointProcessUID == processUID and breakpointAddress == trap:
+        return
+    if breakpointID != 0:
+        # HMPrewarmTrap of the previous process
+        target.BreakpointDelete(breakpointID)
+
+    bp = target.BreakpointCreateByAddress(trap)
+    bp.AddName("HMDebugHUD_Prewarm_Breakpoint")
+    bp.SetScriptCallbackFunction("HMDebugPrewarm.prewarmBreakPointHandler")
+    gPrewarmBreakpoint = (processUID, trap, bp.GetID())
+
+
+def prewarmBreakPointHandler(frame, bp_loc, internal_dict) -> bool:
+    global gPrewarmBreakpoint
+
+    if gPrewarmBreakpoint[0] == frame.GetThread().GetProcess().GetUniqueID():
+        prewarmNextClass()
+    if len(gPrewarmQueue) > 0:
+        schedulePrewarm()
+    else:
+        lldb.debugger.GetSelectedTarget().BreakpointDelete(gPrewarmBreakpoint[2])
+        gPrewarmBreakpoint = (0, 0, 0)
+        HM.DPrint("The debug HUD is pre-warmed")
+    HM.processContinue()
+    return True
+
+
+def prewarmNextClass() -> None:
+    # Register one class per stop, classes that already exist don't count
+    HMProgressHUD.gEnabled = False
+    try:
+        while len(gPrewarmQueue) > 0:
+            className = gPrewarmQueue.pop(0)
+            registerFunction, _, tapBreakpointName = gDebugClasses[className]
+            registrations = HM.gClassRegistrations
+            registerFunction()
+            if tapBreakpointName and HM.existClass(className):
+                # The tapped screen opens without stopping the app
+                HM.deleteBreakPointsByName(tapBreakpointName)
+            if HM.gClassRegistrations != registrations:
+                return
+    finally:
+        HMProgressHUD.gEnabled = True
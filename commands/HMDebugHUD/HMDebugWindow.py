@@ -37,7 +37,7 @@ def register() -> None:
     HMProgressHUD.show(f"Register {gClassName}...")
     HM.DPrint(f"Register {gClassName}...")
 
-    classValue = HM.allocateClass(gClassName, "UIWindow")
-    HM.registerClass(classValue.GetValue())
+    if HM.registerClassSpec(gClassName, "UIWindow", [], []) is None:
+        return
 
     HM.DPrint(f"Register {gClassName} done!")
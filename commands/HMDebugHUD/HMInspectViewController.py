@@ -46,76 +46,39 @@ def register() -> None:
     HMProgressHUD.show(f"Register {gClassName}...")
     HM.DPrint(f"Register {gClassName}...")
 
-    classValue = HM.allocateClass(gClassName, HMDebugBaseViewController.gClassName)
-    HM.addIvar(classValue.GetValue(), "_previousKeyWindow", "UIWindow *")
-    HM.addIvar(classValue.GetValue(), "_highlightView", "UIView *")
-    HM.addIvar(classValue.GetValue(), "_targetView", "UIView *")
-    HM.addIvar(classValue.GetValue(), "_exitBtn", "UIButton *")
-
-    HM.addIvar(classValue.GetValue(), "_infoView", "UIView *")
-    HM.addIvar(classValue.GetValue(), "_actionView", "UIButton *")
-    HM.registerClass(classValue.GetValue())
-
-    HM.DPrint(f"Add methods to {gClassName}...")
-    startIMPValue = makeStartIMP()
-    if not HM.judgeSBValueHasValue(startIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addClassMethod(gClassName, "start", startIMPValue.GetValue(), "@@:")
-
-    viewDidLoadIMPValue = makeViewDidLoadIMP()
-    if not HM.judgeSBValueHasValue(viewDidLoadIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "viewDidLoad", viewDidLoadIMPValue.GetValue(), "v@:")
-
-    viewDidLayoutSubviewsIMPValue = makeViewDidLayoutSubviewsIMP()
-    if not HM.judgeSBValueHasValue(viewDidLayoutSubviewsIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "viewDidLayoutSubviews", viewDidLayoutSubviewsIMPValue.GetValue(), "v@:")
-
-    # event
-    HM.DPrint(f"Add methods to {gClassName}......")
-    clickExitBtnIMPValue = makeClickExitBtnIMP()
-    if not HM.judgeSBValueHasValue(clickExitBtnIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "clickExitBtn", clickExitBtnIMPValue.GetValue(), "v@:")
-
-    clickCloseBtnIMPValue = makeClickCloseBtnIMP()
-    if not HM.judgeSBValueHasValue(clickCloseBtnIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "clickCloseBtn", clickCloseBtnIMPValue.GetValue(), "v@:")
-
-    handleTapRecognizerIMPValue = makeHandleTapRecognizerIMP()
-    if not HM.judgeSBValueHasValue(handleTapRecognizerIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "handleTapRecognizer:", handleTapRecognizerIMPValue.GetValue(), "v@:@")
-
-    findSubviewAtPointInViewIMPValue = makeFindSubviewAtPointInViewIMP()
-    if not HM.judgeSBValueHasValue(findSubviewAtPointInViewIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "findSubviewAtPoint:inView:", findSubviewAtPointInViewIMPValue.GetValue(), "@@:{CGPoint=dd}@")
-
-    refreshTargetViewIMPValue = makeRefreshTargetViewIMP()
-    if not HM.judgeSBValueHasValue(refreshTargetViewIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "refreshTargetView:", refreshTargetViewIMPValue.GetValue(), "v@:@")
-
-    getInfoArrayFromTargetViewIMPValue = makeGetInfoArrayFromTargetViewIMP()
-    if not HM.judgeSBValueHasValue(getInfoArrayFromTargetViewIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "getInfoArrayFromTargetView:", getInfoArrayFromTargetViewIMPValue.GetValue(), "@@:@")
-
-    # function action
-    HM.DPrint(f"Add methods to {gClassName}.........")
-    if not addFunctionMethods():
+    ivars = [
+        ("_previousKeyWindow", "UIWindow *"),
+        ("_highlightView", "UIView *"),
+        ("_targetView", "UIView *"),
+        ("_exitBtn", "UIButton *"),
+        ("_infoView", "UIView *"),
+        ("_actionView", "UIButton *")
+    ]
+    methods = [
+        ("+", "start", "@@:", makeStartIMP()),
+        ("-", "viewDidLoad", "v@:", makeViewDidLoadIMP()),
+        ("-", "viewDidLayoutSubviews", "v@:", makeViewDidLayoutSubviewsIMP())
+    ]
+    # Sent by the user interaction after the process continues, they are compiled on first use
+    lazyMethods = [
+        # event
+        ("clickExitBtn", "v@:", makeClickExitBtnIMP()),
+        ("clickCloseBtn", "v@:", makeClickCloseBtnIMP()),
+        ("handleTapRecognizer:", "v@:@", makeHandleTapRecognizerIMP()),
+        ("findSubviewAtPoint:inView:", "@@:{CGPoint=dd}@", makeFindSubviewAtPointInViewIMP()),
+        ("refreshTargetView:", "v@:@", makeRefreshTargetViewIMP()),
+        ("getInfoArrayFromTargetView:", "@@:@", makeGetInfoArrayFromTargetViewIMP()),
+        # function action
+        ("clickMoveBtn:", "v@:@", makeClickMoveBtnIMP()),
+        ("ivarsAction", "v@:", makeIvarsActionIMP()),
+        ("propertiesAction", "v@:", makePropertiesActionIMP()),
+        ("methodsAction", "v@:", makeMethodsActionIMP()),
+        ("siblingNextAction", "v@:", makeSiblingNextActionIMP()),
+        ("siblingPreviousAction", "v@:", makeSiblingPreviousActionIMP()),
+        ("superviewAction", "v@:", makeSuperviewActionIMP()),
+        ("subviewAction", "v@:", makeSubviewActionIMP())
+    ]
+    if HM.registerClassSpec(gClassName, HMDebugBaseViewController.gClassName, ivars, methods, HMExpressionPrefix.gPrefix, lazyMethods) is None:
         HMProgressHUD.hide()
         return
 
@@ -123,7 +86,7 @@ def register() -> None:
     HMProgressHUD.hide()
 
 
-def makeStartIMP() -> lldb.SBValue:
+def makeStartIMP() -> str:
     command_script = f'''
         UIViewController * (^IMPBlock)(id) = ^UIViewController *(id classSelf) {{
             UIViewController *vc = (UIViewController *)[[(Class)objc_lookUpClass("{gClassName}") alloc] init];
@@ -151,10 +114,10 @@ def makeStartIMP() -> lldb.SBValue:
 
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeViewDidLoadIMP() -> lldb.SBValue:
+def makeViewDidLoadIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             Class cls = objc_lookUpClass("{gClassName}");
@@ -317,10 +280,10 @@ def makeViewDidLoadIMP() -> lldb.SBValue:
 
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeViewDidLayoutSubviewsIMP() -> lldb.SBValue:
+def makeViewDidLayoutSubviewsIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             Class cls = objc_lookUpClass("{gClassName}");
@@ -344,10 +307,10 @@ def makeViewDidLayoutSubviewsIMP() -> lldb.SBValue:
 
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeClickExitBtnIMP() -> lldb.SBValue:
+def makeClickExitBtnIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {
             UIWindow *_previousKeyWindow = (UIWindow *)[vc valueForKey:@"_previousKeyWindow"];
@@ -358,10 +321,10 @@ def makeClickExitBtnIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeClickCloseBtnIMP() -> lldb.SBValue:
+def makeClickCloseBtnIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {
             UIView *_highlightView = (UIView *)[vc valueForKey:@"_highlightView"];
@@ -373,10 +336,10 @@ def makeClickCloseBtnIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeHandleTapRecognizerIMP() -> lldb.SBValue:
+def makeHandleTapRecognizerIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *, UITapGestureRecognizer *) = ^(UIViewController *vc, UITapGestureRecognizer *tapRecognizer) {
             // find targetView
@@ -407,10 +370,10 @@ def makeHandleTapRecognizerIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeFindSubviewAtPointInViewIMP() -> lldb.SBValue:
+def makeFindSubviewAtPointInViewIMP() -> str:
     command_script = '''
         UIView * (^IMPBlock)(UIViewController *, CGPoint, UIView *) = ^UIView *(UIViewController *vc, CGPoint point, UIView *view) {
             NSArray *clsArr = @[[UITextField class], [UITextView class], [UIProgressView class], [UIActivityIndicatorView class], [UISlider class], [UISwitch class], [UIPageControl class], [UIStepper class]];
@@ -442,10 +405,10 @@ def makeFindSubviewAtPointInViewIMP() -> lldb.SBValue:
         };  
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeRefreshTargetViewIMP() -> lldb.SBValue:
+def makeRefreshTargetViewIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *, UIView *) = ^(UIViewController *vc, UIView *targetView) {
             [vc setValue:targetView forKey:@"_targetView"];
@@ -553,11 +516,11 @@ def makeRefreshTargetViewIMP() -> lldb.SBValue:
         
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
 # The "infoView" is based on https://github.com/QMUI/LookinServer
-def makeGetInfoArrayFromTargetViewIMP() -> lldb.SBValue:
+def makeGetInfoArrayFromTargetViewIMP() -> str:
     command_script = '''
         NSArray * (^IMPBlock)(UIViewController *, UIView *) = ^NSArray *(UIViewController *vc, UIView *targetView) {
             NSMutableArray *infoArray = [[NSMutableArray alloc] init]; // NSMutableArray<NSArray<NSString *> *> *infoArr
@@ -702,54 +665,10 @@ def makeGetInfoArrayFromTargetViewIMP() -> lldb.SBValue:
     
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
-
-
-def addFunctionMethods() -> bool:
-    clickMoveBtnIMPValue = makeClickMoveBtnIMP()
-    if not HM.judgeSBValueHasValue(clickMoveBtnIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "clickMoveBtn:", clickMoveBtnIMPValue.GetValue(), "v@:@")
-
-    ivarsActionIMPValue = makeIvarsActionIMP()
-    if not HM.judgeSBValueHasValue(ivarsActionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "ivarsAction", ivarsActionIMPValue.GetValue(), "v@:")
-
-    propertiesActionIMPValue = makePropertiesActionIMP()
-    if not HM.judgeSBValueHasValue(propertiesActionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "propertiesAction", propertiesActionIMPValue.GetValue(), "v@:")
-
-    methodsActionIMPValue = makeMethodsActionIMP()
-    if not HM.judgeSBValueHasValue(methodsActionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "methodsAction", methodsActionIMPValue.GetValue(), "v@:")
-
-    siblingNextActionIMPValue = makeSiblingNextActionIMP()
-    if not HM.judgeSBValueHasValue(siblingNextActionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "siblingNextAction", siblingNextActionIMPValue.GetValue(), "v@:")
-
-    siblingPreviousActionIMPValue = makeSiblingPreviousActionIMP()
-    if not HM.judgeSBValueHasValue(siblingPreviousActionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "siblingPreviousAction", siblingPreviousActionIMPValue.GetValue(), "v@:")
-
-    superviewActionIMPValue = makeSuperviewActionIMP()
-    if not HM.judgeSBValueHasValue(superviewActionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "superviewAction", superviewActionIMPValue.GetValue(), "v@:")
-
-    subviewActionIMPValue = makeSubviewActionIMP()
-    if not HM.judgeSBValueHasValue(subviewActionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "subviewAction", subviewActionIMPValue.GetValue(), "v@:")
-
-    return True
+    return command_script
 
 
-def makeClickMoveBtnIMP() -> lldb.SBValue:
+def makeClickMoveBtnIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *, UIButton *) = ^(UIViewController *vc, UIButton *btn) {
             UIView *_targetView = (UIView *)[vc valueForKey:@"_targetView"];
@@ -769,10 +688,10 @@ def makeClickMoveBtnIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeIvarsActionIMP() -> lldb.SBValue:
+def makeIvarsActionIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             UIView *_targetView = (UIView *)[vc valueForKey:@"_targetView"];
@@ -784,10 +703,10 @@ def makeIvarsActionIMP() -> lldb.SBValue:
         }};
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makePropertiesActionIMP() -> lldb.SBValue:
+def makePropertiesActionIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             UIView *_targetView = (UIView *)[vc valueForKey:@"_targetView"];
@@ -799,10 +718,10 @@ def makePropertiesActionIMP() -> lldb.SBValue:
         }};
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeMethodsActionIMP() -> lldb.SBValue:
+def makeMethodsActionIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             UIView *_targetView = (UIView *)[vc valueForKey:@"_targetView"];
@@ -814,10 +733,10 @@ def makeMethodsActionIMP() -> lldb.SBValue:
         }};
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeSiblingNextActionIMP() -> lldb.SBValue:
+def makeSiblingNextActionIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {
             UIView *_targetView = (UIView *)[vc valueForKey:@"_targetView"];
@@ -835,10 +754,10 @@ def makeSiblingNextActionIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeSiblingPreviousActionIMP() -> lldb.SBValue:
+def makeSiblingPreviousActionIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {
             UIView *_targetView = (UIView *)[vc valueForKey:@"_targetView"];
@@ -856,10 +775,10 @@ def makeSiblingPreviousActionIMP() -> lldb.SBValue:
         };        
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeSuperviewActionIMP() -> lldb.SBValue:
+def makeSuperviewActionIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {
             UIView *_targetView = (UIView *)[vc valueForKey:@"_targetView"];
@@ -871,10 +790,10 @@ def makeSuperviewActionIMP() -> lldb.SBValue:
         };       
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeSubviewActionIMP() -> lldb.SBValue:
+def makeSubviewActionIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {
             UIView *_targetView = (UIView *)[vc valueForKey:@"_targetView"];
@@ -886,5 +805,5 @@ def makeSubviewActionIMP() -> lldb.SBValue:
         };     
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
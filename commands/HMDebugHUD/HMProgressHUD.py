@@ -28,6 +28,7 @@ import HMLLDBClassInfo
 
 
 gClassName = "HMProgressHUD"
+gEnabled = True  # False while HMDebugPrewarm registers classes in the background
 
 
 def register() -> None:
@@ -37,56 +38,30 @@ def register() -> None:
 
     # Register class
     HM.DPrint(f"Register {gClassName}...")
-    classValue = HM.allocateClass(gClassName, "UIView")
-    HM.addIvar(classValue.GetValue(), "_contentView", "UIView *")
-    HM.addIvar(classValue.GetValue(), "_indicator", "UIActivityIndicatorView *")
-    HM.addIvar(classValue.GetValue(), "_textLab", "UILabel *")
-    HM.addIvar(classValue.GetValue(), "_hideDelayTimer", "NSTimer *")
-    HM.registerClass(classValue.GetValue())
-
-    # Add Class methods
-    HM.DPrint(f"Add methods to {gClassName}...")
-    sharedInstanceIMPValue = makeSharedInstanceIMP()
-    if not HM.judgeSBValueHasValue(sharedInstanceIMPValue):
+    ivars = [
+        ("_contentView", "UIView *"),
+        ("_indicator", "UIActivityIndicatorView *"),
+        ("_textLab", "UILabel *"),
+        ("_hideDelayTimer", "NSTimer *")
+    ]
+    methods = [
+        ("+", "sharedInstance", "@@:", makeSharedInstanceIMP()),
+        ("+", "showHUD", "@@:", makeShowHUDIMP()),
+        ("+", "showOnlyText:hiddenAfterDelay:", "@@:@i", makeShowOnlyTextHiddenAfterDelayIMP()),
+        ("+", "hideHUD", "@@:", makeHideHUDIMP()),
+        ("+", "setText:", "v@:@", makeSetTextIMP()),
+        ("-", "initWithFrame:", "@@:{CGRect={CGPoint=dd}{CGSize=dd}}", makeInitWithFrameIMP()),
+        ("-", "layoutSubviews", "v@:", makeLayoutSubviewsIMP())
+    ]
+    if HM.registerClassSpec(gClassName, "UIView", ivars, methods, HMExpressionPrefix.gPrefix) is None:
         return
-    HM.addClassMethod(gClassName, "sharedInstance", sharedInstanceIMPValue.GetValue(), "@@:")
-
-    showHUDIMPValue = makeShowHUDIMP()
-    if not HM.judgeSBValueHasValue(showHUDIMPValue):
-        return
-    HM.addClassMethod(gClassName, "showHUD", showHUDIMPValue.GetValue(), "@@:")
-
-    showOnlyTextIMPValue = makeShowOnlyTextHiddenAfterDelayIMP()
-    if not HM.judgeSBValueHasValue(showOnlyTextIMPValue):
-        return
-    HM.addClassMethod(gClassName, "showOnlyText:hiddenAfterDelay:", showOnlyTextIMPValue.GetValue(), "@@:@i")
-
-    hideHUDIMPValue = makeHideHUDIMP()
-    if not HM.judgeSBValueHasValue(hideHUDIMPValue):
-        return
-    HM.addClassMethod(gClassName, "hideHUD", hideHUDIMPValue.GetValue(), "@@:")
-
-    setTextIMPValue = makeSetTextIMP()
-    if not HM.judgeSBValueHasValue(setTextIMPValue):
-        return
-    HM.addClassMethod(gClassName, "setText:", setTextIMPValue.GetValue(), "v@:@")
-
-    # Add Instance methods
-    HM.DPrint(f"Add methods to {gClassName}......")
-    initWithFrameIMPValue = makeInitWithFrameIMP()
-    if not HM.judgeSBValueHasValue(initWithFrameIMPValue):
-        return
-    HM.addInstanceMethod(gClassName, "initWithFrame:", initWithFrameIMPValue.GetValue(), "@@:{CGRect={CGPoint=dd}{CGSize=dd}}")
-
-    layoutSubviewsIMPValue = makeLayoutSubviewsIMP()
-    if not HM.judgeSBValueHasValue(layoutSubviewsIMPValue):
-        return
-    HM.addInstanceMethod(gClassName, "layoutSubviews", layoutSubviewsIMPValue.GetValue(), "v@:")
 
     HM.DPrint(f"Register {gClassName} done!")
 
 
 def show(text: Optional[str]) -> None:
+    if not gEnabled:
+        return
 
     register()
 
@@ -103,6 +78,8 @@ def show(text: Optional[str]) -> None:
 
 
 def hide() -> None:
+    if not gEnabled:
+        return
     command_script = f'''
         Class progressHUDCls = (Class)objc_lookUpClass("{gClassName}");
         (UIView *)[progressHUDCls performSelector:@selector(hideHUD)];
@@ -111,7 +88,7 @@ def hide() -> None:
     HM.evaluateExpressionValue(command_script)
 
 
-def makeSharedInstanceIMP() -> lldb.SBValue:
+def makeSharedInstanceIMP() -> str:
     command_script = f'''
         UIView * (^IMPBlock)(id) = ^UIView *(id classSelf) {{
             static id {gClassName}Instance;
@@ -126,10 +103,10 @@ def makeSharedInstanceIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeShowHUDIMP() -> lldb.SBValue:
+def makeShowHUDIMP() -> str:
     command_script = f'''
         UIView * (^IMPBlock)(id) = ^UIView *(id classSelf) {{
             
@@ -154,10 +131,10 @@ def makeShowHUDIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeShowOnlyTextHiddenAfterDelayIMP() -> lldb.SBValue:
+def makeShowOnlyTextHiddenAfterDelayIMP() -> str:
     command_script = f'''
         UIView * (^IMPBlock)(id, NSString *, int) = ^UIView *(id classSelf, NSString *text, int delay) {{
             
@@ -192,10 +169,10 @@ def makeShowOnlyTextHiddenAfterDelayIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeHideHUDIMP() -> lldb.SBValue:
+def makeHideHUDIMP() -> str:
     command_script = f'''
         UIView * (^IMPBlock)(id) = ^UIView *(id classSelf) {{
             
@@ -214,10 +191,10 @@ def makeHideHUDIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeSetTextIMP() -> lldb.SBValue:
+def makeSetTextIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(id, NSString *) = ^(id classSelf, NSString *text) {{
             
@@ -232,10 +209,10 @@ def makeSetTextIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeInitWithFrameIMP() -> lldb.SBValue:
+def makeInitWithFrameIMP() -> str:
     command_script = f'''
         UIView * (^IMPBlock)(UIView *, CGRect) = ^UIView *(UIView *HUD, CGRect frame) {{
             Class cls = objc_lookUpClass("{gClassName}");
@@ -275,10 +252,10 @@ def makeInitWithFrameIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeLayoutSubviewsIMP() -> lldb.SBValue:
+def makeLayoutSubviewsIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIView *) = ^(UIView *HUD) {{
             Class cls = objc_lookUpClass("{gClassName}");
@@ -330,4 +307,4 @@ def makeLayoutSubviewsIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);    
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
@@ -43,57 +43,36 @@ def register() -> None:
     HMProgressHUD.show(f"Register {gClassName}...")
     HM.DPrint(f"Register {gClassName}...")
 
-    classValue = HM.allocateClass(gClassName, HMDebugBaseViewController.gClassName)
-    HM.addIvar(classValue.GetValue(), "_tableView", "UITableView *")
-    HM.addIvar(classValue.GetValue(), "_currentPath", "NSString *")
-    HM.addIvar(classValue.GetValue(), "_childPaths", "NSMutableArray *")
-    HM.registerClass(classValue.GetValue())
-
-    # Add methods
-    HM.DPrint(f"Add methods to {gClassName}...")
-    viewDidLoadIMPValue = makeViewDidLoadIMP()
-    if not HM.judgeSBValueHasValue(viewDidLoadIMPValue):
+    ivars = [
+        ("_tableView", "UITableView *"),
+        ("_currentPath", "NSString *"),
+        ("_childPaths", "NSMutableArray *")
+    ]
+    methods = [
+        ("-", "viewDidLoad", "v@:", makeViewDidLoadIMP()),
+        ("-", "loadPath:", "v@:@", makeLoadPathIMP()),
+        ("-", "clickBackItem", "v@:", makeClickBackItemIMP()),
+        ("-", "clickPopItem", "v@:", makeClickPopItemIMP()),
+        ("-", "deleteFileOrDir:", "v@:@", makeDeleteFileOrDirIMP()),
+        # Methods related to tableView, data source
+        ("-", "tableView:numberOfRowsInSection:", "q@:@q", makeNumberOfRowsInSectionIMP()),
+        ("-", "tableView:cellForRowAtIndexPath:", "@@:@@", makeCellForRowAtIndexPathIMP()),
+        ("-", "tableView:canEditRowAtIndexPath:", "B@:@@", makeCanEditRowAtIndexPathIMP()),
+        ("-", "tableView:commitEditingStyle:forRowAtIndexPath:", "v@:@q@", makeCommitEditingStyleForRowAtIndexPathIMP()),
+        # delegate
+        ("-", "tableView:didSelectRowAtIndexPath:", "v@:@@", makeDidSelectRowAtIndexPathIMP()),
+        ("-", "tableView:viewForHeaderInSection:", "@@:@q", makeViewForHeaderInSectionIMP()),
+        ("-", "tableView:editingStyleForRowAtIndexPath:", "q@:@@", makeEditingStyleForRowAtIndexPathIMP())
+    ]
+    if HM.registerClassSpec(gClassName, HMDebugBaseViewController.gClassName, ivars, methods, HMExpressionPrefix.gPrefix) is None:
         HMProgressHUD.hide()
         return
-    HM.addInstanceMethod(gClassName, "viewDidLoad", viewDidLoadIMPValue.GetValue(), "v@:")
-
-    loadPathIMPValue = makeLoadPathIMP()
-    if not HM.judgeSBValueHasValue(loadPathIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "loadPath:", loadPathIMPValue.GetValue(), "v@:@")
-
-    clickBackItemIMPValue = makeClickBackItemIMP()
-    if not HM.judgeSBValueHasValue(clickBackItemIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "clickBackItem", clickBackItemIMPValue.GetValue(), "v@:")
-
-    clickPopItemIMPValue = makeClickPopItemIMP()
-    if not HM.judgeSBValueHasValue(clickPopItemIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "clickPopItem", clickPopItemIMPValue.GetValue(), "v@:")
-
-    deleteFileOrDirIMPValue = makeDeleteFileOrDirIMP()
-    if not HM.judgeSBValueHasValue(deleteFileOrDirIMPValue):
-        HMProgressHUD.hide()
-        return
-    HM.addInstanceMethod(gClassName, "deleteFileOrDir:", deleteFileOrDirIMPValue.GetValue(), "v@:@")
-
-
-    # Methods related to tableView.
-    HM.DPrint(f"Add methods to {gClassName}......")
-    if not addTableViewMethods():
-        HMProgressHUD.hide()
-        return
-
 
     HM.DPrint(f"Register {gClassName} done!")
     HMProgressHUD.hide()
 
 
-def makeViewDidLoadIMP() -> lldb.SBValue:
+def makeViewDidLoadIMP() -> str:
     command_script = f'''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {{
             Class cls = objc_lookUpClass("{gClassName}");
@@ -138,10 +117,10 @@ def makeViewDidLoadIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);
 
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeLoadPathIMP() -> lldb.SBValue:
+def makeLoadPathIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *, NSString *) = ^(UIViewController *vc, NSString *path) {
             [vc setValue:path forKey:@"_currentPath"];
@@ -170,10 +149,10 @@ def makeLoadPathIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);
 
      '''
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeClickBackItemIMP() -> lldb.SBValue:
+def makeClickBackItemIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {
             NSString *currentPath = (NSString *)[vc valueForKey:@"_currentPath"];
@@ -188,10 +167,10 @@ def makeClickBackItemIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);
 
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeClickPopItemIMP() -> lldb.SBValue:
+def makeClickPopItemIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *) = ^(UIViewController *vc) {
             if ([[vc.navigationController viewControllers] count] == 1) {
@@ -203,10 +182,10 @@ def makeClickPopItemIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);
 
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeDeleteFileOrDirIMP() -> lldb.SBValue:
+def makeDeleteFileOrDirIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *, NSString *) = ^(UIViewController *vc, NSString *path) {
             NSString *title = [[NSString alloc] initWithFormat:@"Delete %@?", [path lastPathComponent]];
@@ -226,53 +205,10 @@ def makeDeleteFileOrDirIMP() -> lldb.SBValue:
         imp_implementationWithBlock(IMPBlock);
 
      '''
-    return HM.evaluateExpressionValue(command_script)
-
-
-def addTableViewMethods() -> bool:
-    global gClassName
-
-    # data source
-    numberOfRowsInSectionIMPValue = makeNumberOfRowsInSectionIMP()
-    if not HM.judgeSBValueHasValue(numberOfRowsInSectionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:numberOfRowsInSection:", numberOfRowsInSectionIMPValue.GetValue(), "q@:@q")
-
-    cellForRowAtIndexPathIMPValue = makeCellForRowAtIndexPathIMP()
-    if not HM.judgeSBValueHasValue(cellForRowAtIndexPathIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:cellForRowAtIndexPath:", cellForRowAtIndexPathIMPValue.GetValue(), "@@:@@")
-
-    canEditRowAtIndexPathIMPValue = makeCanEditRowAtIndexPathIMP()
-    if not HM.judgeSBValueHasValue(canEditRowAtIndexPathIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:canEditRowAtIndexPath:", canEditRowAtIndexPathIMPValue.GetValue(), "B@:@@")
-
-    commitEditingStyleForRowAtIndexPathIMPValue = makeCommitEditingStyleForRowAtIndexPathIMP()
-    if not HM.judgeSBValueHasValue(commitEditingStyleForRowAtIndexPathIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:commitEditingStyle:forRowAtIndexPath:", commitEditingStyleForRowAtIndexPathIMPValue.GetValue(), "v@:@q@")
-
-    # delegate
-    didSelectRowAtIndexPathIMPValue = makeDidSelectRowAtIndexPathIMP()
-    if not HM.judgeSBValueHasValue(didSelectRowAtIndexPathIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:didSelectRowAtIndexPath:", didSelectRowAtIndexPathIMPValue.GetValue(), "v@:@@")
-
-    viewForHeaderInSectionIMPValue = makeViewForHeaderInSectionIMP()
-    if not HM.judgeSBValueHasValue(viewForHeaderInSectionIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:viewForHeaderInSection:", viewForHeaderInSectionIMPValue.GetValue(), "@@:@q")
-
-    editingStyleForRowAtIndexPathIMPValue = makeEditingStyleForRowAtIndexPathIMP()
-    if not HM.judgeSBValueHasValue(editingStyleForRowAtIndexPathIMPValue):
-        return False
-    HM.addInstanceMethod(gClassName, "tableView:editingStyleForRowAtIndexPath:", editingStyleForRowAtIndexPathIMPValue.GetValue(), "q@:@@")
-
-    return True
+    return command_script
 
 
-def makeNumberOfRowsInSectionIMP() -> lldb.SBValue:
+def makeNumberOfRowsInSectionIMP() -> str:
     command_script = '''
         long (^IMPBlock)(UIViewController *, UITableView *, long) = ^long(UIViewController *vc, UITableView *tv, long section) {
             NSMutableArray *childPaths = (NSMutableArray *)[vc valueForKey:@"childPaths"];
@@ -280,10 +216,10 @@ def makeNumberOfRowsInSectionIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeCellForRowAtIndexPathIMP() -> lldb.SBValue:
+def makeCellForRowAtIndexPathIMP() -> str:
     command_script = '''
         UITableViewCell * (^IMPBlock)(UIViewController *, UITableView *, NSIndexPath *) = ^UITableViewCell *(UIViewController *vc, UITableView *tv, NSIndexPath *indexPath) {
             NSString * reuseIdentifier = @"Cell";
@@ -364,20 +300,20 @@ def makeCellForRowAtIndexPathIMP() -> lldb.SBValue:
         
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeCanEditRowAtIndexPathIMP() -> lldb.SBValue:
+def makeCanEditRowAtIndexPathIMP() -> str:
     command_script = '''
         BOOL (^IMPBlock)(UIViewController *, UITableView *, NSIndexPath *) = ^BOOL(UIViewController *vc, UITableView *tv, NSIndexPath * indexPath) {
             return YES;
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeCommitEditingStyleForRowAtIndexPathIMP() -> lldb.SBValue:
+def makeCommitEditingStyleForRowAtIndexPathIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *, UITableView *, UITableViewCellEditingStyle, NSIndexPath *) = ^(UIViewController *vc, UITableView *tv, UITableViewCellEditingStyle editingStyle, NSIndexPath *indexPath) {
             if (editingStyle == UITableViewCellEditingStyleDelete) {
@@ -388,10 +324,10 @@ def makeCommitEditingStyleForRowAtIndexPathIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeDidSelectRowAtIndexPathIMP() -> lldb.SBValue:
+def makeDidSelectRowAtIndexPathIMP() -> str:
     command_script = '''
         void (^IMPBlock)(UIViewController *, UITableView *, NSIndexPath *) = ^(UIViewController *vc, UITableView *tv, NSIndexPath *indexPath) {
             [tv deselectRowAtIndexPath:indexPath animated:YES];
@@ -434,10 +370,10 @@ def makeDidSelectRowAtIndexPathIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeViewForHeaderInSectionIMP() -> lldb.SBValue:
+def makeViewForHeaderInSectionIMP() -> str:
     command_script = '''
         UIView * (^IMPBlock)(UIViewController *, UITableView *, long) = ^UIView *(UIViewController *vc, UITableView *tv, long section) {
             UITableViewHeaderFooterView *header = [tv dequeueReusableHeaderFooterViewWithIdentifier:@"Header"];
@@ -469,14 +405,14 @@ def makeViewForHeaderInSectionIMP() -> lldb.SBValue:
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
 
 
-def makeEditingStyleForRowAtIndexPathIMP() -> lldb.SBValue:
+def makeEditingStyleForRowAtIndexPathIMP() -> str:
     command_script = '''
         UITableViewCellEditingStyle (^IMPBlock)(UIViewController *, UITableView *, NSIndexPath *) = ^UITableViewCellEditingStyle(UIViewController *vc, UITableView *tv, NSIndexPath *indexPath) {
             return UITableViewCellEditingStyleDelete;
         };
         imp_implementationWithBlock(IMPBlock);
      '''
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
@@ -0,0 +1,167 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+import array
+import base64
+import bisect
+import json
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+import HMLLDBHelpers as HM
+
+
+# Indexes of the process kept on disk between sessions, keyed by the UUIDs of the loaded modules.
+# Addresses are saved as (module UUID, offset from the Mach-O header of the module), so a cache
+# stays valid when ASLR loads the module at another address.
+# Set gCacheDirectory to None to disable the cache.
+# Each rebuild of the app changes the UUIDs, so only the most recently used files of each kind are kept.
+kCacheVersion = 1
+kInvalidAddress = 0xffffffffffffffff
+
+gCacheDirectory: Optional[str] = os.path.expanduser("~/Library/Caches/HMLLDB")
+gCacheLimits: Dict[str, int] = {"classes": 2000, "selectors": 4}  # kind -> number of files kept, one "classes" file per image
+gEvictedKinds: Set[str] = set()  # Kinds evicted in this session, see evictCache
+
+
+def loadCache(kind: str, key: str) -> Optional[Dict[str, Any]]:
+    # The content saved by saveCache, None if there is no cache or it can't be read
+    if gCacheDirectory is None:
+        return None
+    path = os.path.join(gCacheDirectory, kind, f"{key}.json")
+    try:
+        with open(path, "r") as file:
+            content = json.load(file)
+        # The modification time orders the files by their last use, see evictCache
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(content, dict) or content.get("version") != kCacheVersion:
+        return None
+    return content
+
+
+def saveCache(kind: str, key: str, content: Dict[str, Any]) -> None:
+    # A failed save only costs a scan next time
+    if gCacheDirectory is None:
+        return
+    directory = os.path.join(gCacheDirectory, kind)
+    path = os.path.join(directory, f"{key}.json")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Another lldb may read the file at the same time
+        # json.dumps uses the C encoder, json.dump doesn't
+        data = json.dumps(dict(content, version=kCacheVersion), separators=(",", ":"))
+        with open(f"{path}.{os.getpid()}", "w") as file:
+            file.write(data)
+        os.replace(f"{path}.{os.getpid()}", path)
+    except OSError as error:
+        HM.DPrint(f"Failed to save the cache {path}: {error}")
+        return
+    evictCache(kind)
+
+
+def evictCache(kind: str) -> None:
+    # Delete the least recently used files beyond gCacheLimits, once per kind and session
+    if gCacheDirectory is None or kind in gEvictedKinds or kind not in gCacheLimits:
+        return
+    gEvictedKinds.add(kind)
+    directory = os.path.join(gCacheDirectory, kind)
+    try:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json")]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[gCacheLimits[kind]:]:
+            os.remove(path)
+    except OSError:
+        # Another lldb may delete the same files
+        pass
+
+
+def loadedModules(target: lldb.SBTarget) -> List[Tuple[lldb.SBModule, str, int]]:
+    # [(module, UUID, header address)] of the modules that can be cached
+    modules = []
+    for i in range(target.GetNumModules()):
+        module = target.GetModuleAtIndex(i)
+        uuid = module.GetUUIDString()
+        headerAddress = module.GetObjectFileHeaderAddress().GetLoadAddress(target)
+        if uuid and headerAddress != kInvalidAddress:
+            modules.append((module, uuid, headerAddress))
+    return modules
+
+
+def moduleRanges(target: lldb.SBTarget, modules: List[Tuple[lldb.SBModule, str, int]]) -> List[Tuple[int, int, str, int]]:
+    # [(start, end, UUID, header address)] of the loaded segments, sorted by start
+    ranges = []
+    for module, uuid, headerAddress in modules:
+        for i in range(module.GetNumSections()):
+            segment = module.GetSectionAtIndex(i)
+            start = segment.GetLoadAddress(target)
+            if start != kInvalidAddress and segment.GetByteSize() > 0:
+                ranges.append((start, start + segment.GetByteSize(), uuid, headerAddress))
+    ranges.sort()
+    return ranges
+
+
+def moduleOffset(ranges: List[Tuple[int, int, str, int]], address: int) -> Optional[Tuple[str, int]]:
+    # (module UUID, offset from the header) of an address of moduleRanges, None if no module contains it
+    i = bisect.bisect_right(ranges, (address, kInvalidAddress)) - 1
+    if i < 0 or address >= ranges[i][1]:
+        return None
+    return ranges[i][2], address - ranges[i][3]
+
+
+def moduleOffsets(ranges: List[Tuple[int, int, str, int]], addresses: List[int]) -> Optional[Tuple[List[str], List[int]]]:
+    # moduleOffset of many addresses as (UUIDs, offsets), None if one of them is out of the modules
+    uuids = []
+    offsets = []
+    start, end, uuid, headerAddress = 0, 0, "", 0
+    for address in addresses:
+        # Neighboring addresses are mostly in the same module
+        if not start <= address < end:
+            i = bisect.bisect_right(ranges, (address, kInvalidAddress)) - 1
+            if i < 0 or address >= ranges[i][1]:
+                return None
+            start, end, uuid, headerAddress = ranges[i]
+        uuids.append(uuid)
+        offsets.append(address - headerAddress)
+    return uuids, offsets
+
+
+def packIntegers(values: List[int]) -> str:
+    # Large integer lists are saved as base64 of 64-bit values, they load much faster than JSON numbers
+    return base64.b64encode(array.array("q", values).tobytes()).decode("ascii")
+
+
+def unpackIntegers(text: str) -> List[int]:
+    values = array.array("q")
+    values.frombytes(base64.b64decode(text))
+    return values.tolist()
+
+
+def slideAddresses(addresses: str, modules: str, slides: List[int]) -> List[int]:
+    # The packed addresses moved by the slides of their modules, modules: packed indexes of slides
+    uniqueSlides = set(slides)
+    if len(uniqueSlides) <= 1:
+        # The modules are loaded at the same addresses, or the shared cache moved them together
+        slide = uniqueSlides.pop() if uniqueSlides else 0
+        return unpackIntegers(addresses) if slide == 0 else [address + slide for address in unpackIntegers(addresses)]
+    return [address + slides[module] for address, module in zip(unpackIntegers(addresses), unpackIntegers(modules))]
@@ -51,6 +51,14 @@ def environment(debugger, command, exe_ctx, result, internal_dict):
     # Model identifier
     # System version
 
+    # Evaluate all expressions in one JIT round trip
+    XcodeVersion, XcodeBuildVersion, modelIdentifier, systemVersion = HM.evaluateExpressionsDescription([
+        '(NSString *)([NSBundle mainBundle].infoDictionary[@"DTXcode"] ?: @"-")',
+        '(NSString *)([NSBundle mainBundle].infoDictionary[@"DTXcodeBuild"] ?: @"-")',
+        makeModelIdentifierExpression(),
+        '(NSString *)[[NSString alloc] initWithFormat:@"%@ %@", [[UIDevice currentDevice] systemName], [[UIDevice currentDevice] systemVersion]]'
+    ])
+
     HM.DPrint('[Python version] ' + sys.version.replace('\n', '\n\t\t'))
 
     HM.DPrint('[LLDB version] ' + debugger.GetVersionString().replace('\n', '\n\t\t'))
@@ -61,16 +69,13 @@ def environment(debugger, command, exe_ctx, result, internal_dict):
 
     HM.DPrint('[Optimized] ' + getOptimizedStr())
 
-    XcodeVersionValue = HM.evaluateExpressionValue('(NSString *)([NSBundle mainBundle].infoDictionary[@"DTXcode"] ?: @"-")')
-    HM.DPrint('[Xcode version] ' + XcodeVersionValue.GetObjectDescription())
+    HM.DPrint('[Xcode version] ' + XcodeVersion[1])
 
-    XcodeBuildVersionValue = HM.evaluateExpressionValue('(NSString *)([NSBundle mainBundle].infoDictionary[@"DTXcodeBuild"] ?: @"-")')
-    HM.DPrint('[Xcode build version] ' + XcodeBuildVersionValue.GetObjectDescription())
+    HM.DPrint('[Xcode build version] ' + XcodeBuildVersion[1])
 
-    HM.DPrint('[Model identifier] ' + getModelIdentifier())
+    HM.DPrint('[Model identifier] ' + modelIdentifier[1])
 
-    SystemVersionValue = HM.evaluateExpressionValue('(NSString *)[[NSString alloc] initWithFormat:@"%@ %@", [[UIDevice currentDevice] systemName], [[UIDevice currentDevice] systemVersion]]')
-    HM.DPrint('[System version] ' + SystemVersionValue.GetObjectDescription())
+    HM.DPrint('[System version] ' + systemVersion[1])
 
 
 def getGitCommitHash() -> str:
@@ -97,12 +102,11 @@ def getOptimizedStr() -> str:
     return f'False: {optimizedFalseCount}  True: {optimizedTrueCount}'
 
 
-def getModelIdentifier() -> str:
-    command_script = '''
+def makeModelIdentifierExpression() -> str:
+    command_script = '''({
         struct utsname systemInfo;
         (int)uname(&systemInfo);
         NSString *modelIdentifier = [NSString stringWithCString:systemInfo.machine encoding:(NSStringEncoding)4];
         modelIdentifier;
-    '''
-    modelIDValue = HM.evaluateExpressionValue(command_script)
-    return modelIDValue.GetObjectDescription()
+    })'''
+    return command_script
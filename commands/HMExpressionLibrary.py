@@ -0,0 +1,647 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Top-level helper functions, JIT-compiled into the process once by HMLLDBHelpers.injectHelperLibrary
+gLibrary = '''
+// Arguments of expression templates, written by HMLLDBHelpers.writeExpressionArguments
+const char *HMArgs[16];
+
+NSString *HMArgString(int index) {
+    return [[NSString alloc] initWithUTF8String:HMArgs[index]];
+}
+
+void *HMArgPointer(int index) {
+    return (void *)strtoull(HMArgs[index], NULL, 0);
+}
+
+Class HMAllocateClass(const char *className, const char *superClassName) {
+    Class newCls = (Class)objc_lookUpClass(className);
+    if (!newCls) {
+        Class superCls = (Class)objc_lookUpClass(superClassName);
+        newCls = (Class)objc_allocateClassPair(superCls, className, 0);
+    }
+    return newCls;
+}
+
+BOOL HMExistClass(const char *className) {
+    return objc_lookUpClass(className) != nil;
+}
+
+BOOL HMAddIvar(Class cls, const char *ivarName, const char *types) {
+    NSUInteger size;
+    NSUInteger alingment;
+    NSGetSizeAndAlignment(types, &size, &alingment);
+    return class_addIvar(cls, ivarName, size, alingment, types);
+}
+
+BOOL HMAddInstanceMethod(const char *className, const char *selector, IMP imp, const char *types) {
+    Class cls = (Class)objc_lookUpClass(className);
+    if (!cls) {
+        return NO;
+    }
+    return class_addMethod(cls, sel_registerName(selector), imp, types);
+}
+
+BOOL HMAddClassMethod(const char *className, const char *selector, IMP imp, const char *types) {
+    Class metaCls = (Class)objc_getMetaClass(className);
+    if (!metaCls) {
+        return NO;
+    }
+    return class_addMethod(metaCls, sel_registerName(selector), imp, types);
+}
+
+// Swift module prefixes of the class names separated by '\\n', e.g. "MyApp" of "MyApp.MyViewController".
+// Collected once per process by HMCollectClassPrefixes.
+char *HMClassPrefixes = NULL;
+
+void HMCollectClassPrefixes(void) {
+    // One pass over the class list. The classes of a module are adjacent,
+    // so a prefix is only compared with the set when it differs from the previous one.
+    unsigned int classCount = 0;
+    Class *classList = objc_copyClassList(&classCount);
+    NSMutableSet *prefixSet = [[NSMutableSet alloc] init];
+    NSMutableArray *prefixes = [[NSMutableArray alloc] init];
+    const char *previousName = NULL;
+    size_t previousLength = 0;
+    for (unsigned int i = 0; i < classCount; ++i) {
+        const char *name = class_getName(classList[i]);
+        const char *dot = strchr(name, '.');
+        if (dot == NULL) {
+            continue;
+        }
+        size_t length = dot - name;
+        if (previousName != NULL && length == previousLength && strncmp(name, previousName, length) == 0) {
+            continue;
+        }
+        previousName = name;
+        previousLength = length;
+        NSString *prefix = [[NSString alloc] initWithBytes:name length:length encoding:NSUTF8StringEncoding];
+        if (prefix == nil || [prefixSet containsObject:prefix] || [prefix containsString:@"NSKVONotifying_"] || [prefix containsString:@"_NSZombie_"]) {
+            continue;
+        }
+        [prefixSet addObject:prefix];
+        [prefixes addObject:prefix];
+    }
+    free(classList);
+    free(HMClassPrefixes);
+    HMClassPrefixes = strdup([[prefixes componentsJoinedByString:@"\\n"] UTF8String]);
+}
+
+// Find the class, the Swift module prefix can be omitted
+Class HMLookUpClass(const char *className) {
+    Class cls = (Class)objc_lookUpClass(className);
+    if (cls != nil) {
+        return cls;
+    }
+    if (HMClassPrefixes == NULL) {
+        HMCollectClassPrefixes();
+    }
+    const char *prefix = HMClassPrefixes;
+    while (*prefix != '\\0') {
+        const char *end = strchr(prefix, '\\n');
+        int length = end ? (int)(end - prefix) : (int)strlen(prefix);
+        char clsName[1024];
+        snprintf(clsName, sizeof(clsName), "%.*s.%s", length, prefix, className);
+        cls = (Class)objc_lookUpClass(clsName);
+        if (cls != nil || end == NULL) {
+            break;
+        }
+        prefix = end + 1;
+    }
+    return cls;
+}
+
+// Binary transport, see HMLLDBHelpers.evaluateExpressionRecords
+// Buffer layout: [uint64 payload length] followed by records of [uint32 length][UTF-8 bytes]
+// If an allocation fails, the records are dropped and HMTransportFinish returns NULL.
+char *HMTransportBuffer = NULL;
+size_t HMTransportLength = 0;
+size_t HMTransportCapacity = 0;
+BOOL HMTransportFailed = NO;
+
+void HMTransportReset(void) {
+    // Free the result of the last transport
+    free(HMTransportBuffer);
+    HMTransportCapacity = 4096;
+    HMTransportBuffer = (char *)malloc(HMTransportCapacity);
+    HMTransportLength = 8;
+    HMTransportFailed = HMTransportBuffer == NULL;
+}
+
+BOOL HMTransportReserve(size_t length) {
+    if (HMTransportFailed) {
+        return NO;
+    }
+    if (HMTransportLength + length <= HMTransportCapacity) {
+        return YES;
+    }
+    size_t capacity = HMTransportCapacity;
+    while (HMTransportLength + length > capacity) {
+        capacity *= 2;
+    }
+    char *buffer = (char *)realloc(HMTransportBuffer, capacity);
+    if (buffer == NULL) {
+        free(HMTransportBuffer);
+        HMTransportBuffer = NULL;
+        HMTransportFailed = YES;
+        return NO;
+    }
+    HMTransportBuffer = buffer;
+    HMTransportCapacity = capacity;
+    return YES;
+}
+
+void HMTransportAppendUTF8(const char *string) {
+    if (string == NULL) {
+        string = "";
+    }
+    uint32_t length = (uint32_t)strlen(string);
+    if (!HMTransportReserve(4 + length)) {
+        return;
+    }
+    memcpy(HMTransportBuffer + HMTransportLength, &length, 4);
+    memcpy(HMTransportBuffer + HMTransportLength + 4, string, length);
+    HMTransportLength += 4 + length;
+}
+
+void HMTransportAppendString(NSString *string) {
+    HMTransportAppendUTF8(string ? [[string description] UTF8String] : "(null)");
+}
+
+// Append one record whose fields are separated by 0x1f
+void HMTransportAppendFields(int count, ...) {
+    size_t recordStart = HMTransportLength;
+    if (!HMTransportReserve(4)) {
+        return;
+    }
+    HMTransportLength += 4;
+    va_list args;
+    va_start(args, count);
+    for (int i = 0; i < count; ++i) {
+        const char *field = va_arg(args, const char *);
+        if (field == NULL) {
+            field = "";
+        }
+        size_t fieldLength = strlen(field);
+        if (!HMTransportReserve(fieldLength + 1)) {
+            va_end(args);
+            return;
+        }
+        if (i > 0) {
+            HMTransportBuffer[HMTransportLength] = 0x1f;
+            HMTransportLength += 1;
+        }
+        memcpy(HMTransportBuffer + HMTransportLength, field, fieldLength);
+        HMTransportLength += fieldLength;
+    }
+    va_end(args);
+    uint32_t recordLength = (uint32_t)(HMTransportLength - recordStart - 4);
+    memcpy(HMTransportBuffer + recordStart, &recordLength, 4);
+}
+
+void *HMTransportFinish(void) {
+    if (HMTransportFailed) {
+        return NULL;
+    }
+    uint64_t payloadLength = HMTransportLength - 8;
+    memcpy(HMTransportBuffer, &payloadLength, 8);
+    return HMTransportBuffer;
+}
+
+// Record dumps, the records are described by the callers. The numbers are passed as decimal strings.
+void HMAppendCount(unsigned int count) {
+    char total[16];
+    snprintf(total, sizeof(total), "%u", count);
+    HMTransportAppendFields(1, total);
+}
+
+// Append "name<0x1f>address<0x1f>superclass address<0x1f>image index"
+void HMAppendClass(Class cls, const char *name, const char *image) {
+    char address[24];
+    char superclassAddress[24];
+    snprintf(address, sizeof(address), "%p", cls);
+    snprintf(superclassAddress, sizeof(superclassAddress), "%p", class_getSuperclass(cls));
+    HMTransportAppendFields(4, name, address, superclassAddress, image);
+}
+
+// See HMClassIndex.dumpRuntimeClassBatch
+void HMAppendClassBatch(const char *start, const char *count) {
+    unsigned int first = (unsigned int)strtoul(start, NULL, 10);
+    unsigned int end = first + (unsigned int)strtoul(count, NULL, 10);
+    NSMutableDictionary *imageIndexes = [[NSMutableDictionary alloc] init];
+    unsigned int classCount;
+    Class *classList = objc_copyClassList(&classCount);
+    HMAppendCount(classCount);
+    for (unsigned int i = first; i < classCount && i < end; ++i) {
+        Class cls = classList[i];
+        const char *imageName = class_getImageName(cls);
+        NSNumber *imageKey = [NSNumber numberWithUnsignedLongLong:(uintptr_t)imageName];
+        NSNumber *imageIndex = (NSNumber *)[imageIndexes objectForKey:imageKey];
+        if (imageIndex == nil) {
+            imageIndex = [NSNumber numberWithUnsignedInteger:[imageIndexes count]];
+            [imageIndexes setObject:imageIndex forKey:imageKey];
+            HMTransportAppendFields(2, "image", imageName);
+        }
+        char image[16];
+        snprintf(image, sizeof(image), "%u", [imageIndex unsignedIntValue]);
+        HMAppendClass(cls, class_getName(cls), image);
+    }
+    free(classList);
+}
+
+// See HMClassIndex.updateRuntimeClasses
+void HMAppendRuntimeClasses(const char *expectedCount) {
+    unsigned int classCount = 0;
+    Class *classList = objc_copyClassList(&classCount);
+    HMAppendCount(classCount);
+    if (classCount != (unsigned int)strtoul(expectedCount, NULL, 10)) {
+        for (unsigned int i = 0; i < classCount; ++i) {
+            if (class_getImageName(classList[i]) == NULL) {
+                HMAppendClass(classList[i], class_getName(classList[i]), "0");
+            }
+        }
+    }
+    free(classList);
+}
+
+// See HMClassIndex.addImageClasses, imagePaths are separated by '\\n'
+void HMAppendImageClasses(NSString *imagePaths) {
+    NSArray *paths = [imagePaths componentsSeparatedByString:@"\\n"];
+    for (NSUInteger i = 0; i < [paths count]; ++i) {
+        unsigned int classCount = 0;
+        const char **classNames = objc_copyClassNamesForImage([(NSString *)[paths objectAtIndex:i] UTF8String], &classCount);
+        if (classNames == NULL) {
+            continue;
+        }
+        char image[16];
+        snprintf(image, sizeof(image), "%lu", (unsigned long)i);
+        for (unsigned int j = 0; j < classCount; ++j) {
+            Class cls = objc_lookUpClass(classNames[j]);
+            if (cls != nil) {
+                HMAppendClass(cls, classNames[j], image);
+            }
+        }
+        free(classNames);
+    }
+}
+
+// Append "name<0x1f>address", then "+/-<0x1f>selector<0x1f>type encoding" for each method, with the IMP as a fourth field if includeIMP
+void HMAppendClassMethods(Class cls, BOOL includeIMP) {
+    char address[24];
+    snprintf(address, sizeof(address), "%p", cls);
+    HMTransportAppendFields(2, class_getName(cls), address);
+    for (int isMeta = 0; isMeta < 2; ++isMeta) {
+        Class methodClass = isMeta ? object_getClass(cls) : cls;
+        if (isMeta && !class_isMetaClass(methodClass)) {
+            break;
+        }
+        unsigned int methodCount;
+        Method *methodList = class_copyMethodList(methodClass, &methodCount);
+        for (unsigned int j = 0; j < methodCount; ++j) {
+            Method method = methodList[j];
+            char imp[24];
+            snprintf(imp, sizeof(imp), "%p", method_getImplementation(method));
+            HMTransportAppendFields(includeIMP ? 4 : 3, isMeta ? "+" : "-", sel_getName(method_getName(method)), method_getTypeEncoding(method), imp);
+        }
+        free(methodList);
+    }
+}
+
+// See HMSelectorIndex.dumpMethodBatch
+void HMAppendMethodBatch(const char *start, const char *count, const char *runtimeClassesOnly) {
+    unsigned int first = (unsigned int)strtoul(start, NULL, 10);
+    unsigned int end = first + (unsigned int)strtoul(count, NULL, 10);
+    BOOL runtimeOnly = runtimeClassesOnly[0] == '1';
+    unsigned int classCount;
+    Class *classList = objc_copyClassList(&classCount);
+    HMAppendCount(classCount);
+    for (unsigned int i = first; !runtimeOnly && i < classCount && i < end; ++i) {
+        if (class_getImageName(classList[i]) != NULL) {
+            HMAppendClassMethods(classList[i], YES);
+        }
+    }
+    if (runtimeOnly || end >= classCount) {
+        HMTransportAppendUTF8("runtime");
+        for (unsigned int i = 0; i < classCount; ++i) {
+            if (class_getImageName(classList[i]) == NULL) {
+                HMAppendClassMethods(classList[i], YES);
+            }
+        }
+    }
+    free(classList);
+}
+
+// Append "address<0x1f>protocol,protocol" of the protocols adopted by the class and add them to pendingProtocols
+void HMAppendClassProtocols(Class cls, NSMutableArray *pendingProtocols) {
+    unsigned int protocolCount = 0;
+    Protocol * __unsafe_unretained *protocolList = cls == nil ? NULL : class_copyProtocolList(cls, &protocolCount);
+    if (protocolCount == 0) {
+        free(protocolList);
+        return;
+    }
+    NSMutableArray *protocolNames = [[NSMutableArray alloc] init];
+    for (unsigned int k = 0; k < protocolCount; ++k) {
+        [protocolNames addObject:[NSString stringWithUTF8String:protocol_getName(protocolList[k])]];
+        [pendingProtocols addObject:protocolList[k]];
+    }
+    free(protocolList);
+    char address[24];
+    snprintf(address, sizeof(address), "%p", cls);
+    HMTransportAppendFields(2, address, [[protocolNames componentsJoinedByString:@","] UTF8String]);
+}
+
+// See HMProtocolIndex.dumpProtocolBatch, imagePaths and classAddresses are separated by '\\n'
+void HMAppendProtocols(const char *allProtocols, NSString *imagePaths, NSString *classAddresses) {
+    NSMutableArray *pendingProtocols = [[NSMutableArray alloc] init];
+    NSArray *paths = [imagePaths componentsSeparatedByString:@"\\n"];
+    for (NSUInteger i = 0; i < [paths count]; ++i) {
+        unsigned int classCount = 0;
+        const char **classNames = objc_copyClassNamesForImage([(NSString *)[paths objectAtIndex:i] UTF8String], &classCount);
+        if (classNames == NULL) {
+            continue;
+        }
+        for (unsigned int j = 0; j < classCount; ++j) {
+            HMAppendClassProtocols(objc_lookUpClass(classNames[j]), pendingProtocols);
+        }
+        free(classNames);
+    }
+
+    // The classes created at run time have no image, they are passed by address
+    NSArray *addresses = [classAddresses componentsSeparatedByString:@"\\n"];
+    for (NSUInteger i = 0; i < [addresses count]; ++i) {
+        NSString *classAddress = (NSString *)[addresses objectAtIndex:i];
+        if ([classAddress length] > 0) {
+            HMAppendClassProtocols((Class)strtoull([classAddress UTF8String], NULL, 16), pendingProtocols);
+        }
+    }
+
+    if (allProtocols[0] == '1') {
+        [pendingProtocols removeAllObjects];
+        unsigned int protocolCount = 0;
+        Protocol * __unsafe_unretained *protocolList = objc_copyProtocolList(&protocolCount);
+        for (unsigned int i = 0; i < protocolCount; ++i) {
+            [pendingProtocols addObject:protocolList[i]];
+        }
+        free(protocolList);
+    }
+    NSMutableSet *visitedProtocols = [[NSMutableSet alloc] init];
+    while ([pendingProtocols count] > 0) {
+        Protocol *protocol = (Protocol *)[pendingProtocols lastObject];
+        [pendingProtocols removeLastObject];
+        NSString *protocolName = [NSString stringWithUTF8String:protocol_getName(protocol)];
+        if ((BOOL)[visitedProtocols containsObject:protocolName]) {
+            continue;
+        }
+        [visitedProtocols addObject:protocolName];
+        unsigned int parentCount = 0;
+        Protocol * __unsafe_unretained *parentList = protocol_copyProtocolList(protocol, &parentCount);
+        NSMutableArray *parentNames = [[NSMutableArray alloc] init];
+        for (unsigned int j = 0; j < parentCount; ++j) {
+            [parentNames addObject:[NSString stringWithUTF8String:protocol_getName(parentList[j])]];
+            [pendingProtocols addObject:parentList[j]];
+        }
+        free(parentList);
+        HMTransportAppendFields(3, "protocol", [protocolName UTF8String], [[parentNames componentsJoinedByString:@","] UTF8String]);
+    }
+}
+
+// See HMClassInfoCommands.evaluateDescription
+void HMAppendDescription(id receiver, const char *selectorName) {
+    SEL selector = sel_registerName(selectorName);
+    if (receiver == nil) {
+        HMTransportAppendUTF8("notFound");
+    } else if ((BOOL)[receiver respondsToSelector:selector]) {
+        char address[24];
+        snprintf(address, sizeof(address), "%p", receiver);
+        HMTransportAppendFields(2, "found", address);
+        HMTransportAppendString((NSString *)[receiver performSelector:selector]);
+    } else {
+        HMTransportAppendUTF8("notNSObject");
+    }
+}
+
+// See HMLLDBHelpers.getClassPrefixes
+void HMAppendClassPrefixes(void) {
+    if (HMClassPrefixes == NULL) {
+        HMCollectClassPrefixes();
+    }
+    HMTransportAppendUTF8(HMClassPrefixes);
+}
+
+// Items of HMLLDBHelpers.evaluateExpressionsDescription, "1description" or "0reason"
+void HMAppendBatchItem(id item) {
+    HMTransportAppendString([[NSString alloc] initWithFormat:@"1%@", item]);
+}
+
+void HMAppendBatchException(NSException *exception) {
+    HMTransportAppendString([[NSString alloc] initWithFormat:@"0%@", exception.reason]);
+}
+
+// See HMPushViewController.push
+id HMNewObject(Class cls) {
+    return cls ? [[cls alloc] init] : nil;
+}
+
+// Sandbox of deletefile, see HMFileCommands.deleteFile.
+// name: "Home", "Documents", "Library", "tmp", "Caches" or "Preferences"
+NSString *HMSandboxDirectory(const char *name) {
+    if (strcmp(name, "Documents") == 0) {
+        return (NSString *)[NSSearchPathForDirectoriesInDomains(NSDocumentDirectory, NSUserDomainMask, YES) firstObject];
+    }
+    if (strcmp(name, "Library") == 0) {
+        return (NSString *)[NSSearchPathForDirectoriesInDomains(NSLibraryDirectory, NSUserDomainMask, YES) firstObject];
+    }
+    if (strcmp(name, "Caches") == 0) {
+        return (NSString *)[NSSearchPathForDirectoriesInDomains(NSCachesDirectory, NSUserDomainMask, YES) firstObject];
+    }
+    if (strcmp(name, "Preferences") == 0) {
+        return [(NSString *)[NSSearchPathForDirectoriesInDomains(NSLibraryDirectory, NSUserDomainMask, YES) firstObject] stringByAppendingPathComponent:@"Preferences"];
+    }
+    if (strcmp(name, "tmp") == 0) {
+        return (NSString *)NSTemporaryDirectory();
+    }
+    return (NSString *)NSHomeDirectory();
+}
+
+// The names of the files in the directory separated by '\\n'
+NSString *HMContentsOfDirectory(NSString *directoryPath) {
+    return [[[NSFileManager defaultManager] contentsOfDirectoryAtPath:directoryPath error:nil] componentsJoinedByString:@"\\n"];
+}
+
+NSString *HMRemoveFilesInDirectory(NSString *directoryPath) {
+    NSMutableString *result = [[NSMutableString alloc] init];
+    NSFileManager *fileMgr = [NSFileManager defaultManager];
+    if ([fileMgr fileExistsAtPath:directoryPath]) {
+        NSArray *subFileArray = [fileMgr contentsOfDirectoryAtPath:directoryPath error:nil];
+        for (NSString *subFileName in subFileArray) {
+            NSString *subFilePath = [directoryPath stringByAppendingPathComponent:subFileName];
+            if ([fileMgr removeItemAtPath:subFilePath error:nil]) {
+                [result appendFormat:@"removed file: %@\\n", subFilePath];
+            } else {
+                [result appendFormat:@"failed to remove file: %@\\n", subFilePath];
+            }
+        }
+    } else {
+        [result appendFormat:@"failed to remove non-existing file: %@\\n", directoryPath];
+    }
+
+    if ([result length] == 0) {
+        [result appendString:@"There are no files in this directory.\\n"];
+    }
+    return result;
+}
+
+NSString *HMRemoveFileOrDirectory(NSString *filePath) {
+    NSMutableString *result = [[NSMutableString alloc] init];
+    NSFileManager *fileMgr = [NSFileManager defaultManager];
+    if ([fileMgr fileExistsAtPath:filePath]) {
+        if (![filePath containsString:(NSString *)NSHomeDirectory()]) {
+            [result appendString:@"The file path must be in the sandbox\\n"];
+        } else if ([fileMgr removeItemAtPath:filePath error:nil]) {
+            [result appendFormat:@"removed file: %@\\n", filePath];
+        } else {
+            [result appendFormat:@"failed to remove file: %@\\n", filePath];
+        }
+    } else {
+        [result appendFormat:@"failed to remove non-existing file: %@\\n", filePath];
+    }
+    return result;
+}
+
+// Class specs, see HMLLDBHelpers.registerClassSpec.
+// Allocate the class pair, or append "exists" or "failed" and return nil.
+Class HMAllocateSpecClass(const char *className, const char *superClassName) {
+    if (objc_lookUpClass(className) != nil) {
+        HMTransportAppendUTF8("exists");
+        return nil;
+    }
+    Class superCls = (Class)objc_lookUpClass(superClassName);
+    Class cls = superCls ? (Class)objc_allocateClassPair(superCls, className, 0) : nil;
+    if (cls == nil) {
+        HMTransportAppendUTF8("failed");
+    }
+    return cls;
+}
+
+// Register the class and append "registered<0x1f>address<0x1f>superclass address"
+void HMRegisterSpecClass(Class cls) {
+    objc_registerClassPair(cls);
+    char address[24];
+    char superclassAddress[24];
+    snprintf(address, sizeof(address), "%p", cls);
+    snprintf(superclassAddress, sizeof(superclassAddress), "%p", class_getSuperclass(cls));
+    HMTransportAppendFields(3, "registered", address, superclassAddress);
+}
+
+// Add a method of a class spec, see HMLLDBHelpers.registerClassSpec.
+// Append "sign<0x1f>selector<0x1f>IMP<0x1f>added" to the transport, "+" is a class method.
+void HMAddSpecMethod(Class cls, const char *sign, const char *selector, IMP imp, const char *types) {
+    Class targetCls = sign[0] == '+' ? object_getClass(cls) : cls;
+    BOOL added = imp != NULL && class_addMethod(targetCls, sel_registerName(selector), imp, types);
+    char address[24];
+    snprintf(address, sizeof(address), "%p", imp);
+    HMTransportAppendFields(4, sign, selector, address, added ? "1" : "0");
+}
+
+// Lazy methods of a class spec, see HMLLDBHelpers.registerClassSpec.
+// The +resolveInstanceMethod: of the class calls HMResolveLazyMethod, HMLLDB has a breakpoint in HMLazyMethodTrap.
+// The breakpoint callback reads the request, adds the IMP of the method and sets HMLazyMethodResolved.
+// The breakpoint is ignored while an expression runs. The method is then resolved with a stub that forwards
+// each call to the -forwardInvocation: of the class, HMForwardLazyMethod, which stops in the trap again.
+const char *HMLazyMethodClassName = NULL;
+const char *HMLazyMethodSelector = NULL;
+BOOL HMLazyMethodResolved = NO;
+
+__attribute__((noinline)) void HMLazyMethodTrap(void) {
+    __asm__ volatile("");
+}
+
+// Append "trap<0x1f>address of HMLazyMethodTrap" to the transport of a class spec
+void HMAppendLazyMethodTrap(void) {
+    char address[24];
+    snprintf(address, sizeof(address), "%p", (void *)HMLazyMethodTrap);
+    HMTransportAppendFields(2, "trap", address);
+}
+
+// The type encoding of the lazy selector in lazySelectors, NULL if sel isn't lazy.
+// lazySelectors: "\\nselector\\ttypes\\nselector\\ttypes\\n", other selectors (e.g. the probes of respondsToSelector:) don't stop the process
+const char *HMLazyMethodTypes(SEL sel, const char *lazySelectors) {
+    const char *selector = sel_getName(sel);
+    size_t length = strlen(selector);
+    const char *match = strstr(lazySelectors, selector);
+    while (match != NULL && (match[-1] != '\\n' || match[length] != '\\t')) {
+        match = strstr(match + 1, selector);
+    }
+    return match == NULL ? NULL : match + length + 1;
+}
+
+BOOL HMTrapLazyMethod(const char *className, SEL sel) {
+    HMLazyMethodClassName = className;
+    HMLazyMethodSelector = sel_getName(sel);
+    HMLazyMethodResolved = NO;
+    HMLazyMethodTrap();
+    return HMLazyMethodResolved;
+}
+
+BOOL HMResolveLazyMethod(const char *className, SEL sel, const char *lazySelectors) {
+    const char *types = HMLazyMethodTypes(sel, lazySelectors);
+    if (types == NULL) {
+        return NO;
+    }
+    if (HMTrapLazyMethod(className, sel)) {
+        return YES;
+    }
+    // A negative result would be cached by the runtime, every later call would raise "unrecognized selector"
+    char stubTypes[256];
+    snprintf(stubTypes, sizeof(stubTypes), "%.*s", (int)(strchr(types, '\\n') - types), types);
+    return class_addMethod((Class)objc_lookUpClass(className), sel, (IMP)_objc_msgForward, stubTypes);
+}
+
+// Send a call of a stub to the compiled method, NO if sel isn't lazy.
+// The call is dropped if the method still can't be compiled, its return value is zero.
+BOOL HMForwardLazyMethod(const char *className, NSInvocation *invocation, const char *lazySelectors) {
+    SEL sel = [invocation selector];
+    if (HMLazyMethodTypes(sel, lazySelectors) == NULL) {
+        return NO;
+    }
+    if (HMTrapLazyMethod(className, sel)) {
+        [invocation invoke];
+    } else {
+        NSLog(@"[HMLLDB] -[%s %s] is dropped, it can't be compiled while an expression is running", className, sel_getName(sel));
+    }
+    return YES;
+}
+
+// Pre-warming of the debug HUD, see HMDebugPrewarm.py.
+// HMLLDB has a breakpoint in HMPrewarmTrap, its callback registers one class per stop.
+__attribute__((noinline)) void HMPrewarmTrap(void) {
+    __asm__ volatile("");
+}
+
+// Stop in HMPrewarmTrap on the main thread after the delay, return the address of HMPrewarmTrap
+void *HMSchedulePrewarm(double delay) {
+    dispatch_after(dispatch_time(DISPATCH_TIME_NOW, (int64_t)(delay * NSEC_PER_SEC)), dispatch_get_main_queue(), ^{
+        HMPrewarmTrap();
+    });
+    return (void *)HMPrewarmTrap;
+}
+'''
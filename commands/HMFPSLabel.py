@@ -52,21 +52,17 @@ def showFPS(debugger, command, exe_ctx, result, internal_dict):
         return
 
     # Register class
-    FPSLabelClassValue = HM.allocateClass(FPSClassName, "UILabel")
-    HM.addIvar(FPSLabelClassValue.GetValue(), "_link", "CADisplayLink *")
-    HM.addIvar(FPSLabelClassValue.GetValue(), "_count", "int")
-    HM.addIvar(FPSLabelClassValue.GetValue(), "_lastTime", "double")
-    HM.registerClass(FPSLabelClassValue.GetValue())
-
-    addToKeyWindowIMPValue = makeAddToKeyWindowIMP()
-    if not HM.judgeSBValueHasValue(addToKeyWindowIMPValue):
+    ivars = [
+        ("_link", "CADisplayLink *"),
+        ("_count", "int"),
+        ("_lastTime", "double")
+    ]
+    methods = [
+        ("+", "addToKeyWindow", "@@:", makeAddToKeyWindowIMP()),
+        ("-", "tick:", "v@:@", makeTickIMP())
+    ]
+    if HM.registerClassSpec(FPSClassName, "UILabel", ivars, methods, HMExpressionPrefix.gPrefix) is None:
         return
-    HM.addClassMethod(FPSClassName, "addToKeyWindow", addToKeyWindowIMPValue.GetValue(), "@@:")
-
-    tickIMPValue = makeTickIMP()
-    if not HM.judgeSBValueHasValue(tickIMPValue):
-        return
-    HM.addInstanceMethod(FPSClassName, "tick:", tickIMPValue.GetValue(), "v@:@")
 
     # Show fps command
     addToKeyWindowCommand = '''
@@ -79,7 +75,7 @@ def showFPS(debugger, command, exe_ctx, result, internal_dict):
     HM.processContinue()
 
 
-def makeAddToKeyWindowIMP() -> lldb.SBValue:
+def makeAddToKeyWindowIMP() -> str:
     command_script = '''
 
         UILabel * (^addToKeyWindowBlock)(id) = ^UILabel *(id classSelf) {
@@ -105,10 +101,10 @@ def makeAddToKeyWindowIMP() -> lldb.SBValue:
         
     '''
 
-    return HM.evaluateExpressionValue(expression=command_script, prefix=HMExpressionPrefix.gPrefix)
+    return command_script
 
 
-def makeTickIMP() -> lldb.SBValue:
+def makeTickIMP() -> str:
     command_script = '''
         
         void (^tickBlock)(UILabel *, CADisplayLink *) = ^(UILabel *fpsLabel, CADisplayLink *link) {
@@ -145,4 +141,4 @@ def makeTickIMP() -> lldb.SBValue:
 
     '''
 
-    return HM.evaluateExpressionValue(command_script)
+    return command_script
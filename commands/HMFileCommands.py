@@ -21,6 +21,7 @@
 # SOFTWARE.
 
 import lldb
+from typing import List, Optional, Tuple
 import HMLLDBHelpers as HM
 import os
 import shlex
@@ -58,8 +59,7 @@ def pHomeDirectory(debugger, command, exe_ctx, result, internal_dict):
         result.SetError(parser.usage)
         return
 
-    homeDirectoryValue = HM.evaluateExpressionValue('(NSString *)NSHomeDirectory()')
-    path = homeDirectoryValue.GetObjectDescription()
+    path = HM.evaluateExpressionDescription('(NSString *)NSHomeDirectory()', useCache=True)
     HM.DPrint(path)
     if options.open:
         os.system('open ' + path)
@@ -90,7 +90,7 @@ def pBundlePath(debugger, command, exe_ctx, result, internal_dict):
         result.SetError(parser.usage)
         return
 
-    bundlePathValue = HM.evaluateExpressionValue('(NSString*)[[NSBundle mainBundle] bundlePath]')
+    bundlePathValue = HM.evaluateExpressionValue('(NSString*)[[NSBundle mainBundle] bundlePath]', useCache=True)
     path = bundlePathValue.GetObjectDescription()
     HM.DPrint(path)
     if options.open:
@@ -132,103 +132,68 @@ def deleteFile(debugger, command, exe_ctx, result, internal_dict):
         result.SetError(parser.usage)
         return
 
-    hasOption = False
+    # Resolve all directories in one JIT round trip, then delete them in another one.
+    directoryExpressions = []
 
     if options.all:
         # Reserve the directory under the Home directory
-        hasOption = True
-        subFileArrayValue = HM.evaluateExpressionValue("[[NSFileManager defaultManager] contentsOfDirectoryAtPath:(NSString *)NSHomeDirectory() error:nil]")
-        for i in range(subFileArrayValue.GetNumChildren()):
-            subFileValue = subFileArrayValue.GetChildAtIndex(i)
-            HM.DPrint("=============" + subFileValue.GetObjectDescription() + "=============")
-            subFilePathValue = HM.evaluateExpressionValue(f"[(NSString *)NSHomeDirectory() stringByAppendingPathComponent:(NSString *){subFileValue.GetValue()}]")
-            deleteAllFileInDirectory(subFilePathValue.GetObjectDescription())
+        directoryExpressions.append('HMContentsOfDirectory(HMSandboxDirectory("Home"))')
+        directoryExpressions.append('HMSandboxDirectory("Home")')
 
     if options.documents:
-        hasOption = True
-        documentsDirectoryValue = HM.evaluateExpressionValue("(NSString *)[NSSearchPathForDirectoriesInDomains(NSDocumentDirectory, NSUserDomainMask, YES) firstObject]")
-        deleteAllFileInDirectory(documentsDirectoryValue.GetObjectDescription())
+        directoryExpressions.append('HMSandboxDirectory("Documents")')
 
     if options.library:
-        hasOption = True
-        libraryDirectoryValue = HM.evaluateExpressionValue("(NSString *)[NSSearchPathForDirectoriesInDomains(NSLibraryDirectory, NSUserDomainMask, YES) firstObject]")
-        deleteAllFileInDirectory(libraryDirectoryValue.GetObjectDescription())
+        directoryExpressions.append('HMSandboxDirectory("Library")')
 
     if options.tmp:
-        hasOption = True
-        tmpDirectoryValue = HM.evaluateExpressionValue("(NSString *)NSTemporaryDirectory()")
-        deleteAllFileInDirectory(tmpDirectoryValue.GetObjectDescription())
+        directoryExpressions.append('HMSandboxDirectory("tmp")')
 
     if options.caches:
-        hasOption = True
-        cachesDirectoryValue = HM.evaluateExpressionValue("(NSString *)[NSSearchPathForDirectoriesInDomains(NSCachesDirectory, NSUserDomainMask, YES) firstObject]")
-        deleteAllFileInDirectory(cachesDirectoryValue.GetObjectDescription())
+        directoryExpressions.append('HMSandboxDirectory("Caches")')
 
     if options.preferences:
-        hasOption = True
-        libraryDirectoryValue = HM.evaluateExpressionValue("(NSString *)[NSSearchPathForDirectoriesInDomains(NSLibraryDirectory, NSUserDomainMask, YES) firstObject]")
-        preferencesDirectoryValue = HM.evaluateExpressionValue(f"(NSString *)[(NSString *){libraryDirectoryValue.GetValue()} stringByAppendingPathComponent:@\"Preferences\"]")
-        deleteAllFileInDirectory(preferencesDirectoryValue.GetObjectDescription())
+        directoryExpressions.append('HMSandboxDirectory("Preferences")')
 
-    if options.file:
-        hasOption = True
-        deleteFileOrDirectory(options.file)
-
-    if not hasOption:
+    if len(directoryExpressions) == 0 and not options.file:
         HM.DPrint("Requires at least one target file/directory, Please enter \"help deletefile\" for help.")
+        return
 
+    directories = HM.evaluateExpressionsDescription(directoryExpressions)
 
-def deleteAllFileInDirectory(directoryPath: str) -> None:
-    command_script = f'''
-        NSString *directoryPath = @"{directoryPath}";
-        NSMutableString *result = [[NSMutableString alloc] init];
-        NSFileManager *fileMgr = [NSFileManager defaultManager];
-        if ([fileMgr fileExistsAtPath:directoryPath]) {{
-            NSArray *subFileArray = [fileMgr contentsOfDirectoryAtPath:directoryPath error:nil];
-            for (NSString *subFileName in subFileArray) {{
-                NSString *subFilePath = [directoryPath stringByAppendingPathComponent:subFileName];
-                if ([fileMgr removeItemAtPath:subFilePath error:nil]) {{
-                    [result appendFormat:@"removed file: %@\\n", subFilePath];
-                }} else {{
-                    [result appendFormat:@"failed to remove file: %@\\n", subFilePath];
-                }}
-            }}
-        }} else {{
-            [result appendFormat:@"failed to remove non-existing file: %@\\n", directoryPath];
-        }}
-
-        if ([result length] == 0) {{
-            [result appendString:@"There are no files in this directory.\\n"];
-        }}
-    
-        result;
-    '''
-
-    result = HM.evaluateExpressionValue(command_script).GetObjectDescription()
-    HM.DPrint(result)
-
-
-def deleteFileOrDirectory(filePath: str) -> None:
-    command_script = f'''
-        NSString *filePath = @"{filePath}";
-        NSMutableString *result = [[NSMutableString alloc] init];
-        NSFileManager *fileMgr = [NSFileManager defaultManager];
-        if ([fileMgr fileExistsAtPath:filePath]) {{
-            if (![filePath containsString:(NSString *)NSHomeDirectory()]) {{
-                [result appendString:@"The file path must be in the sandbox\\n"];
-            }} else if ([fileMgr removeItemAtPath:filePath error:nil]) {{
-                [result appendFormat:@"removed file: %@\\n", filePath];
-            }} else {{
-                [result appendFormat:@"failed to remove file: %@\\n", filePath];
-            }}
-        }} else {{
-            [result appendFormat:@"failed to remove non-existing file: %@\\n", filePath];
-        }}
-
-        result;
-    '''
-    result = HM.evaluateExpressionValue(command_script).GetObjectDescription()
-    HM.DPrint(result)
+    # Each path is passed as an expression argument instead of being spliced into the script
+    targets: List[Tuple[Optional[str], str, bool]] = []
+    if options.all:
+        (subFileNamesSuccess, subFileNames), (homeDirectorySuccess, homeDirectory) = directories[:2]
+        if not subFileNamesSuccess or not homeDirectorySuccess:
+            HM.DPrint(subFileNames if not subFileNamesSuccess else homeDirectory)
+            return
+        directories = directories[2:]
+        for subFileName in subFileNames.splitlines():
+            targets.append(("=============" + subFileName + "=============", homeDirectory + "/" + subFileName, True))
+
+    for success, directoryPath in directories:
+        if success:
+            targets.append((None, directoryPath, True))
+
+    if options.file:
+        targets.append((None, options.file, False))
+
+    # An expression accepts at most kMaxArguments arguments
+    for start in range(0, len(targets), HM.kMaxArguments):
+        chunk = targets[start:start + HM.kMaxArguments]
+        deleteScripts = []
+        for index, (_, _, isDirectory) in enumerate(chunk):
+            if isDirectory:
+                deleteScripts.append(f"HMRemoveFilesInDirectory(HMArgString({index}))")
+            else:
+                deleteScripts.append(f"HMRemoveFileOrDirectory(HMArgString({index}))")
+
+        deleteResults = HM.evaluateExpressionsDescription(deleteScripts, arguments=[path for _, path, _ in chunk])
+        for (title, _, _), (_, result) in zip(chunk, deleteResults):
+            if title:
+                HM.DPrint(title)
+            HM.DPrint(result)
 
 
 def generate_option_parser(command: str) -> optparse.OptionParser:
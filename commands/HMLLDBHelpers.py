@@ -21,42 +21,114 @@
 # SOFTWARE.
 
 import lldb
-from typing import Any, List, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 import inspect
+import os
+import re
+import struct
+import sys
+import time
 import HMLLDBClassInfo
+import HMExpressionLibrary
 
 
-gIsFirstCall = True
-
+gPreparedProcessUIDs: Set[int] = set()  # Unique IDs of the processes that have imported modules, see prepareExpressionContext
 gClassPrefixes: List[str] = []   # Class Prefixes that may be user-written
-gClassPrefixesValue: lldb.SBValue = lldb.SBValue()
+gClassPrefixesProcessUID = 0     # Unique ID of the process of gClassPrefixes, they are collected again after the app is relaunched
+
+# Results of expressions evaluated with useCache=True. Only valid while the process stays stopped.
+# Key: (expression, prefix, arguments)
+gExpressionCache: Dict[Tuple[str, str, Tuple[str, ...]], lldb.SBValue] = {}
+gExpressionDescriptionCache: Dict[Tuple[str, str, Tuple[str, ...]], str] = {}
+gExpressionCacheGeneration: Tuple[int, int] = (0, 0)  # (process unique ID, stop ID)
+gExpressionCacheHits = 0
+gExpressionCacheMisses = 0
+
+gClassRegistrations = 0  # Classes registered by HMLLDB
+# (process unique ID, name, class, superclass) of the classes registered by registerClassSpec, in order.
+# HMClassIndex merges them into the class index instead of scanning the runtime again.
+gRegisteredClasses: List[Tuple[int, str, int, int]] = []
+
+gHelperLibraryProcessUID = 0  # Unique ID of the process that the helper library was injected into
+
+# Lazy methods of the class specs, added by the breakpoint in HMLazyMethodTrap when the app resolves them
+gLazyMethods: Dict[Tuple[str, str], Tuple[str, str, str]] = {}  # (class name, selector) -> (type encoding, block script, prefix)
+gLazyMethodBreakpoint: Tuple[int, int, int] = (0, 0, 0)  # (process unique ID, address of HMLazyMethodTrap, breakpoint ID)
+
+# Expression templates read their arguments from HMArgs of the helper library, so the expression text stays constant.
+kMaxArguments = 16
+gArgumentsAddresses: Dict[int, int] = {}  # Process unique ID -> address of HMArgs
+gArgumentsArenas: Dict[int, Tuple[int, int]] = {}  # Process unique ID -> (address, size) of the memory storing the argument strings
+
+gProfileEnabled = False  # Record the expressions and their timing history, enabled by hmprofile --enable
+gProfileRecords: List[Dict[str, Any]] = []  # One record per evaluation, see recordExpressionProfile
+gProfileRecordsLimit = 100000
+gCommandsDirectory = os.path.dirname(os.path.realpath(__file__))
+
+# Timeout classes of evaluateExpressionValue: (timeout, one-thread timeout) in microseconds.
+# The expression runs on the selected thread alone for the one-thread timeout, then all threads run until the timeout,
+# so an expression waiting for a lock held by another thread can still finish, as with the default options of lldb.
+kTimeoutQuick = "quick"    # Runtime lookups, fail fast if the thread is blocked
+kTimeoutNormal = "normal"
+kTimeoutBulk = "bulk"      # Scans of the whole runtime, the budget grows with the timing history of the call site
+gTimeoutClasses: Dict[str, Tuple[int, int]] = {
+    kTimeoutQuick: (1000000, 500000),
+    kTimeoutNormal: (5000000, 4900000),
+    kTimeoutBulk: (60000000, 4900000)
+}
+gTimingHistory: Dict[str, List[float]] = {}  # Call site -> seconds of recent successful evaluations
+gTimingHistoryLimit = 50
+
+gFieldSeparator = "\x1f"  # Separator of HMTransportAppendFields
+
+# Events recorded by hmtrace: expressions, memory reads, memory allocations and lldb commands.
+# None when not tracing, see HMTrace.py
+gTraceEvents: Optional[List[Dict[str, Any]]] = None
 
 
 def processContinue() -> None:
     asyncState = lldb.debugger.GetAsync()
     lldb.debugger.SetAsync(True)
-    lldb.debugger.HandleCommand('process continue')
+    handleCommand('process continue')
     lldb.debugger.SetAsync(asyncState)
 
 
+def handleCommand(command: str) -> None:
+    traceEvent({"kind": "command", "command": command})
+    lldb.debugger.HandleCommand(command)
+
+
+def interruptRequested() -> bool:
+    # Control-C while a command runs, long commands check it between their expressions.
+    # SBDebugger.InterruptRequested is available since lldb 17.
+    if hasattr(lldb.debugger, "InterruptRequested"):
+        return lldb.debugger.InterruptRequested()
+    return lldb.debugger.GetCommandInterpreter().WasInterrupted()
+
+
 def DPrint(obj: Any) -> None:
     print('[HMLLDB] ', end='')
     print(obj)
     
 
-def evaluateExpressionValue(expression: str, prefix='', printErrors=True) -> lldb.SBValue:
+def evaluateExpressionValue(expression: str, prefix='', printErrors=True, useCache=False, topLevel=False, timeoutClass=kTimeoutNormal, arguments: Optional[List[str]] = None) -> lldb.SBValue:
+    # useCache: Return the result of the same expression evaluated at the same stop.
+    # Only use it for expressions without side effects.
+    # timeoutClass: kTimeoutQuick, kTimeoutNormal or kTimeoutBulk
+    # arguments: Strings that the expression reads from HMArgs[i] or HMArgString(i), e.g. objc_lookUpClass(HMArgs[0])
+    arguments = arguments or []
+    if useCache:
+        cachedValue = lookUpExpressionCache(expression, prefix, arguments)
+        if cachedValue is not None:
+            return cachedValue
+
     frame = lldb.debugger.GetSelectedTarget().GetProcess().GetSelectedThread().GetSelectedFrame()
+    # Walking the Python stack costs more than the records, it's only done while profiling
+    caller, command = expressionCallSite() if gProfileEnabled else ("", "")
 
-    global gIsFirstCall
-    if gIsFirstCall:
-        gIsFirstCall = False
-        op = lldb.SBExpressionOptions()
-        op.SetLanguage(lldb.eLanguageTypeObjC_plus_plus)
-        frame.EvaluateExpression('''
-            @import Foundation;
-            @import UIKit;
-            @import ObjectiveC;
-        ''', op)
+    prepareExpressionContext(frame, caller, command)
+    if len(arguments) > 0 and not writeExpressionArguments(frame.GetThread().GetProcess(), arguments):
+        return lldb.SBValue()
 
     options = lldb.SBExpressionOptions()
     # options.SetCoerceResultToId(False)
@@ -66,9 +138,12 @@ def evaluateExpressionValue(expression: str, prefix='', printErrors=True) -> lld
     options.SetIgnoreBreakpoints(True)  # default: False
     # options.SetGenerateDebugInfo(False)
 
-    options.SetTimeoutInMicroSeconds(5000000)  # default: 500000
-    options.SetOneThreadTimeoutInMicroSeconds(4900000)  # default: 0
-    # options.SetTryAllThreads(True)
+    timeout, oneThreadTimeout = gTimeoutClasses[timeoutClass]
+    if timeoutClass == kTimeoutBulk:
+        timeout = max(timeout, suggestedTimeout(caller) or 0)
+    options.SetTimeoutInMicroSeconds(timeout)  # default: 500000
+    options.SetOneThreadTimeoutInMicroSeconds(oneThreadTimeout)  # default: 0
+    options.SetTryAllThreads(True)  # default: True
     # options.SetStopOthers(True)
 
     options.SetTrapExceptions(False)  # default: True
@@ -80,19 +155,356 @@ def evaluateExpressionValue(expression: str, prefix='', printErrors=True) -> lld
         options.SetPrefix(prefix)
     # options.SetAutoApplyFixIts(True)
 
-    # options.SetTopLevel(False)
+    options.SetTopLevel(topLevel)  # default: False
     # options.SetAllowJIT(True)
 
+    startTime = time.perf_counter()
     value = frame.EvaluateExpression(expression, options)
     error = value.GetError()
+    seconds = time.perf_counter() - startTime
+    recordExpressionProfile(expression, seconds, error, caller, command)
+    traceExpression(expression, prefix, topLevel, arguments, value, seconds)
+    if gProfileEnabled and successOfSBError(error):
+        recordTimingHistory(caller, seconds)
 
     if printErrors and not successOfSBError(error):
         DPrint(error)
         DPrint(inspect.getframeinfo(inspect.currentframe().f_back))
 
+    if useCache and successOfSBError(error):
+        gExpressionCache[(expression, prefix, tuple(arguments))] = value
+
+    return value
+
+
+def prepareExpressionContext(frame: lldb.SBFrame, caller='', command='') -> None:
+    # Import modules once per process, the state is reset after the app is relaunched.
+    processUID = frame.GetThread().GetProcess().GetUniqueID()
+    if processUID not in gPreparedProcessUIDs:
+        gPreparedProcessUIDs.add(processUID)
+        op = lldb.SBExpressionOptions()
+        op.SetLanguage(lldb.eLanguageTypeObjC_plus_plus)
+        importExpression = '''
+            @import Foundation;
+            @import UIKit;
+            @import ObjectiveC;
+        '''
+        startTime = time.perf_counter()
+        importValue = frame.EvaluateExpression(importExpression, op)
+        seconds = time.perf_counter() - startTime
+        recordExpressionProfile(importExpression, seconds, importValue.GetError(), caller, command)
+        traceExpression(importExpression, '', False, [], importValue, seconds)
+
+    if processUID != gHelperLibraryProcessUID:
+        injectHelperLibrary()
+
+
+def expressionCallSite() -> Tuple[str, str]:
+    # caller: The first function outside this file. command: The outermost function of HMLLDB, usually the lldb command.
+    caller = ""
+    command = ""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(gCommandsDirectory):
+            location = f"{frame.f_globals.get('__name__', '')}.{frame.f_code.co_name}"
+            if len(caller) == 0 and frame.f_globals.get('__name__') != __name__:
+                caller = f"{location}:{frame.f_lineno}"
+            command = location
+        frame = frame.f_back
+    return caller, command
+
+
+def recordExpressionProfile(expression: str, seconds: float, error: lldb.SBError, caller: str, command: str) -> None:
+    if not gProfileEnabled:
+        return
+
+    if len(gProfileRecords) >= gProfileRecordsLimit:
+        del gProfileRecords[:gProfileRecordsLimit // 10]
+
+    gProfileRecords.append({
+        "timestamp": time.time(),
+        "command": command,
+        "caller": caller,
+        "seconds": seconds,
+        "size": len(expression),
+        "success": successOfSBError(error),
+        "error": "" if successOfSBError(error) else str(error.GetCString()).strip()
+    })
+
+
+def recordTimingHistory(caller: str, seconds: float) -> None:
+    history = gTimingHistory.setdefault(caller, [])
+    history.append(seconds)
+    if len(history) > gTimingHistoryLimit:
+        del history[0]
+
+
+def suggestedTimeout(caller: str) -> Optional[int]:
+    # Three times the slowest recent evaluation, in microseconds
+    history = gTimingHistory.get(caller, [])
+    if len(history) < 3:
+        return None
+    return max(int(max(history) * 3 * 1000000), 250000)
+
+
+def suggestedTimeoutClass(timeout: int) -> str:
+    for timeoutClass in [kTimeoutQuick, kTimeoutNormal]:
+        if timeout <= gTimeoutClasses[timeoutClass][0]:
+            return timeoutClass
+    return kTimeoutBulk
+
+
+def injectHelperLibrary() -> bool:
+    # The functions of HMExpressionLibrary stay in the process, later expressions can call them by name.
+    global gHelperLibraryProcessUID
+    previousProcessUID = gHelperLibraryProcessUID
+    gHelperLibraryProcessUID = lldb.debugger.GetSelectedTarget().GetProcess().GetUniqueID()
+
+    value = evaluateExpressionValue(HMExpressionLibrary.gLibrary, topLevel=True)
+    if not successOfSBError(value.GetError()):
+        gHelperLibraryProcessUID = previousProcessUID
+        return False
+
+    argumentsAddressValue = evaluateExpressionValue("(void *)HMArgs")
+    if judgeSBValueHasValue(argumentsAddressValue):
+        gArgumentsAddresses[gHelperLibraryProcessUID] = argumentsAddressValue.GetValueAsUnsigned()
+    return True
+
+
+def writeExpressionArguments(process: lldb.SBProcess, arguments: List[str]) -> bool:
+    # Write UTF-8 strings into memory allocated by lldb and point HMArgs at them, no expression is needed.
+    processUID = process.GetUniqueID()
+    argumentsAddress = gArgumentsAddresses.get(processUID)
+    if argumentsAddress is None:
+        DPrint("The helper library is not available, unable to pass expression arguments")
+        return False
+    if len(arguments) > kMaxArguments:
+        DPrint(f"Expressions accept at most {kMaxArguments} arguments")
+        return False
+
+    strings = b""
+    offsets = []
+    for argument in arguments:
+        offsets.append(len(strings))
+        strings += argument.encode("utf-8") + b"\0"
+
+    error = lldb.SBError()
+    arenaAddress, arenaSize = gArgumentsArenas.get(processUID, (0, 0))
+    if arenaSize < len(strings):
+        if arenaSize > 0:
+            process.DeallocateMemory(arenaAddress)
+        arenaSize = max(4096, 1 << (len(strings) - 1).bit_length())
+        arenaAddress = process.AllocateMemory(arenaSize, lldb.ePermissionsReadable | lldb.ePermissionsWritable, error)
+        traceEvent({"kind": "allocate", "size": arenaSize, "address": arenaAddress, "error": None if error.Success() else str(error)})
+        if not error.Success():
+            gArgumentsArenas.pop(processUID, None)
+            DPrint(error)
+            return False
+        gArgumentsArenas[processUID] = (arenaAddress, arenaSize)
+
+    process.WriteMemory(arenaAddress, strings, error)
+    if error.Success():
+        # iOS devices and simulators are 64-bit little-endian
+        pointers = struct.pack(f"<{len(offsets)}Q", *[arenaAddress + offset for offset in offsets])
+        process.WriteMemory(argumentsAddress, pointers, error)
+    if not error.Success():
+        DPrint(error)
+        return False
+    return True
+
+
+def evaluateExpressionDescription(expression: str, prefix='', printErrors=True, useCache=False, arguments: Optional[List[str]] = None) -> str:
+    value = evaluateExpressionValue(expression, prefix, printErrors, useCache, arguments=arguments)
+    cacheKey = (expression, prefix, tuple(arguments or []))
+    if useCache and cacheKey in gExpressionDescriptionCache:
+        return gExpressionDescriptionCache[cacheKey]
+
+    description = value.GetObjectDescription()
+    if useCache and description is not None and successOfSBError(value.GetError()):
+        gExpressionDescriptionCache[cacheKey] = description
+    return description
+
+
+def evaluateExpressionsDescription(expressions: List[str], prefix='', printErrors=True, arguments: Optional[List[str]] = None) -> List[Tuple[bool, str]]:
+    # Evaluate independent expressions in one JIT round trip.
+    # Each expression must be an Objective-C object, use @(...) to box scalars and ({ ... }) for multiple statements.
+    # arguments: Shared by all expressions
+    # Returns (success, description) for each expression.
+    if len(expressions) == 0:
+        return []
+
+    itemScripts = []
+    for expression in expressions:
+        itemScripts.append(f'''
+            @try {{
+                HMAppendBatchItem((id)({expression}));
+            }} @catch (NSException *exception) {{
+                HMAppendBatchException(exception);
+            }}
+        ''')
+
+    value = evaluateTransportValue("".join(itemScripts), prefix, printErrors=False, arguments=arguments)
+    items = transportRecordsOfValue(value)
+    if items is not None and len(items) == len(expressions):
+        return [(item[0] == "1", item[1:]) for item in items]
+
+    if value.GetError().GetError() != lldb.eExpressionParseError:
+        # The batch has run, maybe partly or until a timeout. The items may have side effects, e.g. deleting files,
+        # so they aren't evaluated again.
+        error = str(value.GetError()) if not successOfSBError(value.GetError()) else "Failed to read the results"
+        if printErrors:
+            DPrint(error)
+        return [(False, error) for _ in expressions]
+
+    # A single invalid expression breaks the whole batch, evaluate them one by one to locate the errors.
+    # Nothing has run, the batch failed to compile.
+    results = []
+    for expression in expressions:
+        itemValue = evaluateExpressionValue(expression, prefix, printErrors, arguments=arguments)
+        if successOfSBError(itemValue.GetError()):
+            results.append((True, itemValue.GetObjectDescription()))
+        else:
+            results.append((False, str(itemValue.GetError())))
+    return results
+
+
+def evaluateExpressionRecords(expression: str, prefix='', printErrors=True, timeoutClass=kTimeoutNormal, arguments: Optional[List[str]] = None) -> Optional[List[str]]:
+    # The expression writes UTF-8 records into a buffer of the helper library with
+    # HMTransportAppendUTF8, HMTransportAppendString or HMTransportAppendFields.
+    # The buffer is pulled with SBProcess.ReadMemory instead of running -description, and freed by the next transport.
+    value = evaluateTransportValue(expression, prefix, printErrors, timeoutClass, arguments)
+    return transportRecordsOfValue(value)
+
+
+def evaluateTransportValue(expression: str, prefix='', printErrors=True, timeoutClass=kTimeoutNormal, arguments: Optional[List[str]] = None) -> lldb.SBValue:
+    # The address of the transport buffer filled by the expression, see evaluateExpressionRecords
+    command_script = f'''
+        HMTransportReset();
+        {expression}
+        (void *)HMTransportFinish();
+    '''
+    return evaluateExpressionValue(command_script, prefix, printErrors, timeoutClass=timeoutClass, arguments=arguments)
+
+
+def transportRecordsOfValue(value: lldb.SBValue) -> Optional[List[str]]:
+    if not successOfSBError(value.GetError()) or value.GetValue() is None:
+        return None
+    return readTransportRecords(value.GetValueAsUnsigned())
+
+
+def readTransportRecords(address: int) -> Optional[List[str]]:
+    if address == 0:
+        # HMTransportFinish returns NULL if the buffer couldn't grow, the records would be incomplete
+        DPrint("The process is out of memory, failed to allocate the transport buffer")
+        return None
+
+    # iOS devices and simulators are little-endian
+    header = readMemory(address, 8)
+    if header is None:
+        return None
+    payloadLength = struct.unpack("<Q", header)[0]
+    if payloadLength == 0:
+        return []
+
+    payload = readMemory(address + 8, payloadLength)
+    if payload is None:
+        return None
+
+    records = []
+    offset = 0
+    while offset < payloadLength:
+        recordLength = struct.unpack_from("<I", payload, offset)[0]
+        offset += 4
+        records.append(payload[offset:offset + recordLength].decode("utf-8", errors="replace"))
+        offset += recordLength
+    return records
+
+
+def readMemory(address: int, size: int, printErrors=True) -> Optional[bytes]:
+    process = lldb.debugger.GetSelectedTarget().GetProcess()
+    error = lldb.SBError()
+    data = process.ReadMemory(address, size, error)
+    success = error.Success()
+    traceEvent({"kind": "read", "address": address, "size": size, "data": data.hex() if success else None, "error": None if success else str(error)})
+    if not success:
+        if printErrors:
+            DPrint(error)
+        return None
+    return data
+
+
+def traceEvent(event: Dict[str, Any]) -> None:
+    if gTraceEvents is not None:
+        gTraceEvents.append(event)
+
+
+def traceExpression(expression: str, prefix: str, topLevel: bool, arguments: List[str], value: lldb.SBValue, seconds: float) -> None:
+    # The description and the children are fetched now, the replay can't evaluate anything.
+    if gTraceEvents is None:
+        return
+
+    error = value.GetError()
+    description = None
+    children = []
+    if error.Success():
+        description = value.GetObjectDescription()
+        childCount = value.GetNumChildren()
+        if childCount <= 256:
+            children = [value.GetChildAtIndex(i).GetObjectDescription() for i in range(childCount)]
+
+    gTraceEvents.append({
+        "kind": "expression",
+        "expression": expression,
+        "prefix": prefix,
+        "topLevel": topLevel,
+        "arguments": arguments,
+        "seconds": seconds,
+        "value": value.GetValue(),
+        "description": description,
+        "children": children,
+        "error": None if error.Success() else str(error.GetCString()),
+        "errorCode": error.GetError()
+    })
+
+
+def splitRecordFields(record: str) -> List[str]:
+    return record.split(gFieldSeparator)
+
+
+def currentStopGeneration() -> Tuple[int, int]:
+    process = lldb.debugger.GetSelectedTarget().GetProcess()
+    # Expressions also stop the process, they should not invalidate the cache.
+    return process.GetUniqueID(), process.GetStopID(False)
+
+
+def lookUpExpressionCache(expression: str, prefix: str, arguments: List[str]) -> Optional[lldb.SBValue]:
+    global gExpressionCacheGeneration
+    global gExpressionCacheHits
+    global gExpressionCacheMisses
+
+    generation = currentStopGeneration()
+    if generation != gExpressionCacheGeneration:
+        # The process has resumed or relaunched since the last evaluation
+        clearExpressionCache()
+        gExpressionCacheGeneration = generation
+
+    value = gExpressionCache.get((expression, prefix, tuple(arguments)))
+    if value is None:
+        gExpressionCacheMisses += 1
+    else:
+        gExpressionCacheHits += 1
     return value
 
 
+def clearExpressionCache() -> None:
+    gExpressionCache.clear()
+    gExpressionDescriptionCache.clear()
+
+
+def expressionCacheStatistics() -> Tuple[int, int]:
+    return gExpressionCacheHits, gExpressionCacheMisses
+
+
 # Based on https://github.com/facebook/chisel/blob/master/fblldbbase.py
 def successOfSBError(err: lldb.SBError) -> bool:
     kNoResult = 0x1001  # 4097
@@ -113,113 +525,268 @@ def boolOfSBValue(val: lldb.SBValue) -> bool:
     return False
 
 
-def addOneShotBreakPointInIMP(imp: lldb.SBValue, callbackFunc: str, name: str) -> None:
+def addOneShotBreakPointInIMP(imp: int, callbackFunc: str, name: str) -> None:
+    # imp: Address of the IMP, e.g. from the status table of registerClassSpec
     target = lldb.debugger.GetSelectedTarget()
-    bp = target.BreakpointCreateByAddress(imp.GetValueAsUnsigned())
+    bp = target.BreakpointCreateByAddress(imp)
     bp.AddName(name)
     bp.SetOneShot(True)
     bp.SetScriptCallbackFunction(callbackFunc)
 
 
-def getClassPrefixes() -> Tuple[List[str], lldb.SBValue]:
+def deleteBreakPointsByName(name: str) -> None:
+    target = lldb.debugger.GetSelectedTarget()
+    breakpoints = lldb.SBBreakpointList(target)
+    if not target.FindBreakpointsByName(name, breakpoints):
+        return
+    for index in range(breakpoints.GetSize()):
+        target.BreakpointDelete(breakpoints.GetBreakpointAtIndex(index).GetID())
+
+
+def getClassPrefixes() -> List[str]:
     global gClassPrefixes
-    global gClassPrefixesValue
-
-    if judgeSBValueHasValue(gClassPrefixesValue):
-        return gClassPrefixes, gClassPrefixesValue
-
-    DPrint("Getting class prefixes when using this function for the first time")
-
-    command_script = '''
-        unsigned int classCount;
-        Class *classList = objc_copyClassList(&classCount);
-        NSMutableArray *clsPrefixes = [[NSMutableArray alloc] init];
-        for (int i = 0; i < classCount; i++) {
-            NSString *name = [[NSString alloc] initWithUTF8String:class_getName(classList[i])];
-            if ([name containsString:@"."]) {
-                NSRange range = [name rangeOfString:@"."];
-                NSString *prefix = [name substringToIndex:range.location];
-                if (![clsPrefixes containsObject:prefix] && ![prefix containsString:@"NSKVONotifying_"] && ![prefix containsString:@"_NSZombie_"]) {
-                    [clsPrefixes addObject:prefix];
-                }
-            }
-        }
-        free(classList);
-        clsPrefixes;
-    '''
+    global gClassPrefixesProcessUID
 
-    gClassPrefixesValue = evaluateExpressionValue(command_script)
-    for i in range(gClassPrefixesValue.GetNumChildren()):
-        prefixValue = gClassPrefixesValue.GetChildAtIndex(i)
-        gClassPrefixes.append(prefixValue.GetObjectDescription())
+    # HMClassPrefixes lives in the helper library, so it is collected again with the library in a new process
+    processUID = lldb.debugger.GetSelectedTarget().GetProcess().GetUniqueID()
+    if processUID == gClassPrefixesProcessUID and processUID == gHelperLibraryProcessUID:
+        return gClassPrefixes
 
-    return gClassPrefixes, gClassPrefixesValue
+    command_script = 'HMAppendClassPrefixes();'
 
+    records = evaluateExpressionRecords(command_script, timeoutClass=kTimeoutBulk)
+    if records is None or len(records) == 0:
+        return []
+
+    gClassPrefixes = [prefix for prefix in records[0].split("\n") if len(prefix) > 0]
+    gClassPrefixesProcessUID = processUID
+    return gClassPrefixes
 
-def existClass(className: str) -> bool:
-    command_script = f'''
-        Class cls = (Class)objc_lookUpClass("{className}");
-        BOOL exist = NO;
-        if (cls) {{
-            exist = YES;
-        }}
-        exist;
-    '''
 
-    value = evaluateExpressionValue(command_script)
+def existClass(className: str) -> bool:
+    value = evaluateExpressionValue('(BOOL)HMExistClass(HMArgs[0])', useCache=True, timeoutClass=kTimeoutQuick, arguments=[className])
     return boolOfSBValue(value)
 
 
 def allocateClass(className: str, superClassName: str) -> lldb.SBValue:
-    command_script = f'''
-        Class newCls = (Class)objc_lookUpClass("{className}");
-        if (!newCls) {{
-            Class superCls = (Class)objc_lookUpClass("{superClassName}");
-            newCls = (Class)objc_allocateClassPair(superCls, "{className}", 0);
-        }}
-        newCls;
-    '''
-
-    return evaluateExpressionValue(command_script)
+    clearExpressionCache()
+    return evaluateExpressionValue('(Class)HMAllocateClass(HMArgs[0], HMArgs[1])', arguments=[className, superClassName])
 
 
 def registerClass(classAddress: str) -> None:
-    command_script = f"(void)objc_registerClassPair(Class({classAddress}))"
-    evaluateExpressionValue(command_script)
+    global gClassRegistrations
+    gClassRegistrations += 1
+    clearExpressionCache()
+    evaluateExpressionValue("(void)objc_registerClassPair((Class)HMArgPointer(0))", arguments=[classAddress])
 
 
 def addIvar(classAddress: str, ivarName: str, types: str) -> bool:
-    command_script = f'''
-        const char * types = @encode({types});
-        NSUInteger size;
-        NSUInteger alingment;
-        NSGetSizeAndAlignment(types, &size, &alingment);
-        (BOOL)class_addIvar((Class){classAddress}, "{ivarName}", size, alingment, types);
-    '''
-
-    value = evaluateExpressionValue(command_script)
+    value = evaluateExpressionValue(f'(BOOL)HMAddIvar((Class)HMArgPointer(0), HMArgs[1], @encode({types}))', arguments=[classAddress, ivarName])
     return boolOfSBValue(value)
 
 
 def addClassMethod(className: str, selector: str, impAddress: str, types: str) -> None:
+    evaluateExpressionValue('(BOOL)HMAddClassMethod(HMArgs[0], HMArgs[1], (IMP)HMArgPointer(2), HMArgs[3])', arguments=[className, selector, impAddress, types])
+
+
+def addInstanceMethod(className: str, selector: str, impAddress: str, types: str) -> None:
+    evaluateExpressionValue('(BOOL)HMAddInstanceMethod(HMArgs[0], HMArgs[1], (IMP)HMArgPointer(2), HMArgs[3])', arguments=[className, selector, impAddress, types])
+
+
+def registerClassSpec(className: str, superClassName: str, ivars: List[Tuple[str, str]], methods: List[Tuple[str, str, str, str]], prefix='', lazyMethods: Optional[List[Tuple[str, str, str]]] = None) -> Optional[Dict[str, int]]:
+    # Build, register and fill the class in one expression instead of one expression per ivar, IMP and method.
+    # ivars: (name, type), e.g. ("_count", "int")
+    # methods: (sign, selector, type encoding, block script), "+" for a class method.
+    #   The block script declares the block and ends with "imp_implementationWithBlock(block);", see the make*IMP functions.
+    # lazyMethods: (selector, type encoding, block script) of instance methods that are compiled when the app first sends them,
+    #   see lazyMethodBreakPointHandler. A method first sent while an expression runs is compiled by its next call,
+    #   the breakpoints are ignored in expressions, see HMForwardLazyMethod.
+    # Return the status table: "class" -> address of the class, "-selector" or "+selector" -> IMP.
+    # None if the expression fails or the class can't be built, then nothing is registered.
+    global gClassRegistrations
+
+    lazyMethods = lazyMethods or []
+    if len(lazyMethods) > 0:
+        lazySelectors = [(selector, types) for selector, types, _ in lazyMethods]
+        methods = methods + [("+", "resolveInstanceMethod:", "B@::", makeResolveInstanceMethodIMP(className, lazySelectors)),
+                             ("-", "forwardInvocation:", "v@:@", makeForwardInvocationIMP(className, lazySelectors))]
+
+    ivarStatements = "\n".join(f'ivarsAdded = ivarsAdded && HMAddIvar(cls, "{name}", @encode({types}));' for name, types in ivars)
+    IMPStatements = []
+    methodStatements = []
+    for index, (sign, selector, types, blockScript) in enumerate(methods):
+        IMPStatement = assignedIMPScript(blockScript, f"imps[{index}]")
+        if IMPStatement is None:
+            DPrint(f"The block script of {sign}[{className} {selector}] doesn't end with imp_implementationWithBlock")
+            return None
+        IMPStatements.append(IMPStatement)
+        methodStatements.append(f'HMAddSpecMethod(cls, "{sign}", "{selector}", imps[{index}], "{types}");')
+    IMPScript = "\n".join(IMPStatements)
+    methodScript = "\n".join(methodStatements)
+    trapScript = ''
+    if len(lazyMethods) > 0:
+        trapScript = 'HMAppendLazyMethodTrap();'
+
     command_script = f'''
-        Class metaCls = (Class)objc_getMetaClass("{className}");
-        if (metaCls) {{
-            SEL selector = NSSelectorFromString([[NSString alloc] initWithUTF8String:"{selector}"]);
-            (BOOL)class_addMethod(metaCls, selector, (void (*)()){impAddress}, "{types}");
+        Class cls = HMAllocateSpecClass(HMArgs[0], HMArgs[1]);
+        if (cls != nil) {{
+            BOOL ivarsAdded = YES;
+            {ivarStatements}
+            if (!ivarsAdded) {{
+                objc_disposeClassPair(cls);
+                HMTransportAppendUTF8("failed");
+            }} else {{
+                HMRegisterSpecClass(cls);
+                {trapScript}
+
+                IMP imps[{max(len(methods), 1)}];
+                {IMPScript}
+                {methodScript}
+            }}
         }}
     '''
 
-    evaluateExpressionValue(command_script)
+    clearExpressionCache()
+    records = evaluateExpressionRecords(command_script, prefix, timeoutClass=kTimeoutBulk, arguments=[className, superClassName])
+    if records is None or len(records) == 0:
+        return None
+    if records[0] == "exists":
+        DPrint(f"{className} already exists")
+        return None
+    if records[0] == "failed":
+        DPrint(f"Failed to build {className}, the superclass {superClassName} or an ivar is invalid")
+        return None
+
+    gClassRegistrations += 1
+    _, classAddress, superclassAddress = splitRecordFields(records[0])
+    statusTable = {"class": int(classAddress, 16)}
+    processUID = lldb.debugger.GetSelectedTarget().GetProcess().GetUniqueID()
+    gRegisteredClasses.append((processUID, className, int(classAddress, 16), int(superclassAddress, 16)))
+    for record in records[1:]:
+        fields = splitRecordFields(record)
+        if fields[0] == "trap":
+            statusTable["trap"] = int(fields[1], 16)
+            continue
+        sign, selector, imp, added = fields
+        statusTable[f"{sign}{selector}"] = int(imp, 16)
+        if added != "1":
+            DPrint(f"Failed to add {sign}[{className} {selector}]")
+
+    for selector, types, blockScript in lazyMethods:
+        gLazyMethods[(className, selector)] = (types, blockScript, prefix)
+    if "trap" in statusTable:
+        addLazyMethodBreakPoint(statusTable["trap"])
+    return statusTable
+
+
+def assignedIMPScript(blockScript: str, variable: str) -> Optional[str]:
+    # Scope the block script and assign its trailing imp_implementationWithBlock to the variable
+    script, count = re.subn(r"imp_implementationWithBlock\((\w+)\);\s*$", rf"{variable} = imp_implementationWithBlock(\1);", blockScript.rstrip())
+    if count != 1:
+        return None
+    return f"{{\n{script}\n}}"
+
+
+def lazySelectorsLiteral(lazySelectors: List[Tuple[str, str]]) -> str:
+    # "\nselector\ttypes\nselector\ttypes\n" in the C string literal, see HMLazyMethodTypes
+    return "\\n" + "".join(f"{selector}\\t{types}\\n" for selector, types in lazySelectors)
+
+
+def makeResolveInstanceMethodIMP(className: str, lazySelectors: List[Tuple[str, str]]) -> str:
+    command_script = f'''
+        BOOL (^IMPBlock)(id, SEL) = ^BOOL(id classSelf, SEL sel) {{
+            if (HMResolveLazyMethod("{className}", sel, "{lazySelectorsLiteral(lazySelectors)}")) {{
+                return YES;
+            }}
+            Class cls = (Class)objc_lookUpClass("{className}");
+            struct objc_super superInfo = {{
+                .receiver = classSelf,
+                .super_class = (Class)class_getSuperclass((Class)object_getClass(cls))
+            }};
+            return ((BOOL (*)(struct objc_super *, SEL, SEL))objc_msgSendSuper)(&superInfo, @selector(resolveInstanceMethod:), sel);
+        }};
+
+        imp_implementationWithBlock(IMPBlock);
+    '''
+    return command_script
 
 
-def addInstanceMethod(className: str, selector: str, impAddress: str, types: str) -> None:
+def makeForwardInvocationIMP(className: str, lazySelectors: List[Tuple[str, str]]) -> str:
+    # The calls of the stubs added by HMResolveLazyMethod
+    command_script = f'''
+        void (^IMPBlock)(id, NSInvocation *) = ^(id instance, NSInvocation *invocation) {{
+            if (HMForwardLazyMethod("{className}", invocation, "{lazySelectorsLiteral(lazySelectors)}")) {{
+                return;
+            }}
+            Class cls = (Class)objc_lookUpClass("{className}");
+            struct objc_super superInfo = {{
+                .receiver = instance,
+                .super_class = (Class)class_getSuperclass(cls)
+            }};
+            ((void (*)(struct objc_super *, SEL, NSInvocation *))objc_msgSendSuper)(&superInfo, @selector(forwardInvocation:), invocation);
+        }};
+
+        imp_implementationWithBlock(IMPBlock);
+    '''
+    return command_script
+
+
+def addLazyMethodBreakPoint(trap: int) -> None:
+    # One breakpoint per process serves the lazy methods of all class specs
+    global gLazyMethodBreakpoint
+
+    target = lldb.debugger.GetSelectedTarget()
+    processUID = target.GetProcess().GetUniqueID()
+    breakpointProcessUID, breakpointAddress, breakpointID = gLazyMethodBreakpoint
+    if breakpointProcessUID == processUID and breakpointAddress == trap:
+        return
+    if breakpointID != 0:
+        # HMLazyMethodTrap of the previous process
+        target.BreakpointDelete(breakpointID)
+
+    bp = target.BreakpointCreateByAddress(trap)
+    bp.AddName("HMLLDB_LazyMethod_Breakpoint")
+    bp.SetScriptCallbackFunction("HMLLDBHelpers.lazyMethodBreakPointHandler")
+    gLazyMethodBreakpoint = (processUID, trap, bp.GetID())
+
+
+def lazyMethodBreakPointHandler(frame, bp_loc, internal_dict) -> bool:
+    records = evaluateExpressionRecords("HMTransportAppendFields(2, HMLazyMethodClassName, HMLazyMethodSelector);")
+    if records is not None and len(records) == 1:
+        className, selector = splitRecordFields(records[0])
+        addLazyMethod(className, selector)
+    processContinue()
+    return True
+
+
+def addLazyMethod(className: str, selector: str) -> bool:
+    # Compile the IMP of a lazy method and add it, HMResolveLazyMethod returns HMLazyMethodResolved to the runtime.
+    # The IMP replaces the stub of HMResolveLazyMethod if the method has been sent while an expression ran.
+    lazyMethod = gLazyMethods.get((className, selector))
+    if lazyMethod is None:
+        DPrint(f"-[{className} {selector}] isn't a lazy method of HMLLDB")
+        return False
+    types, blockScript, prefix = lazyMethod
+
     command_script = f'''
-        Class cls = (Class)objc_lookUpClass("{className}");
-        if (cls) {{
-            SEL selector = NSSelectorFromString([[NSString alloc] initWithUTF8String:"{selector}"]);
-            (BOOL)class_addMethod(cls, selector, (void (*)()){impAddress}, "{types}");
+        IMP imp = NULL;
+        {assignedIMPScript(blockScript, "imp")}
+        HMLazyMethodResolved = imp != NULL;
+        if (HMLazyMethodResolved) {{
+            class_replaceMethod((Class)objc_lookUpClass(HMArgs[0]), sel_registerName(HMArgs[1]), imp, HMArgs[2]);
         }}
+        HMTransportAppendUTF8(HMLazyMethodResolved ? "1" : "0");
     '''
 
-    evaluateExpressionValue(command_script)
+    clearExpressionCache()
+    records = evaluateExpressionRecords(command_script, prefix, arguments=[className, selector, types])
+    if records is None or records != ["1"]:
+        DPrint(f"Failed to add -[{className} {selector}]")
+        return False
+    return True
+
+
+def lookUpClassScript(argumentIndex=0) -> str:
+    # Objective-C statement that declares "inputClass" whose name is HMArgs[argumentIndex].
+    # The Swift module prefix of the name can be omitted, the prefixes are collected in the process on the first miss.
+    return f'Class inputClass = HMLookUpClass(HMArgs[{argumentIndex}]);'
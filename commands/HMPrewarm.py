@@ -0,0 +1,58 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+import HMLLDBHelpers as HM
+
+
+def __lldb_init_module(debugger, internal_dict):
+    debugger.HandleCommand('command script add -f HMPrewarm.prewarm prewarm -h "Prepare the expression context of the current process ahead of time."')
+
+
+def prewarm(debugger, command, exe_ctx, result, internal_dict):
+    """
+    Syntax:
+        prewarm
+
+    Examples:
+        (lldb) prewarm
+        (lldb) target stop-hook add -o prewarm
+
+    Summary:
+        Import Foundation/UIKit/ObjectiveC modules and inject the helper library into the current process.
+        The first HMLLDB command of each process does this, and it may take a few seconds.
+        Add it to a stop hook so that the work is done as soon as the process stops after launching or attaching.
+        It does nothing if the process has already been prepared.
+
+    This command is implemented in HMPrewarm.py
+    """
+
+    process = debugger.GetSelectedTarget().GetProcess()
+    if not process.IsValid() or process.GetState() != lldb.eStateStopped:
+        HM.DPrint("The process must be stopped")
+        return
+
+    if process.GetUniqueID() in HM.gPreparedProcessUIDs and process.GetUniqueID() == HM.gHelperLibraryProcessUID:
+        return
+
+    frame = process.GetSelectedThread().GetSelectedFrame()
+    HM.prepareExpressionContext(frame, *HM.expressionCallSite())
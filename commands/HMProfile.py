@@ -0,0 +1,220 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+from typing import Any, Dict, List
+import csv
+import json
+import optparse
+import shlex
+import HMLLDBHelpers as HM
+
+
+def __lldb_init_module(debugger, internal_dict):
+    debugger.HandleCommand('command script add -f HMProfile.profile hmprofile -h "Print the time spent on expression evaluation."')
+
+
+gHistogramBounds = [0.01, 0.05, 0.1, 0.5, 1, 5]  # seconds
+
+
+def profile(debugger, command, exe_ctx, result, internal_dict):
+    """
+    Syntax:
+        hmprofile [--site] [--output <path>]
+        hmprofile [--timeouts]
+        hmprofile [--clear/--enable/--disable]
+
+    Options:
+        --site/-s; Group by call site instead of command
+        --timeouts/-t; Print the suggested timeout of each call site based on its timing history
+        --output/-o; Dump the raw records to a file, the format(json/csv) depends on the extension
+        --clear/-c; Remove all records
+        --enable/-e; Record every expression evaluation and the timing history of the call sites
+        --disable/-d; Stop recording(default)
+
+    Examples:
+        (lldb) hmprofile -e
+        (lldb) hmprofile
+        (lldb) hmprofile -s
+        (lldb) hmprofile -t
+        (lldb) hmprofile -o /tmp/hmprofile.csv
+        (lldb) hmprofile -c
+
+    Notice:
+        Recording is disabled by default, the timeouts of the bulk expressions only grow with the timing history while it's enabled.
+
+    This command is implemented in HMProfile.py
+    """
+
+    command_args = shlex.split(command)
+    parser = generate_option_parser()
+    try:
+        # options: optparse.Values
+        # args: list
+        (options, args) = parser.parse_args(command_args)
+    except:
+        result.SetError(parser.usage)
+        return
+
+    if options.enable:
+        HM.gProfileEnabled = True
+        HM.DPrint("Profiling enabled")
+        return
+
+    if options.disable:
+        HM.gProfileEnabled = False
+        HM.DPrint("Profiling disabled")
+        return
+
+    if options.clear:
+        HM.gProfileRecords.clear()
+        HM.DPrint("Profile records cleared")
+        return
+
+    if options.timeouts:
+        printSuggestedTimeouts()
+        return
+
+    records = list(HM.gProfileRecords)
+    if options.output:
+        dumpRecords(records, options.output)
+        return
+
+    if len(records) == 0:
+        if HM.gProfileEnabled:
+            HM.DPrint("No expression has been evaluated")
+        else:
+            HM.DPrint("Profiling is disabled, enable it with \"hmprofile --enable\"")
+        return
+
+    key = "caller" if options.site else "command"
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record[key] or "-", []).append(record)
+
+    totalSeconds = sum(record["seconds"] for record in records)
+    hits, misses = HM.expressionCacheStatistics()
+    report = f"Expressions: {len(records)}  Total: {totalSeconds * 1000:.0f}ms  Cache hits: {hits}  Cache misses: {misses}\n"
+    report += "Histogram buckets: " + "  ".join(bucketTitles()) + "\n"
+    for name, items in sorted(groups.items(), key=lambda item: -sum(record["seconds"] for record in item[1])):
+        seconds = [record["seconds"] for record in items]
+        errorCount = len([record for record in items if not record["success"]])
+        report += f"{name}\n"
+        report += f"\tcount: {len(items)}  total: {sum(seconds) * 1000:.0f}ms  mean: {sum(seconds) / len(seconds) * 1000:.1f}ms  max: {max(seconds) * 1000:.1f}ms  size: {sum(record['size'] for record in items)}  errors: {errorCount}\n"
+        report += "\thistogram: " + "  ".join(str(count) for count in histogram(seconds)) + "\n"
+
+    HM.DPrint(report)
+
+
+def printSuggestedTimeouts() -> None:
+    if len(HM.gTimingHistory) == 0:
+        HM.DPrint("No timing history" if HM.gProfileEnabled else "Profiling is disabled, enable it with \"hmprofile --enable\"")
+        return
+
+    report = "Suggested timeouts:\n"
+    for caller, history in sorted(HM.gTimingHistory.items()):
+        timeout = HM.suggestedTimeout(caller)
+        if timeout is None:
+            suggestion = "not enough samples"
+        else:
+            suggestion = f"{timeout / 1000:.0f}ms ({HM.suggestedTimeoutClass(timeout)})"
+        report += f"{caller}\n\tsamples: {len(history)}  max: {max(history) * 1000:.1f}ms  suggestion: {suggestion}\n"
+    HM.DPrint(report)
+
+
+def bucketTitles() -> List[str]:
+    titles = [f"<{formatBound(bound)}" for bound in gHistogramBounds]
+    titles.append(f">={formatBound(gHistogramBounds[-1])}")
+    return titles
+
+
+def formatBound(bound: float) -> str:
+    return f"{bound * 1000:.0f}ms" if bound < 1 else f"{bound:.0f}s"
+
+
+def histogram(seconds: List[float]) -> List[int]:
+    counts = [0] * (len(gHistogramBounds) + 1)
+    for second in seconds:
+        index = 0
+        while index < len(gHistogramBounds) and second >= gHistogramBounds[index]:
+            index += 1
+        counts[index] += 1
+    return counts
+
+
+def dumpRecords(records: List[Dict[str, Any]], path: str) -> None:
+    try:
+        with open(path, "w", newline="") as file:
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(file, fieldnames=["timestamp", "command", "caller", "seconds", "size", "success", "error"])
+                writer.writeheader()
+                writer.writerows(records)
+            else:
+                json.dump(records, file, indent=2)
+    except OSError as error:
+        HM.DPrint(f"Failed to write {path}: {error}")
+        return
+
+    HM.DPrint(f"{len(records)} records have been written to {path}")
+
+
+def generate_option_parser() -> optparse.OptionParser:
+    usage = "usage: hmprofile [--site] [--output <path>] [--timeouts] [--clear] [--enable] [--disable]"
+    parser = optparse.OptionParser(usage=usage, prog="hmprofile")
+
+    parser.add_option("-t", "--timeouts",
+                      action="store_true",
+                      default=False,
+                      dest="timeouts",
+                      help="Print the suggested timeout of each call site based on its timing history")
+
+    parser.add_option("-s", "--site",
+                      action="store_true",
+                      default=False,
+                      dest="site",
+                      help="Group by call site instead of command")
+
+    parser.add_option("-o", "--output",
+                      action="store",
+                      default=None,
+                      dest="output",
+                      help="Dump the raw records to a file, the format(json/csv) depends on the extension")
+
+    parser.add_option("-c", "--clear",
+                      action="store_true",
+                      default=False,
+                      dest="clear",
+                      help="Remove all records")
+
+    parser.add_option("-e", "--enable",
+                      action="store_true",
+                      default=False,
+                      dest="enable",
+                      help="Record every expression evaluation")
+
+    parser.add_option("-d", "--disable",
+                      action="store_true",
+                      default=False,
+                      dest="disable",
+                      help="Stop recording")
+
+    return parser
@@ -0,0 +1,200 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+from typing import Dict, List, Optional, Set, Tuple
+import HMLLDBHelpers as HM
+import HMClassIndex
+
+
+# Protocols of the classes of HMClassIndex, dumped lazily per image and queried in Python.
+# An image is dumped by the first query that needs its classes. The first dump also lists all protocols and
+# the protocols they inherit, later dumps only add the protocols their classes adopt, e.g. after a dlopen.
+# The classes created at run time have no image, they are dumped by address.
+# Later queries answer from Python without evaluating expressions.
+# The index is cleared with the class index it belongs to.
+kClassBatchSize = 10000
+
+gProtocolIndexGeneration: Optional[int] = None      # HMClassIndex.gClassIndexGeneration of the index
+gClassProtocols: Dict[int, List[str]] = {}          # class -> names of the protocols it adopts, for the classes of the dumped images
+gProtocolParents: Dict[str, List[str]] = {}         # protocol -> names of the protocols it inherits
+gProtocolChildren: Dict[str, List[str]] = {}        # protocol -> names of the protocols that inherit it
+gProtocolAncestors: Dict[str, Set[str]] = {}        # protocol -> the protocol and all protocols it inherits, memoized
+
+
+def loadProtocols(classes: Optional[List[int]] = None) -> bool:
+    # Dump the images of the classes that aren't in the index yet, all images if classes is None.
+    # The class index must be loaded. False if a dump fails.
+    global gProtocolIndexGeneration
+    if gProtocolIndexGeneration != HMClassIndex.gClassIndexGeneration:
+        clearProtocolIndex()
+        gProtocolIndexGeneration = HMClassIndex.gClassIndexGeneration
+
+    # Number of classes to dump of each image
+    imageClassCounts: Dict[int, int] = {}
+    for cls in (HMClassIndex.gClassNames if classes is None else classes):
+        if cls not in gClassProtocols and cls in HMClassIndex.gClassImages:
+            imageIndex = HMClassIndex.gClassImages[cls]
+            imageClassCounts[imageIndex] = imageClassCounts.get(imageIndex, 0) + 1
+    if classes is not None:
+        # The other classes of the images come with them
+        imageClassCounts = {imageIndex: 0 for imageIndex in imageClassCounts}
+        for cls, imageIndex in HMClassIndex.gClassImages.items():
+            if imageIndex in imageClassCounts:
+                imageClassCounts[imageIndex] += 1
+    if len(imageClassCounts) == 0 and len(gProtocolParents) > 0:
+        return True
+
+    # Images in batches of about kClassBatchSize classes
+    batches: List[List[int]] = [[]]
+    batchClassCount = 0
+    for imageIndex, classCount in imageClassCounts.items():
+        if batchClassCount > 0 and batchClassCount + classCount > kClassBatchSize:
+            batches.append([])
+            batchClassCount = 0
+        batches[-1].append(imageIndex)
+        batchClassCount += classCount
+
+    # All protocols are dumped once, later batches only add the protocols their classes adopt
+    for i, imageIndexes in enumerate(batches):
+        if not dumpProtocolBatch(imageIndexes, i == 0 and len(gProtocolParents) == 0):
+            return False
+        if i + 1 < len(batches) and HM.interruptRequested():
+            HM.DPrint("Interrupted, the dumped images are kept in the protocol index.")
+            return False
+    return True
+
+
+def dumpProtocolBatch(imageIndexes: List[int], dumpProtocols: bool) -> bool:
+    # "class address<0x1f>protocols" records of the classes of the images in HMArgs[1] and of the classes
+    # in HMArgs[2] that adopt protocols, then "protocol<0x1f>name<0x1f>inherited protocols" records
+    # of all protocols if HMArgs[0] is "1", otherwise of the protocols these classes adopt and inherit.
+    # Protocol names are separated by commas.
+    command_script = 'HMAppendProtocols(HMArgs[0], HMArgString(1), HMArgString(2));'
+
+    imagePaths = []
+    runtimeImageIndexes = set()
+    for imageIndex in imageIndexes:
+        if HMClassIndex.gImageNames[imageIndex] == HMClassIndex.kRuntimeImage:
+            runtimeImageIndexes.add(imageIndex)
+        else:
+            imagePaths.append(HMClassIndex.gImageNames[imageIndex])
+    classAddresses = [hex(cls) for cls, imageIndex in HMClassIndex.gClassImages.items() if imageIndex in runtimeImageIndexes and cls not in gClassProtocols]
+    arguments = ["1" if dumpProtocols else "0", "\n".join(imagePaths), "\n".join(classAddresses)]
+    records = HM.evaluateExpressionRecords(command_script, timeoutClass=HM.kTimeoutBulk, arguments=arguments)
+    if records is None:
+        return False
+
+    if dumpProtocols:
+        gProtocolParents.clear()
+        gProtocolChildren.clear()
+        gProtocolAncestors.clear()
+    for record in records:
+        fields = HM.splitRecordFields(record)
+        if len(fields) == 3:
+            if fields[1] in gProtocolParents:
+                # Adopted by a class of an earlier batch
+                continue
+            parents = [parent for parent in fields[2].split(",") if len(parent) > 0]
+            gProtocolParents[fields[1]] = parents
+            for parent in parents:
+                gProtocolChildren.setdefault(parent, []).append(fields[1])
+        else:
+            gClassProtocols[int(fields[0], 16)] = fields[1].split(",")
+
+    # The classes without protocols are dumped too
+    dumpedImages = set(imageIndexes)
+    for cls, imageIndex in HMClassIndex.gClassImages.items():
+        if imageIndex in dumpedImages and cls not in gClassProtocols:
+            gClassProtocols[cls] = []
+    return True
+
+
+def clearProtocolIndex() -> None:
+    global gProtocolIndexGeneration
+    gProtocolIndexGeneration = None
+    gClassProtocols.clear()
+    gProtocolParents.clear()
+    gProtocolChildren.clear()
+    gProtocolAncestors.clear()
+
+
+def lookUpProtocol(protocolName: str) -> Optional[str]:
+    # The Swift module prefix of the name can be omitted, e.g. "MyDataSource" of "MyApp.MyDataSource"
+    if protocolName in gProtocolParents:
+        return protocolName
+    suffix = f".{protocolName}"
+    for name in gProtocolParents:
+        if name.endswith(suffix):
+            return name
+    return None
+
+
+def protocolAncestors(protocolName: str) -> Set[str]:
+    # The protocol and all protocols it inherits
+    ancestors = gProtocolAncestors.get(protocolName)
+    if ancestors is None:
+        ancestors = {protocolName}
+        stack = list(gProtocolParents.get(protocolName, []))
+        while len(stack) > 0:
+            parent = stack.pop()
+            if parent not in ancestors:
+                ancestors.add(parent)
+                stack.extend(gProtocolParents.get(parent, []))
+        gProtocolAncestors[protocolName] = ancestors
+    return ancestors
+
+
+def protocolTree(protocolName: str, children=True) -> List[Tuple[str, int]]:
+    # (protocol, depth) in depth first order, the protocols that inherit protocolName if children is True,
+    # otherwise the protocols it inherits
+    relatives = gProtocolChildren if children else gProtocolParents
+    result = []
+    visited = {protocolName}
+    stack = [(relative, 1) for relative in reversed(relatives.get(protocolName, []))]
+    while len(stack) > 0:
+        relative, depth = stack.pop()
+        result.append((relative, depth))
+        if relative not in visited:
+            visited.add(relative)
+            stack.extend((child, depth + 1) for child in reversed(relatives.get(relative, [])))
+    return result
+
+
+def adoptingClasses(protocolName: str) -> List[Tuple[int, str]]:
+    # (class, adopted protocol) of the dumped classes that adopt the protocol or a protocol inheriting it
+    result = []
+    for cls, protocols in gClassProtocols.items():
+        for adoptedProtocol in protocols:
+            if protocolName in protocolAncestors(adoptedProtocol):
+                result.append((cls, adoptedProtocol))
+                break
+    return result
+
+
+def conformance(cls: int, protocolName: str) -> Optional[Tuple[int, str]]:
+    # (class, adopted protocol) of the class or superclass that makes cls conform to the protocol, None if cls doesn't
+    for chainClass in HMClassIndex.superclassChain(cls):
+        for adoptedProtocol in gClassProtocols.get(chainClass, []):
+            if protocolName in protocolAncestors(adoptedProtocol):
+                return chainClass, adoptedProtocol
+    return None
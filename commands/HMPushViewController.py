@@ -20,12 +20,16 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Optional, List
+from typing import Optional
 import lldb
 import optparse
 import shlex
 import HMLLDBHelpers as HM
 import HMLLDBClassInfo
+import HMClassResolver
+
+
+gMakeVCExpression = "(UIViewController *)HMNewObject(inputClass)"
 
 
 def __lldb_init_module(debugger, internal_dict):
@@ -91,27 +95,22 @@ def push(debugger, command, exe_ctx, result, internal_dict):
         instanceExpr = instanceExpr.rstrip()
         VCObject = HM.evaluateExpressionValue(instanceExpr).GetValue()
     else:
-        makeVCExpression = f"(UIViewController *)[[NSClassFromString(@\"{args[0]}\") alloc] init]"
-        VCObject = HM.evaluateExpressionValue(makeVCExpression).GetValue()     # address
+        # The Swift module prefix can be omitted, the class is looked up in the same expression unless it's cached
+        VCObject = None
+        if not HMClassResolver.isUnresolved(args[0]):
+            statement, argument = HMClassResolver.classStatement(args[0])
+            VCValue = HM.evaluateExpressionValue(f"{statement}\n{gMakeVCExpression}", arguments=[argument])
+            VCObject = VCValue.GetValue()     # address
+            if HM.successOfSBError(VCValue.GetError()) and VCValue.GetValueAsUnsigned() == 0:
+                HMClassResolver.addUnresolvedClass(args[0])
+        if HMClassResolver.isUnresolved(args[0]):
+            HM.DPrint(f"Can't find {args[0]} class")
+            VCObject = None
 
     if verifyObjIsKindOfClass(VCObject, "UIViewController"):
         pushExpression = f"(void)[{navigationVC} pushViewController:(id){VCObject} animated:YES]"
-        debugger.HandleCommand('expression -l objc -O -- ' + pushExpression)
+        HM.handleCommand('expression -l objc -O -- ' + pushExpression)
         state = True
-    elif not options.instance:
-        classPrefixes = HM.getClassPrefixes()[0]
-        for prefix in classPrefixes:  # for Swift file
-            className = f"{prefix}.{args[0]}"
-            if not HM.existClass(className):
-                continue
-
-            makeVCExpression = f"(UIViewController *)[[NSClassFromString(@\"{className}\") alloc] init]"
-            VCObject = HM.evaluateExpressionValue(makeVCExpression).GetValue()  # address
-            if verifyObjIsKindOfClass(VCObject, "UIViewController"):
-                pushExpression = f"(void)[{navigationVC} pushViewController:(id){VCObject} animated:YES]"
-                debugger.HandleCommand('expression -l objc -O -- ' + pushExpression)
-                state = True
-                break
 
     HM.DPrint("push succeed" if state else "push failed")
     if state:
@@ -127,17 +126,25 @@ def verifyObjIsKindOfClass(objAddress: str, className: str) -> bool:
 
 
 def getNavigationVC() -> Optional[str]:
-    rootViewController = HM.evaluateExpressionValue("[[[UIApplication sharedApplication] keyWindow] rootViewController]").GetValue()
-    if verifyObjIsKindOfClass(rootViewController, "UINavigationController"):
-        return rootViewController
-    elif verifyObjIsKindOfClass(rootViewController, "UITabBarController"):
-        selectedViewController = HM.evaluateExpressionValue(f"[(UITabBarController *){rootViewController} selectedViewController]").GetValue()
-        if verifyObjIsKindOfClass(selectedViewController, "UINavigationController"):
-            return selectedViewController
-        else:
-            return None
-    else:
+    # Walk the rootViewController chain in one JIT round trip
+    command_script = '''
+        UIViewController *rootViewController = [[[UIApplication sharedApplication] keyWindow] rootViewController];
+        UINavigationController *navigationVC = nil;
+        if ([rootViewController isKindOfClass:[UINavigationController class]]) {
+            navigationVC = (UINavigationController *)rootViewController;
+        } else if ([rootViewController isKindOfClass:[UITabBarController class]]) {
+            UIViewController *selectedViewController = [(UITabBarController *)rootViewController selectedViewController];
+            if ([selectedViewController isKindOfClass:[UINavigationController class]]) {
+                navigationVC = (UINavigationController *)selectedViewController;
+            }
+        }
+        navigationVC;
+    '''
+
+    navigationVCValue = HM.evaluateExpressionValue(command_script)
+    if not HM.judgeSBValueHasValue(navigationVCValue):
         return None
+    return navigationVCValue.GetValue()
 
 
 def generate_option_parser() -> optparse.OptionParser:
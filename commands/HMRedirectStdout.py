@@ -69,13 +69,13 @@ def redirect(debugger, command, exe_ctx, result, internal_dict):
         mode = "a+"
 
     if stream == "stdout" or stream == "stderr":
-        redirectValue = HM.evaluateExpressionValue(f"freopen(\"{path}\", \"{mode}\", {stream})")
+        redirectValue = HM.evaluateExpressionValue(f"freopen(HMArgs[0], HMArgs[1], {stream})", arguments=[path, mode])
         logRedirectResult(redirectValue, stream)
 
     elif stream == "both":
-        stdoutValue = HM.evaluateExpressionValue(f"freopen(\"{path}\", \"{mode}\", stdout)")
+        stdoutValue = HM.evaluateExpressionValue("freopen(HMArgs[0], HMArgs[1], stdout)", arguments=[path, mode])
         logRedirectResult(stdoutValue, "stdout")
-        stderrValue = HM.evaluateExpressionValue(f"freopen(\"{path}\", \"{mode}\", stderr)")
+        stderrValue = HM.evaluateExpressionValue("freopen(HMArgs[0], HMArgs[1], stderr)", arguments=[path, mode])
         logRedirectResult(stderrValue, "stderr")
 
     else:
@@ -0,0 +1,347 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+import bisect
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple
+import HMLLDBHelpers as HM
+import HMDiskCache
+
+
+# Index of the methods of all classes, dumped by expressions in batches of classes at each stop and queried in Python.
+# Selectors are found through the trigrams of their lowercase names, a query only compares the selectors
+# that contain the rarest trigram of the keyword.
+# A build stopped by a batch handler or by an interrupt is continued by the next load at the same stop.
+# The base of the index is the methods of the classes that have an image. A complete base is saved by HMDiskCache
+# with the UUIDs of all loaded modules, categories add methods to the classes of other images, so any changed image
+# needs a new scan. While the modules don't change, later stops keep the base in memory and only dump the methods
+# of the classes created at run time again, they follow the base.
+kClassBatchSize = 2000
+
+gSelectorIndexGeneration: Optional[Tuple[int, int, int]] = None  # (process unique ID, stop ID, class registrations)
+gSelectorIndexNextClass: Optional[int] = None   # Index of the next class in objc_copyClassList, None if the index is complete
+gSelectorIndexBase: Optional[Tuple[int, str, int, int, int]] = None  # (process unique ID, cache key, selectors, classes, methods) of the base
+gSelectors: List[str] = []                      # Selector names, a selector ID is an index of this list
+gLowercaseSelectors: List[str] = []
+gSelectorIDs: Dict[str, int] = {}               # selector name -> selector ID
+gSelectorMethods: List[List[int]] = []          # selector ID -> method IDs
+gTrigrams: Dict[str, List[int]] = {}            # trigram -> selector IDs, ascending
+# Methods, a method ID is an index of these lists. Methods are in the order of objc_copyClassList, the classes
+# created at run time last, the instance methods of a class before its class methods.
+gMethodClasses: List[int] = []                  # method ID -> index of gClassNames
+gMethodSigns: List[str] = []                    # "-" or "+"
+gMethodSelectors: List[int] = []                # method ID -> selector ID
+gMethodTypeEncodings: List[str] = []
+gMethodIMPs: List[int] = []
+gClassNames: List[str] = []
+gClassAddresses: List[int] = []
+
+
+def selectorIndexGeneration() -> Tuple[int, int, int]:
+    stopGeneration = HM.currentStopGeneration()
+    return stopGeneration[0], stopGeneration[1], HM.gClassRegistrations
+
+
+def loadSelectorIndex(refresh=False, batchHandler: Optional[Callable[[int, int], bool]] = None) -> bool:
+    # Build the index once per stop, or again if refresh is True.
+    # batchHandler: Called with the range of method IDs already in the index, then with the range of each new batch.
+    # Return False from it to stop the build, loadSelectorIndex returns True and the index stays incomplete.
+    # Without batchHandler, True means the index is complete.
+    global gSelectorIndexGeneration
+    global gSelectorIndexNextClass
+    generation = selectorIndexGeneration()
+    if refresh or generation != gSelectorIndexGeneration:
+        if not refresh and reuseSelectorIndexBase():
+            gSelectorIndexGeneration = generation
+            if not addRuntimeClassMethods():
+                clearSelectorIndex()
+                return False
+        else:
+            clearSelectorIndex()
+            gSelectorIndexGeneration = generation
+            if not refresh and loadCachedSelectorIndex():
+                if not addRuntimeClassMethods():
+                    clearSelectorIndex()
+                    return False
+            else:
+                HM.DPrint("Building the selector index...")
+                gSelectorIndexNextClass = 0
+    if len(gMethodClasses) > 0 and batchHandler is not None and not batchHandler(0, len(gMethodClasses)):
+        return True
+
+    while gSelectorIndexNextClass is not None:
+        start = len(gMethodClasses)
+        runtimeClassRecords = dumpMethodBatch()
+        if runtimeClassRecords is None:
+            clearSelectorIndex()
+            return False
+        if gSelectorIndexNextClass is None:
+            completeSelectorIndexBase()
+            addMethodRecords(runtimeClassRecords)
+        if batchHandler is not None and not batchHandler(start, len(gMethodClasses)):
+            return True
+        if gSelectorIndexNextClass is not None and HM.interruptRequested():
+            HM.DPrint(f"Interrupted, the selector index has the methods of {len(gClassNames)} classes. It will be continued at the same stop.")
+            return False
+    return True
+
+
+def dumpMethodBatch(runtimeClassesOnly=False) -> Optional[List[str]]:
+    # Add the methods of the classes [HMArgs[0], HMArgs[0] + HMArgs[1]) of objc_copyClassList that have an image.
+    # The batch that reaches the end of the list, or any batch if HMArgs[2] is "1", ends with a "runtime" record
+    # followed by the classes created at run time, they are returned to the caller. None if the expression fails.
+    # The first record is the number of classes, then "name<0x1f>address" records of the classes,
+    # each followed by the "+/-<0x1f>selector<0x1f>type encoding<0x1f>IMP" records of its methods.
+    global gSelectorIndexNextClass
+    command_script = 'HMAppendMethodBatch(HMArgs[0], HMArgs[1], HMArgs[2]);'
+
+    start = gSelectorIndexNextClass or 0
+    arguments = [str(start), str(kClassBatchSize), "1" if runtimeClassesOnly else "0"]
+    records = HM.evaluateExpressionRecords(command_script, timeoutClass=HM.kTimeoutBulk, arguments=arguments)
+    if records is None or len(records) == 0:
+        return None
+
+    runtimeStart = records.index("runtime") if "runtime" in records else len(records)
+    if not runtimeClassesOnly:
+        addMethodRecords(records[1:runtimeStart])
+        end = start + kClassBatchSize
+        gSelectorIndexNextClass = end if end < int(records[0]) else None
+    return records[runtimeStart + 1:]
+
+
+def addMethodRecords(records: List[str]) -> None:
+    # Hundreds of thousands of records, the lookups are hoisted out of the loop
+    splitRecordFields = HM.splitRecordFields
+    selectorIDs = gSelectorIDs
+    selectorMethods = gSelectorMethods
+    classIndex = len(gClassNames) - 1
+    methodID = len(gMethodClasses)
+    for record in records:
+        fields = splitRecordFields(record)
+        if len(fields) == 2:
+            gClassNames.append(fields[0])
+            gClassAddresses.append(int(fields[1], 16))
+            classIndex += 1
+            continue
+
+        sign, selectorName, typeEncoding, imp = fields
+        selectorID = selectorIDs.get(selectorName)
+        if selectorID is None:
+            selectorID = addSelector(selectorName)
+        selectorMethods[selectorID].append(methodID)
+        methodID += 1
+        gMethodClasses.append(classIndex)
+        gMethodSigns.append(sign)
+        gMethodSelectors.append(selectorID)
+        gMethodTypeEncodings.append(typeEncoding)
+        gMethodIMPs.append(int(imp, 16))
+
+
+def addRuntimeClassMethods() -> bool:
+    # Add the methods of the classes created at run time to the base of the index
+    runtimeClassRecords = dumpMethodBatch(runtimeClassesOnly=True)
+    if runtimeClassRecords is None:
+        return False
+    addMethodRecords(runtimeClassRecords)
+    return True
+
+
+def selectorIndexCacheKey(modules: List[Tuple[lldb.SBModule, str, int]]) -> str:
+    return hashlib.sha1("\n".join(sorted(uuid for _, uuid, _ in modules)).encode("utf-8")).hexdigest()
+
+
+def completeSelectorIndexBase() -> None:
+    # The methods of the classes that have an image are complete, save them and keep them for the next stops
+    global gSelectorIndexBase
+    gSelectorIndexBase = None
+    if HMDiskCache.gCacheDirectory is None:
+        return
+    target = lldb.debugger.GetSelectedTarget()
+    modules = HMDiskCache.loadedModules(target)
+    key = selectorIndexCacheKey(modules)
+    saveSelectorIndexCache(target, modules, key)
+    gSelectorIndexBase = (target.GetProcess().GetUniqueID(), key, len(gSelectors), len(gClassNames), len(gMethodClasses))
+
+
+def reuseSelectorIndexBase() -> bool:
+    # Keep the base of the index if the modules haven't changed, remove the methods of the classes created at run time.
+    # False if the index has to be loaded from the disk cache or built again.
+    if gSelectorIndexBase is None or gSelectorIndexNextClass is not None:
+        return False
+    processUID, key, selectorCount, classCount, methodCount = gSelectorIndexBase
+    target = lldb.debugger.GetSelectedTarget()
+    if processUID != target.GetProcess().GetUniqueID() or key != selectorIndexCacheKey(HMDiskCache.loadedModules(target)):
+        return False
+
+    # The method IDs of a selector are ascending, the runtime methods are at the end
+    for selectorID in set(gMethodSelectors[methodCount:]):
+        methodIDs = gSelectorMethods[selectorID]
+        while len(methodIDs) > 0 and methodIDs[-1] >= methodCount:
+            methodIDs.pop()
+    for selectorName, lowercaseName in zip(gSelectors[selectorCount:], gLowercaseSelectors[selectorCount:]):
+        del gSelectorIDs[selectorName]
+        for trigram in set(lowercaseName[i:i + 3] for i in range(len(lowercaseName) - 2)):
+            selectorIDs = gTrigrams.get(trigram)
+            if selectorIDs is None:
+                # Removed with another runtime selector
+                continue
+            while len(selectorIDs) > 0 and selectorIDs[-1] >= selectorCount:
+                selectorIDs.pop()
+            if len(selectorIDs) == 0:
+                del gTrigrams[trigram]
+    for values, count in [(gSelectors, selectorCount), (gLowercaseSelectors, selectorCount), (gSelectorMethods, selectorCount),
+                          (gClassNames, classCount), (gClassAddresses, classCount),
+                          (gMethodClasses, methodCount), (gMethodSigns, methodCount), (gMethodSelectors, methodCount),
+                          (gMethodTypeEncodings, methodCount), (gMethodIMPs, methodCount)]:
+        del values[count:]
+    return True
+
+
+def loadCachedSelectorIndex() -> bool:
+    # Load the base of the index saved with the same modules, False if there is none.
+    global gSelectorIndexNextClass
+    global gSelectorIndexBase
+    if HMDiskCache.gCacheDirectory is None:
+        return False
+    target = lldb.debugger.GetSelectedTarget()
+    modules = HMDiskCache.loadedModules(target)
+    key = selectorIndexCacheKey(modules)
+    cache = HMDiskCache.loadCache("selectors", key)
+    if cache is None:
+        return False
+
+    headerAddresses = {uuid: headerAddress for _, uuid, headerAddress in modules}
+    if any(uuid not in headerAddresses for uuid in cache["modules"]):
+        return False
+    slides = [headerAddresses[uuid] - headerAddress for uuid, headerAddress in zip(cache["modules"], cache["headerAddresses"])]
+    unpackIntegers = HMDiskCache.unpackIntegers
+    for selectorName in cache["selectors"]:
+        addSelector(selectorName)
+    gClassNames.extend(cache["classNames"])
+    gClassAddresses.extend(HMDiskCache.slideAddresses(cache["classAddresses"], cache["classModules"], slides))
+    gMethodClasses.extend(unpackIntegers(cache["methodClasses"]))
+    gMethodSigns.extend(cache["methodSigns"])
+    gMethodSelectors.extend(unpackIntegers(cache["methodSelectors"]))
+    typeEncodings = cache["typeEncodings"]
+    gMethodTypeEncodings.extend([typeEncodings[i] for i in unpackIntegers(cache["methodTypeEncodings"])])
+    gMethodIMPs.extend(HMDiskCache.slideAddresses(cache["methodIMPs"], cache["methodIMPModules"], slides))
+    methodIDs = unpackIntegers(cache["selectorMethods"])
+    end = 0
+    for selectorID, count in enumerate(unpackIntegers(cache["selectorMethodCounts"])):
+        gSelectorMethods[selectorID] = methodIDs[end:end + count]
+        end += count
+    gSelectorIndexNextClass = None
+    gSelectorIndexBase = (target.GetProcess().GetUniqueID(), key, len(gSelectors), len(gClassNames), len(gMethodClasses))
+    return True
+
+
+def saveSelectorIndexCache(target: lldb.SBTarget, modules: List[Tuple[lldb.SBModule, str, int]], key: str) -> None:
+    # Addresses are saved with the indexes of their modules in "modules", the index isn't saved if one is out of the modules.
+    # Type encodings are saved as indexes of "typeEncodings", most methods share a few of them.
+    ranges = HMDiskCache.moduleRanges(target, modules)
+    moduleIndexes = {uuid: i for i, (_, uuid, _) in enumerate(modules)}
+    moduleColumns = []
+    for addresses in [gClassAddresses, gMethodIMPs]:
+        locations = HMDiskCache.moduleOffsets(ranges, addresses)
+        if locations is None:
+            return
+        moduleColumns.append([moduleIndexes[uuid] for uuid in locations[0]])
+    typeEncodingIndexes: Dict[str, int] = {}
+    methodTypeEncodings = [typeEncodingIndexes.setdefault(typeEncoding, len(typeEncodingIndexes)) for typeEncoding in gMethodTypeEncodings]
+
+    packIntegers = HMDiskCache.packIntegers
+    HMDiskCache.saveCache("selectors", key, {
+        "modules": [uuid for _, uuid, _ in modules],
+        "headerAddresses": [headerAddress for _, _, headerAddress in modules],
+        "selectors": gSelectors,
+        "selectorMethods": packIntegers([methodID for methodIDs in gSelectorMethods for methodID in methodIDs]),
+        "selectorMethodCounts": packIntegers([len(methodIDs) for methodIDs in gSelectorMethods]),
+        "classNames": gClassNames,
+        "classAddresses": packIntegers(gClassAddresses),
+        "classModules": packIntegers(moduleColumns[0]),
+        "methodClasses": packIntegers(gMethodClasses),
+        "methodSigns": "".join(gMethodSigns),
+        "methodSelectors": packIntegers(gMethodSelectors),
+        "typeEncodings": list(typeEncodingIndexes),
+        "methodTypeEncodings": packIntegers(methodTypeEncodings),
+        "methodIMPs": packIntegers(gMethodIMPs),
+        "methodIMPModules": packIntegers(moduleColumns[1])
+    })
+
+
+def addSelector(selectorName: str) -> int:
+    selectorID = len(gSelectors)
+    lowercaseName = selectorName.lower()
+    gSelectors.append(selectorName)
+    gLowercaseSelectors.append(lowercaseName)
+    gSelectorIDs[selectorName] = selectorID
+    gSelectorMethods.append([])
+    for trigram in set(lowercaseName[i:i + 3] for i in range(len(lowercaseName) - 2)):
+        gTrigrams.setdefault(trigram, []).append(selectorID)
+    return selectorID
+
+
+def clearSelectorIndex() -> None:
+    global gSelectorIndexGeneration
+    global gSelectorIndexNextClass
+    global gSelectorIndexBase
+    gSelectorIndexGeneration = None
+    gSelectorIndexNextClass = None
+    gSelectorIndexBase = None
+    for values in [gSelectors, gLowercaseSelectors, gSelectorMethods, gMethodClasses, gMethodSigns, gMethodSelectors,
+                   gMethodTypeEncodings, gMethodIMPs, gClassNames, gClassAddresses]:
+        values.clear()
+    gSelectorIDs.clear()
+    gTrigrams.clear()
+
+
+def findSelectors(keyword: str) -> List[int]:
+    # IDs of the selectors containing the keyword, case insensitive
+    keyword = keyword.lower()
+    if len(keyword) < 3:
+        candidates = range(len(gSelectors))
+    else:
+        postings = [gTrigrams.get(keyword[i:i + 3], []) for i in range(len(keyword) - 2)]
+        candidates = min(postings, key=len)
+    return [selectorID for selectorID in candidates if keyword in gLowercaseSelectors[selectorID]]
+
+
+def findMethods(keyword: str, start=0, end: Optional[int] = None) -> List[int]:
+    # IDs of the methods in [start, end) whose selectors contain the keyword, in the order of the index
+    if end is None:
+        end = len(gMethodClasses)
+    methodIDs = []
+    for selectorID in findSelectors(keyword):
+        # The method IDs of a selector are ascending
+        selectorMethods = gSelectorMethods[selectorID]
+        methodIDs.extend(selectorMethods[bisect.bisect_left(selectorMethods, start):bisect.bisect_left(selectorMethods, end)])
+    methodIDs.sort()
+    return methodIDs
+
+
+def methodClassName(methodID: int) -> str:
+    return gClassNames[gMethodClasses[methodID]]
+
+
+def methodSelector(methodID: int) -> str:
+    return gSelectors[gMethodSelectors[methodID]]
@@ -11,5 +11,3 @@ command alias -h "Alias for 'expression -l swift -O --'" -- spo expression -l sw
 command alias -h "Alias for 'expression -l swift --'" -- sp expression -l swift --
 
 command alias -h "Execute [CATransaction flush]" -- caflush expression -l objc -- (void)[CATransaction flush]
-
-command regex ivars -h "Execute [%1 _ivarDescription]" -s "ivars <Instance>, Examples: ivars [UIView new], ivars 0x10e016000" -- 's/(.+)/expression -l objc -O -- [%1 _ivarDescription]/'
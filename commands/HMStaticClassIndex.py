@@ -0,0 +1,176 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+import re
+import struct
+from typing import Dict, List, Optional, Tuple
+import HMLLDBHelpers as HM
+
+
+# Reads the classes of a module from its __objc_classlist section with SBProcess.ReadMemory.
+# Nothing is evaluated, it works when expressions can't run, e.g. in optimized builds or with a blocked main thread.
+# Layouts of objc4 for 64-bit processes:
+#   objc_class: isa @0, superclass @8, cache @16, bits @32
+#   class_rw_t: flags @0, ro_or_rw_ext @8 (class_rw_ext_t * if the low bit is set, its ro is @0)
+#   class_ro_t: flags @0, name @24
+
+kPointerMask = 0x00007ffffffffff8   # FAST_DATA_MASK, it also strips the pointer authentication bits
+kRWRealized = 1 << 31               # RW_REALIZED of class_rw_t::flags, never set in class_ro_t::flags
+kBlockSize = 0x4000
+kClassListSegments = ["__DATA", "__DATA_CONST", "__DATA_DIRTY"]
+kInvalidAddress = 0xffffffffffffffff
+
+# Memory blocks read during one build, the class data of an image is close together
+gBlocks: Dict[int, Optional[bytes]] = {}
+
+
+def readModuleClasses(target: lldb.SBTarget, module: lldb.SBModule) -> List[Tuple[str, int, int]]:
+    # [(name, class, superclass)] of the module, superclass is 0 for root classes
+    classes = []
+    for address, size in classListSections(target, module):
+        data = readBytes(address, size)
+        if data is None:
+            continue
+        for (pointer,) in struct.iter_unpack("<Q", data[:size - size % 8]):
+            cls = pointer & kPointerMask
+            classInfo = readClass(cls)
+            if classInfo is not None:
+                classes.append((classInfo[0], cls, classInfo[1]))
+    return classes
+
+
+def clearMemoryBlocks() -> None:
+    gBlocks.clear()
+
+
+def classListSections(target: lldb.SBTarget, module: lldb.SBModule) -> List[Tuple[int, int]]:
+    sections = []
+    for segmentName in kClassListSegments:
+        segment = module.FindSection(segmentName)
+        if not segment.IsValid():
+            continue
+        for i in range(segment.GetNumSubSections()):
+            section = segment.GetSubSectionAtIndex(i)
+            if section.GetName() != "__objc_classlist":
+                continue
+            address = section.GetLoadAddress(target)
+            if address != kInvalidAddress and section.GetByteSize() > 0:
+                sections.append((address, section.GetByteSize()))
+    return sections
+
+
+def readClass(cls: int) -> Optional[Tuple[str, int]]:
+    # (name, superclass) of the class
+    classData = readBytes(cls, 40)
+    if classData is None:
+        return None
+    superclass = readPointerFrom(classData, 8)
+    data = readPointerFrom(classData, 32)
+
+    flags = readUInt32(data)
+    if flags is None:
+        return None
+    ro = data
+    if flags & kRWRealized:
+        roOrRWExt = readPointer(data + 8, kPointerMask | 1)
+        if roOrRWExt is None:
+            return None
+        ro = readPointer(roOrRWExt & ~1) if roOrRWExt & 1 else roOrRWExt
+        if ro is None:
+            return None
+
+    namePointer = readPointer(ro + 24)
+    if not namePointer:
+        return None
+    name = readCString(namePointer)
+    if name is None:
+        return None
+    return demangleSwiftClassName(name), superclass
+
+
+def demangleSwiftClassName(name: str) -> str:
+    # "_TtC7MyModule14ViewController" -> "MyModule.ViewController", like class_getName.
+    # Only top level classes, the runtime doesn't demangle nested classes either.
+    if not name.startswith("_TtC"):
+        return name
+    components = []
+    index = 4
+    if name.startswith("s", index):
+        components.append("Swift")
+        index += 1
+    while index < len(name):
+        match = re.match(r"[1-9][0-9]*", name[index:])
+        if match is None:
+            return name
+        length = int(match.group(0))
+        index += len(match.group(0))
+        components.append(name[index:index + length])
+        index += length
+    if len(components) != 2 or index != len(name):
+        return name
+    return ".".join(components)
+
+
+def readBytes(address: int, size: int) -> Optional[bytes]:
+    # Through the cached block if the range is in one block, the block is read once per build
+    blockAddress = address & ~(kBlockSize - 1)
+    if address + size <= blockAddress + kBlockSize:
+        if blockAddress not in gBlocks:
+            gBlocks[blockAddress] = HM.readMemory(blockAddress, kBlockSize, False)
+        block = gBlocks[blockAddress]
+        if block is not None:
+            offset = address - blockAddress
+            return block[offset:offset + size]
+    return HM.readMemory(address, size, False)
+
+
+def readPointerFrom(data: bytes, offset: int, mask=kPointerMask) -> int:
+    return struct.unpack_from("<Q", data, offset)[0] & mask
+
+
+def readPointer(address: int, mask=kPointerMask) -> Optional[int]:
+    data = readBytes(address, 8)
+    return None if data is None else readPointerFrom(data, 0, mask)
+
+
+def readUInt32(address: int) -> Optional[int]:
+    data = readBytes(address, 4)
+    return None if data is None else struct.unpack("<I", data)[0]
+
+
+def readCString(address: int, maxLength=1024) -> Optional[str]:
+    result = b""
+    while len(result) < maxLength:
+        # Up to the end of the block
+        chunk = readBytes(address, kBlockSize - (address & (kBlockSize - 1)))
+        if chunk is None:
+            # The block ends in unreadable memory
+            chunk = readBytes(address, 16) or readBytes(address, 1)
+            if chunk is None:
+                return None
+        end = chunk.find(b"\0")
+        if end >= 0:
+            return (result + chunk[:end]).decode("utf-8", "replace")
+        result += chunk
+        address += len(chunk)
+    return None
@@ -0,0 +1,166 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import lldb
+from typing import Any, Dict
+import json
+import optparse
+import os
+import shlex
+import HMLLDBHelpers as HM
+import HMClassIndex
+import HMClassInfoCommands
+import HMClassResolver
+import HMDiskCache
+import HMProtocolIndex
+import HMSelectorIndex
+
+
+def __lldb_init_module(debugger, internal_dict):
+    debugger.HandleCommand('command script add -f HMTrace.trace hmtrace -h "Run a command and record its expressions for offline replay."')
+
+
+gTraceVersion = 1
+
+
+def trace(debugger, command, exe_ctx, result, internal_dict):
+    """
+    Syntax:
+        hmtrace <command>
+        hmtrace [--output <path>] [--append] -- <command>
+
+    Options:
+        --output/-o; Path of the trace file, default: /tmp/hmtrace.json
+        --append/-a; Add the command to an existing trace file of the same process
+
+    Examples:
+        (lldb) hmtrace push PersonalViewController
+        (lldb) hmtrace -o /tmp/inspect.json -- inspect
+        (lldb) hmtrace -o /tmp/session.json -a -- fclass controller
+
+    Summary:
+        Run the command and record its expressions with their values and descriptions,
+        the memory it reads and the lldb commands it runs.
+        Replay the trace without a device: python3 benchmarks/HMReplay.py /tmp/hmtrace.json
+
+    This command is implemented in HMTrace.py
+    """
+
+    # Options of hmtrace are separated from the traced command by "--"
+    optionsString = ""
+    tracedCommand = command.strip()
+    if tracedCommand.startswith("-"):
+        optionsString, _, tracedCommand = tracedCommand.partition("--" if tracedCommand.startswith("-- ") else " -- ")
+        tracedCommand = tracedCommand.strip()
+
+    parser = generate_option_parser()
+    try:
+        # options: optparse.Values
+        # args: list
+        (options, args) = parser.parse_args(shlex.split(optionsString))
+    except:
+        result.SetError(parser.usage)
+        return
+
+    if len(tracedCommand) == 0:
+        HM.DPrint("Requires a command, Please enter \"help hmtrace\" for help.")
+        return
+
+    process = debugger.GetSelectedTarget().GetProcess()
+    traceData = {
+        "version": gTraceVersion,
+        "triple": debugger.GetSelectedTarget().GetTriple(),
+        "processUID": process.GetUniqueID(),
+        "commands": []
+    }
+    if options.append and os.path.exists(options.output):
+        try:
+            with open(options.output, "r") as file:
+                traceData = json.load(file)
+        except (OSError, ValueError) as error:
+            HM.DPrint(f"Failed to read {options.output}: {error}")
+            return
+        if traceData.get("processUID") != process.GetUniqueID():
+            HM.DPrint(f"{options.output} was recorded in another process, it can't be appended")
+            return
+
+    # Cached results would hide expressions from the trace
+    HM.clearExpressionCache()
+    HMClassIndex.clearClassIndex()
+    HMSelectorIndex.clearSelectorIndex()
+    HMProtocolIndex.clearProtocolIndex()
+    HMClassInfoCommands.clearDescriptions()
+    HMClassResolver.clearResolvedClasses()
+    cacheDirectory = HMDiskCache.gCacheDirectory
+    HMDiskCache.gCacheDirectory = None
+    state = traceState(process)
+    HM.gTraceEvents = []
+    try:
+        debugger.HandleCommand(tracedCommand)
+    finally:
+        events = HM.gTraceEvents
+        HM.gTraceEvents = None
+        HMDiskCache.gCacheDirectory = cacheDirectory
+
+    traceData["commands"].append({"command": tracedCommand, "state": state, "events": events})
+    try:
+        with open(options.output, "w") as file:
+            json.dump(traceData, file, indent=1)
+    except OSError as error:
+        HM.DPrint(f"Failed to write {options.output}: {error}")
+        return
+
+    expressionCount = len([event for event in events if event["kind"] == "expression"])
+    HM.DPrint(f"{expressionCount} expressions and {len(events) - expressionCount} other events have been written to {options.output}")
+
+
+def traceState(process: lldb.SBProcess) -> Dict[str, Any]:
+    # Python-side state that decides which expressions the command evaluates.
+    # HMReplay restores it before replaying the command.
+    processUID = process.GetUniqueID()
+    return {
+        "prepared": processUID in HM.gPreparedProcessUIDs,
+        "helperLibrary": processUID == HM.gHelperLibraryProcessUID,
+        "argumentsAddress": HM.gArgumentsAddresses.get(processUID),
+        "argumentsArena": HM.gArgumentsArenas.get(processUID),
+        "classPrefixes": list(HM.gClassPrefixes),
+        "classPrefixesCollected": processUID == HM.gClassPrefixesProcessUID
+    }
+
+
+def generate_option_parser() -> optparse.OptionParser:
+    usage = "usage: hmtrace [--output <path>] [--append] -- <command>"
+    parser = optparse.OptionParser(usage=usage, prog="hmtrace")
+
+    parser.add_option("-o", "--output",
+                      action="store",
+                      default="/tmp/hmtrace.json",
+                      dest="output",
+                      help="Path of the trace file")
+
+    parser.add_option("-a", "--append",
+                      action="store_true",
+                      default=False,
+                      dest="append",
+                      help="Add the command to an existing trace file of the same process")
+
+    return parser
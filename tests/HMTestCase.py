@@ -0,0 +1,66 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Shared setup of the unit tests. The commands are imported by the fake lldb module of the benchmarks
+# and evaluate their expressions in the simulated runtime of HMBenchmarkRuntime.
+#
+#     python3 -m pytest -q tests
+#     python3 -m unittest discover tests
+
+import contextlib
+import io
+import os
+import sys
+import unittest
+from types import ModuleType
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import lldb
+import HMBenchmark
+import HMBenchmarkRuntime
+
+
+class HMTestCase(unittest.TestCase):
+    # The commands are imported again for each test, so the module globals of a test don't leak into the next one.
+    # The disk cache is disabled unless a test sets HMDiskCache.gCacheDirectory.
+    def setUp(self) -> None:
+        self.runtime = HMBenchmarkRuntime.HMBenchmarkRuntime(classCount=100, methodCount=5, fileCount=10)
+        self.debugger, self.process = lldb.makeDebugger(self.runtime)
+        with contextlib.redirect_stdout(io.StringIO()):
+            HMBenchmark.loadCommands(self.debugger, None)
+
+    @staticmethod
+    def commandModule(name: str) -> ModuleType:
+        # loadCommands replaces the modules, never import them at the top of a test file
+        return sys.modules[name]
+
+    def stop(self) -> None:
+        # The process continues and stops again
+        self.process.stopID += 1
+
+    def captureOutput(self, function, *args):
+        # (result of the function, text printed by HM.DPrint)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = function(*args)
+        return result, output.getvalue()
@@ -0,0 +1,48 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from HMTestCase import HMTestCase, HMBenchmarkRuntime
+
+
+class HMBenchmarkRuntimeTests(HMTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.HM = self.commandModule("HMLLDBHelpers")
+
+    def test_unknownHelper(self) -> None:
+        with self.assertRaises(HMBenchmarkRuntime.HMUnsupportedExpression):
+            self.HM.evaluateExpressionValue("(id)HMMissingHelper(1)")
+
+    def test_helperWithoutHandler(self) -> None:
+        # A function of the helper library that the runtime doesn't simulate
+        with self.assertRaises(HMBenchmarkRuntime.HMUnsupportedExpression):
+            self.HM.evaluateExpressionRecords('HMTransportAppendUTF8("text");')
+
+    def test_plainObjectiveC(self) -> None:
+        value = self.HM.evaluateExpressionValue("BOOL isDisplaying = [window isKeyWindow]; isDisplaying;")
+        self.assertTrue(self.HM.successOfSBError(value.GetError()))
+        self.assertEqual(value.GetValueAsUnsigned(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
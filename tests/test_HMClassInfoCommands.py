@@ -0,0 +1,67 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from HMTestCase import HMTestCase
+
+
+class HMParseLeadingOptionsTests(HMTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.commands = self.commandModule("HMClassInfoCommands")
+
+    def parse(self, command: str):
+        return self.commands.parseLeadingOptions(command, self.commands.generate_methods_option_parser())
+
+    def test_withoutOptions(self) -> None:
+        options, inputStr = self.parse("  UIView  ")
+        self.assertFalse(options.diff)
+        self.assertFalse(options.short)
+        self.assertEqual(inputStr, "UIView")
+
+    def test_leadingOptions(self) -> None:
+        options, inputStr = self.parse("-s --diff UIViewController")
+        self.assertTrue(options.short)
+        self.assertTrue(options.diff)
+        self.assertEqual(inputStr, "UIViewController")
+
+    def test_inputIsUnchanged(self) -> None:
+        # shlex.split would remove the quotes of the expression
+        options, inputStr = self.parse('-d [obj valueForKey:@"name"]  -s')
+        self.assertTrue(options.diff)
+        self.assertFalse(options.short)
+        self.assertEqual(inputStr, '[obj valueForKey:@"name"]  -s')
+
+    def test_endOfOptions(self) -> None:
+        options, inputStr = self.parse("-s -- -d")
+        self.assertTrue(options.short)
+        self.assertFalse(options.diff)
+        self.assertEqual(inputStr, "-d")
+
+    def test_unknownOptionIsInput(self) -> None:
+        options, inputStr = self.parse("-x 0x10e016000")
+        self.assertFalse(options.short)
+        self.assertEqual(inputStr, "-x 0x10e016000")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from HMTestCase import HMTestCase
+
+
+class HMClassResolverTests(HMTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.HM = self.commandModule("HMLLDBHelpers")
+        self.HMClassIndex = self.commandModule("HMClassIndex")
+        self.HMClassResolver = self.commandModule("HMClassResolver")
+
+    def test_isClassName(self) -> None:
+        self.assertTrue(self.HMClassResolver.isClassName("UIView"))
+        self.assertTrue(self.HMClassResolver.isClassName("MyApp.ViewController"))
+        self.assertTrue(self.HMClassResolver.isClassName("_TtC5MyApp14ViewController"))
+        self.assertFalse(self.HMClassResolver.isClassName("[UIView new]"))
+        self.assertFalse(self.HMClassResolver.isClassName("0x10e016000"))
+
+    def test_resolvedUntilRelaunch(self) -> None:
+        self.HMClassResolver.addResolvedClass("MyView", 0x1000)
+        self.stop()
+        self.assertEqual(self.HMClassResolver.cachedClass("MyView"), 0x1000)
+        self.process.uniqueID += 1
+        self.assertIsNone(self.HMClassResolver.cachedClass("MyView"))
+
+    def test_unresolvedUntilNextStop(self) -> None:
+        self.HMClassResolver.addUnresolvedClass("MyView")
+        self.assertTrue(self.HMClassResolver.isUnresolved("MyView"))
+        self.stop()
+        self.assertFalse(self.HMClassResolver.isUnresolved("MyView"))
+
+    def test_unresolvedUntilClassRegistration(self) -> None:
+        self.HMClassResolver.addUnresolvedClass("MyView")
+        self.HM.gClassRegistrations += 1
+        self.assertFalse(self.HMClassResolver.isUnresolved("MyView"))
+
+    def test_resolvedClassIsNotUnresolved(self) -> None:
+        self.HMClassResolver.addUnresolvedClass("MyView")
+        self.HMClassResolver.addResolvedClass("MyView", 0x1000)
+        self.assertFalse(self.HMClassResolver.isUnresolved("MyView"))
+
+    def test_cachedClassOfClassIndex(self) -> None:
+        className = self.runtime.classNames[-1]
+        self.assertIsNone(self.HMClassResolver.cachedClass(className))
+        self.captureOutput(self.HMClassIndex.loadClassIndex)
+        self.assertEqual(self.HMClassResolver.cachedClass(className), self.runtime.classAddresses[-1])
+        self.assertIsNone(self.HMClassResolver.cachedClass("HMMissingClass"))
+
+    def test_classStatement(self) -> None:
+        statement, argument = self.HMClassResolver.classStatement("MyView", 1)
+        self.assertEqual(statement, self.HM.lookUpClassScript(1))
+        self.assertEqual(argument, "MyView")
+        self.HMClassResolver.addResolvedClass("MyView", 0x1000)
+        statement, argument = self.HMClassResolver.classStatement("MyView", 1)
+        self.assertEqual(statement, "Class inputClass = (Class)HMArgPointer(1);")
+        self.assertEqual(argument, "0x1000")
+
+    def test_classStatementOfMangledName(self) -> None:
+        statement, argument = self.HMClassResolver.classStatement("_TtC5MyApp6MyView")
+        self.assertEqual(statement, self.HM.lookUpClassScript(0))
+        self.assertEqual(argument, "MyApp.MyView")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import tempfile
+import unittest
+from HMTestCase import HMTestCase
+
+
+class HMDiskCacheTests(HMTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.HMDiskCache = self.commandModule("HMDiskCache")
+        self.directory = tempfile.TemporaryDirectory()
+        self.HMDiskCache.gCacheDirectory = self.directory.name
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def cachedKeys(self, kind: str):
+        return sorted(name[:-len(".json")] for name in os.listdir(os.path.join(self.directory.name, kind)))
+
+    def setLastUse(self, kind: str, key: str, time: int) -> None:
+        os.utime(os.path.join(self.directory.name, kind, f"{key}.json"), (time, time))
+
+    def test_packIntegers(self) -> None:
+        values = [0, 1, -1, 0x100000000, 2 ** 63 - 1, -2 ** 63]
+        self.assertEqual(self.HMDiskCache.unpackIntegers(self.HMDiskCache.packIntegers(values)), values)
+        self.assertEqual(self.HMDiskCache.unpackIntegers(self.HMDiskCache.packIntegers([])), [])
+
+    def test_saveAndLoad(self) -> None:
+        self.HMDiskCache.saveCache("classes", "key", {"names": ["UIView"]})
+        self.assertEqual(self.HMDiskCache.loadCache("classes", "key"), {"names": ["UIView"], "version": self.HMDiskCache.kCacheVersion})
+        self.assertIsNone(self.HMDiskCache.loadCache("classes", "missing"))
+
+    def test_loadOtherVersion(self) -> None:
+        os.makedirs(os.path.join(self.directory.name, "classes"))
+        with open(os.path.join(self.directory.name, "classes", "key.json"), "w") as file:
+            file.write('{"version": 0}')
+        self.assertIsNone(self.HMDiskCache.loadCache("classes", "key"))
+
+    def test_disabled(self) -> None:
+        self.HMDiskCache.gCacheDirectory = None
+        self.HMDiskCache.saveCache("classes", "key", {})
+        self.assertIsNone(self.HMDiskCache.loadCache("classes", "key"))
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_evictLeastRecentlyUsed(self) -> None:
+        self.HMDiskCache.gCacheLimits["selectors"] = 2
+        for i, key in enumerate(["a", "b", "c"]):
+            self.HMDiskCache.saveCache("selectors", key, {})
+            self.setLastUse("selectors", key, 1000 + i)
+        self.HMDiskCache.gEvictedKinds.clear()
+        # Loading "a" makes it the most recently used file
+        self.assertIsNotNone(self.HMDiskCache.loadCache("selectors", "a"))
+        self.HMDiskCache.saveCache("selectors", "d", {})
+        self.assertEqual(self.cachedKeys("selectors"), ["a", "d"])
+
+    def test_evictOncePerSession(self) -> None:
+        self.HMDiskCache.gCacheLimits["selectors"] = 1
+        self.HMDiskCache.saveCache("selectors", "a", {})
+        self.setLastUse("selectors", "a", 1000)
+        self.HMDiskCache.saveCache("selectors", "b", {})
+        self.assertEqual(self.cachedKeys("selectors"), ["a", "b"])
+        self.HMDiskCache.gEvictedKinds.clear()
+        self.HMDiskCache.evictCache("selectors")
+        self.assertEqual(self.cachedKeys("selectors"), ["b"])
+
+    def test_moduleOffset(self) -> None:
+        # (start, end, UUID, header address), sorted by start
+        ranges = [(0x1000, 0x2000, "A", 0x1000), (0x5000, 0x6000, "B", 0x4000)]
+        self.assertEqual(self.HMDiskCache.moduleOffset(ranges, 0x1010), ("A", 0x10))
+        self.assertEqual(self.HMDiskCache.moduleOffset(ranges, 0x5010), ("B", 0x1010))
+        self.assertIsNone(self.HMDiskCache.moduleOffset(ranges, 0x800))
+        self.assertIsNone(self.HMDiskCache.moduleOffset(ranges, 0x2000))
+        self.assertEqual(self.HMDiskCache.moduleOffsets(ranges, [0x1010, 0x1020, 0x5000]), (["A", "A", "B"], [0x10, 0x20, 0x1000]))
+        self.assertIsNone(self.HMDiskCache.moduleOffsets(ranges, [0x1010, 0x3000]))
+
+    def test_slideAddresses(self) -> None:
+        addresses = self.HMDiskCache.packIntegers([0x1000, 0x2000])
+        modules = self.HMDiskCache.packIntegers([0, 1])
+        self.assertEqual(self.HMDiskCache.slideAddresses(addresses, modules, [0, 0]), [0x1000, 0x2000])
+        self.assertEqual(self.HMDiskCache.slideAddresses(addresses, modules, [0x10, 0x10]), [0x1010, 0x2010])
+        self.assertEqual(self.HMDiskCache.slideAddresses(addresses, modules, [0x10, 0x20]), [0x1010, 0x2020])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from HMTestCase import HMTestCase
+
+
+class HMTransportTests(HMTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.HM = self.commandModule("HMLLDBHelpers")
+
+    def test_readRecords(self) -> None:
+        records = ["HMBenchmarkApp", "UIView\x1f0x1000", "", "Überprüfung ✓"]
+        address = self.runtime.writeTransport(records)
+        self.assertEqual(self.HM.readTransportRecords(address), records)
+
+    def test_readEmptyPayload(self) -> None:
+        address = self.runtime.writeTransport([])
+        self.assertEqual(self.HM.readTransportRecords(address), [])
+
+    def test_readNullBuffer(self) -> None:
+        # HMTransportFinish returns NULL when the buffer couldn't grow
+        records, output = self.captureOutput(self.HM.readTransportRecords, 0)
+        self.assertIsNone(records)
+        self.assertIn("out of memory", output)
+
+    def test_splitRecordFields(self) -> None:
+        self.assertEqual(self.HM.splitRecordFields("-\x1finit\x1f@16@0:8\x1f0x1000"), ["-", "init", "@16@0:8", "0x1000"])
+        self.assertEqual(self.HM.splitRecordFields("name\x1f"), ["name", ""])
+        self.assertEqual(self.HM.splitRecordFields("name"), ["name"])
+
+    def test_evaluateExpressionRecords(self) -> None:
+        # The prefixes are a single record of lines
+        records = self.HM.evaluateExpressionRecords("HMAppendClassPrefixes();")
+        self.assertEqual(records, ["\n".join(self.runtime.classPrefixes())])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2020 Huimao Chen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from HMTestCase import HMTestCase
+
+
+class HMSelectorIndexTests(HMTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.HMSelectorIndex = self.commandModule("HMSelectorIndex")
+        self.HMSelectorIndex.addMethodRecords([
+            "UIView\x1f0x1000",
+            "-\x1flayoutSubviews\x1fv16@0:8\x1f0x2000",
+            "-\x1fsetNeedsLayout\x1fv16@0:8\x1f0x2010",
+            "+\x1flayerClass\x1f#16@0:8\x1f0x2020",
+            "UILabel\x1f0x1100",
+            "-\x1flayoutSubviews\x1fv16@0:8\x1f0x2100",
+            "-\x1fsetText:\x1fv24@0:8@16\x1f0x2110",
+        ])
+
+    def methods(self, methodIDs):
+        return [(self.HMSelectorIndex.methodClassName(methodID), self.HMSelectorIndex.methodSelector(methodID)) for methodID in methodIDs]
+
+    def test_addMethodRecords(self) -> None:
+        self.assertEqual(self.HMSelectorIndex.gClassNames, ["UIView", "UILabel"])
+        self.assertEqual(self.HMSelectorIndex.gClassAddresses, [0x1000, 0x1100])
+        self.assertEqual(self.HMSelectorIndex.gMethodSigns, ["-", "-", "+", "-", "-"])
+        self.assertEqual(self.HMSelectorIndex.gMethodIMPs, [0x2000, 0x2010, 0x2020, 0x2100, 0x2110])
+        # A selector shared by two classes is added once
+        self.assertEqual(self.HMSelectorIndex.gSelectors, ["layoutSubviews", "setNeedsLayout", "layerClass", "setText:"])
+        self.assertEqual(self.HMSelectorIndex.gSelectorMethods[0], [0, 3])
+
+    def test_findMethods(self) -> None:
+        self.assertEqual(self.methods(self.HMSelectorIndex.findMethods("layout")),
+                         [("UIView", "layoutSubviews"), ("UIView", "setNeedsLayout"), ("UILabel", "layoutSubviews")])
+        self.assertEqual(self.methods(self.HMSelectorIndex.findMethods("TEXT:")), [("UILabel", "setText:")])
+        self.assertEqual(self.HMSelectorIndex.findMethods("layoutIfNeeded"), [])
+
+    def test_findMethodsOfShortKeyword(self) -> None:
+        # A keyword shorter than a trigram compares all selectors
+        self.assertEqual(self.methods(self.HMSelectorIndex.findMethods("La")),
+                         [("UIView", "layoutSubviews"), ("UIView", "setNeedsLayout"), ("UIView", "layerClass"), ("UILabel", "layoutSubviews")])
+        self.assertEqual(len(self.HMSelectorIndex.findMethods("")), 5)
+
+    def test_findMethodsInRange(self) -> None:
+        self.assertEqual(self.HMSelectorIndex.findMethods("layoutSubviews", 1), [3])
+        self.assertEqual(self.HMSelectorIndex.findMethods("layoutSubviews", 0, 3), [0])
+        self.assertEqual(self.HMSelectorIndex.findMethods("layoutSubviews", 1, 3), [])
+
+    def test_clearSelectorIndex(self) -> None:
+        self.HMSelectorIndex.clearSelectorIndex()
+        self.assertEqual(self.HMSelectorIndex.findMethods("layout"), [])
+        self.assertEqual(self.HMSelectorIndex.gTrigrams, {})
+
+    def test_loadSelectorIndex(self) -> None:
+        result, _ = self.captureOutput(self.HMSelectorIndex.loadSelectorIndex)
+        self.assertTrue(result)
+        # The records of setUp are replaced by the classes of the runtime
+        self.assertEqual(sorted(self.HMSelectorIndex.gClassNames), sorted(self.runtime.classNames))
+        selectorName = self.HMSelectorIndex.gSelectors[0]
+        methodIDs = self.HMSelectorIndex.findMethods(selectorName)
+        self.assertGreater(len(methodIDs), 0)
+        self.assertTrue(all(selectorName in self.HMSelectorIndex.methodSelector(methodID) for methodID in methodIDs))
+
+    def test_reuseSelectorIndexBase(self) -> None:
+        HMSelectorIndex = self.HMSelectorIndex
+        target = self.debugger.GetSelectedTarget()
+        key = HMSelectorIndex.selectorIndexCacheKey(self.commandModule("HMDiskCache").loadedModules(target))
+        HMSelectorIndex.gSelectorIndexBase = (target.GetProcess().GetUniqueID(), key, len(HMSelectorIndex.gSelectors),
+                                              len(HMSelectorIndex.gClassNames), len(HMSelectorIndex.gMethodClasses))
+        trigrams = {trigram: list(selectorIDs) for trigram, selectorIDs in HMSelectorIndex.gTrigrams.items()}
+        # A class created at run time, its selectors share trigrams with the base and with each other
+        HMSelectorIndex.addMethodRecords([
+            "HMRuntimeView\x1f0x3000",
+            "-\x1flayoutSubviews\x1fv16@0:8\x1f0x4000",
+            "-\x1flayoutMargins\x1f{UIEdgeInsets=dddd}16@0:8\x1f0x4010",
+            "-\x1fmarginsDidChange\x1fv16@0:8\x1f0x4020",
+        ])
+        self.assertEqual(len(HMSelectorIndex.findMethods("margins")), 2)
+
+        self.assertTrue(HMSelectorIndex.reuseSelectorIndexBase())
+        self.assertEqual(HMSelectorIndex.gClassNames, ["UIView", "UILabel"])
+        self.assertEqual(len(HMSelectorIndex.gMethodClasses), 5)
+        self.assertEqual(HMSelectorIndex.gSelectorMethods[0], [0, 3])
+        self.assertNotIn("layoutMargins", HMSelectorIndex.gSelectorIDs)
+        self.assertEqual(HMSelectorIndex.gTrigrams, trigrams)
+        self.assertEqual(HMSelectorIndex.findMethods("margins"), [])
+
+    def test_reuseSelectorIndexBaseOfOtherProcess(self) -> None:
+        self.process.uniqueID += 1
+        self.HMSelectorIndex.gSelectorIndexBase = (1, "", 0, 0, 0)
+        self.assertFalse(self.HMSelectorIndex.reuseSelectorIndexBase())
+        self.HMSelectorIndex.gSelectorIndexBase = None
+        self.assertFalse(self.HMSelectorIndex.reuseSelectorIndexBase())
+
+
+if __name__ == "__main__":
+    unittest.main()